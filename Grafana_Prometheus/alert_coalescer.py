@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class AlertCoalescer:
+    """알림 묶음 처리
+
+    - 평상시: 같은 alertname/instance 알림을 window초 동안 모아 그룹마다 요약 문자 한 건으로 전송
+    - 폭주 시: storm_window초 동안 받은 알림이 storm_threshold건을 넘으면 다이제스트 모드로 전환하여
+      digest_interval초마다 전체 그룹을 문자 한 건으로 요약 (받은 알림이 임계값의 절반 아래로 내려가면 복귀)
+
+    emit(job)은 전송할 요약 알림을 받아 전송 큐에 넣는 함수이다.
+    """
+
+    def __init__(self, emit, window=30, storm_threshold=50, storm_window=60, digest_interval=300,
+                 digest_max_items=5):
+        self.emit = emit
+        self.window = window
+        self.storm_threshold = storm_threshold
+        self.storm_window = storm_window
+        self.digest_interval = digest_interval
+        self.digest_max_items = digest_max_items
+
+        self.lock = threading.Lock()
+        self.groups = {}         # (alertname, instance) -> 그룹 상태
+        self.received = deque()  # storm_window 안에 받은 알림 시각
+        self.storm = False
+        self.digest_started = 0.0
+        self.digest_pending = False  # 폭주가 끝난 뒤 남은 그룹을 다이제스트로 정리해야 하는지
+        self.thread = None
+        self.stats = {"received": 0, "emitted": 0, "digests": 0, "storms": 0}
+
+    def add(self, job, now=None):
+        """알림 하나 추가 (그룹에 합쳐지고 전송은 flush에서 처리)"""
+        now = time.time() if now is None else now
+        key = (job["alert_name"], job["instance"])
+        with self.lock:
+            self.stats["received"] += 1
+            self.received.append(now)
+            self._update_storm(now)
+
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = {"first_seen": now, "count": 0, "firing": 0, "resolved": 0, "job": job,
+                                            "ids": [], "attempts": 0, "done_recipients": None}
+            group["count"] += 1
+            group["ids"].extend(job.get("ids", []))  # 디스크 보관 알림 id (전송 완료/실패 표시용)
+            # 묶은 알림을 모두 받은 수신자만 요약 문자에서 제외
+            done = set(job.get("done_recipients", ()))
+            group["done_recipients"] = done if group["done_recipients"] is None else group["done_recipients"] & done
+            group["attempts"] = max(group["attempts"], job.get("attempts", 0))
+            group["resolved" if job.get("status") == "resolved" else "firing"] += 1
+            group["job"] = job  # 가장 최근 상태의 문자 내용 사용
+
+    def _update_storm(self, now):
+        while self.received and self.received[0] <= now - self.storm_window:
+            self.received.popleft()
+        rate = len(self.received)
+        if not self.storm and rate > self.storm_threshold:
+            self.storm = True
+            self.digest_started = now
+            self.stats["storms"] += 1
+            logging.warning(f"🌪️ Alert storm detected ({rate} alerts in {self.storm_window}s), switching to digest mode")
+        elif self.storm and rate < self.storm_threshold / 2:
+            self.storm = False
+            self.digest_pending = True
+            logging.info(f"🌤️ Alert storm ended ({rate} alerts in {self.storm_window}s), back to per-group messages")
+
+    def flush(self, now=None):
+        """기간이 지난 그룹을 요약 문자로 전송 (폭주 중이면 digest_interval마다 다이제스트 한 건)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            self._update_storm(now)
+            if self.storm:
+                if not self.groups or now - self.digest_started < self.digest_interval:
+                    return
+                groups, self.groups = self.groups, {}
+                jobs = [self._digest(groups, now - self.digest_started)]
+                self.digest_started = now
+                self.stats["digests"] += 1
+            elif self.digest_pending:
+                # 폭주가 끝난 직후 남은 그룹은 다이제스트 한 건으로 정리
+                self.digest_pending = False
+                if not self.groups:
+                    return
+                groups, self.groups = self.groups, {}
+                jobs = [self._digest(groups, now - self.digest_started)]
+                self.stats["digests"] += 1
+            else:
+                expired = [key for key, group in self.groups.items() if now - group["first_seen"] >= self.window]
+                jobs = [self._summarize(self.groups.pop(key)) for key in expired]
+            self.stats["emitted"] += len(jobs)
+
+        for job in jobs:
+            self.emit(job)
+
+    def _summarize(self, group):
+        job = dict(group["job"], ids=group["ids"], attempts=group["attempts"],
+                   done_recipients=sorted(group["done_recipients"]))
+        if group["count"] == 1:
+            return job
+        detail = f"발생 {group['firing']}건" + (f", 해결 {group['resolved']}건" if group["resolved"] else "")
+        return dict(job, message=f"{job['message']} (최근 {self.window}초간 {group['count']}건: {detail})")
+
+    def _digest(self, groups, elapsed):
+        total = sum(group["count"] for group in groups.values())
+        ranked = sorted(groups.items(), key=lambda item: -item[1]["count"])
+        items = [f"{alert_name}@{instance} {group['count']}건"
+                 for (alert_name, instance), group in ranked[:self.digest_max_items]]
+        if len(ranked) > self.digest_max_items:
+            items.append(f"외 {len(ranked) - self.digest_max_items}개 그룹")
+        message = f"[알림 폭주] 최근 {elapsed:.0f}초간 알림 {total}건 ({len(groups)}개 그룹): " + ", ".join(items)
+        return {"alert_name": "AlertDigest", "instance": f"{len(groups)} groups", "status": "firing",
+                "message": message, "ids": [alert_id for group in groups.values() for alert_id in group["ids"]],
+                "attempts": max(group["attempts"] for group in groups.values()),
+                "done_recipients": sorted(set.intersection(*(group["done_recipients"] for group in groups.values())))}
+
+    def run(self, interval=1.0):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("❌ Alert coalescer flush failed")
+
+    def start(self):
+        """주기적으로 flush하는 스레드 시작 (이미 시작했으면 무시)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="alert-coalescer", daemon=True)
+            self.thread.start()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, groups=len(self.groups), storm=self.storm,
+                        recent_alerts=len(self.received))
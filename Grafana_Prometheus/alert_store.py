@@ -0,0 +1,302 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class AlertStore:
+    """디스크(SQLite WAL) 기반 알림 보관소
+
+    - 받은 알림은 먼저 디스크에 기록한 뒤 응답 (여러 요청의 기록을 모아 한 번에 commit → fsync 횟수 감소)
+    - 메모리에는 memory_limit건까지만 올리고(claim) 나머지는 디스크에 두었다가 여유가 생기면 다시 읽음
+    - 전송 성공 시 delivered로 표시, 실패 시 다음 시도 시각을 늦춰 다시 읽음
+      (이미 받은 수신자는 done_recipients에 기록해 두고 재시도에서 제외)
+    - 재시작하면 아직 전송하지 않은 알림을 디스크에서 다시 읽어 전송 (replay)
+    - 전송이 끝난 알림은 주기적으로 삭제하고 WAL/빈 페이지 정리 (compaction)
+    - 여러 프로세스가 같은 파일을 열 수 있음 (전송/정리는 compaction=True인 전송 담당 프로세스 하나만)
+    """
+
+    def __init__(self, path, commit_interval=0.05, memory_limit=1000,
+                 retry_base=5, retry_max=300, max_age=86400, compact_interval=60, compaction=True,
+                 count_interval=5):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.memory_limit = memory_limit
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_age = max_age
+        self.compact_interval = compact_interval
+        self.compaction = compaction  # False면 전송 완료 알림 삭제/파일 정리를 하지 않음
+        self.auto_vacuum_checked = False  # 기존 파일의 auto_vacuum 전환은 첫 compaction에서 한 번만 확인
+        self.count_interval = count_interval  # 다른 프로세스의 기록/전송을 반영해 미전송 건수를 다시 세는 간격 (초)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = self._connect(auto_vacuum=True)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY,
+                created REAL NOT NULL,
+                state INTEGER NOT NULL DEFAULT 0,  -- 0: 전송 대기, 1: 전송 완료, 2: 만료
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL,
+                done_recipients TEXT NOT NULL DEFAULT '[]'  -- 받았거나 다시 보내지 않을 수신자 (JSON 목록)
+            )
+        """)
+        self._add_column("alerts", "done_recipients", "TEXT NOT NULL DEFAULT '[]'")
+        self.db.execute("CREATE INDEX IF NOT EXISTS alerts_pending ON alerts (state, next_attempt, id)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated REAL NOT NULL)")
+        self.reader = self._connect()
+        self.read_lock = threading.Lock()
+        self.pending = self._count_pending()
+
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.ops = []         # commit 대기 중인 작업 [(종류, 인자, 완료 이벤트, 결과)]
+        self.claimed = set()  # 메모리에 올라가 있는 알림 id
+        self.closed = False
+        self.stats = {"stored": 0, "delivered": 0, "retried": 0, "expired": 0, "commits": 0, "compactions": 0}
+        self.writer = threading.Thread(target=self._write_loop, name="alert-store-writer", daemon=True)
+        self.writer.start()
+        if self.pending:
+            logging.info(f"💾 Alert store {path}: {self.pending} unsent alerts to replay")
+
+    def _count_pending(self):
+        with self.read_lock:
+            return self.reader.execute("SELECT COUNT(*) FROM alerts WHERE state = 0").fetchone()[0]
+
+    def _connect(self, auto_vacuum=False):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        if auto_vacuum:
+            # 새 파일은 WAL 전환 전에 설정해야 적용됨 (WAL 전환 시 파일 헤더가 기록되어 이후 설정은 무시됨)
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = FULL")  # commit마다 WAL fsync (commit은 모아서 실행)
+        return connection
+
+    def _add_column(self, table, column, definition):
+        """이전 버전에서 만든 파일에 없는 컬럼 추가 (다른 프로세스가 먼저 추가했으면 무시)"""
+        columns = [row[1] for row in self.db.execute(f"PRAGMA table_info({table})")]
+        if column in columns:
+            return
+        try:
+            self.db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" not in str(e):
+                raise
+
+    def _enable_auto_vacuum(self):
+        """auto_vacuum 없이 만들어진 기존 파일을 INCREMENTAL로 전환 (한 번만 VACUUM으로 파일 재작성)"""
+        self.auto_vacuum_checked = True
+        try:
+            if self.db.execute("PRAGMA auto_vacuum").fetchone()[0] != 0:
+                return
+            started = time.time()
+            self.db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.db.execute("VACUUM")
+            logging.info(f"💾 Alert store {self.path}: enabled incremental auto_vacuum ({time.time() - started:.1f}s)")
+        except sqlite3.Error:
+            logging.exception("❌ Alert store auto_vacuum migration failed (compaction will not shrink the file)")
+
+    # 🔹 기록 (writer 스레드가 모아서 commit)
+    def _submit(self, kind, args, wait):
+        done = threading.Event() if wait else None
+        op = [kind, args, done, None]
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("alert store is closed")
+            self.ops.append(op)
+            self.cond.notify()
+        if wait:
+            done.wait()
+            if isinstance(op[3], Exception):
+                raise op[3]
+        return op[3]
+
+    def append(self, jobs):
+        """알림 기록 (디스크에 commit될 때까지 기다린 뒤 id 목록 반환)"""
+        return self._submit("insert", [json.dumps(job, ensure_ascii=False) for job in jobs], wait=True)
+
+    def ack(self, ids):
+        """전송 완료 표시 (commit 후 메모리에서 내려놓음)"""
+        self._submit("ack", list(ids), wait=False)
+
+    def retry(self, ids, attempts=0, done_recipients=()):
+        """전송 실패: 재시도 간격(지수 증가)이 지난 뒤 다시 읽도록 표시 (commit 후 메모리에서 내려놓음)
+
+        done_recipients(이미 받았거나 다시 보내지 않을 수신자)는 알림별로 기록해 두고 재시도에서 제외한다.
+        """
+        delay = min(self.retry_max, self.retry_base * (2 ** attempts))
+        self._submit("retry", (list(ids), time.time() + delay, set(done_recipients)), wait=False)
+
+    def put_meta(self, key, value):
+        """프로세스 사이에 공유할 값 기록 (예: 전송 담당 프로세스의 상태)"""
+        self._submit("meta", (key, json.dumps(value, ensure_ascii=False)), wait=False)
+
+    def get_meta(self, key):
+        """put_meta로 기록한 값과 기록 시각 반환 (없으면 (None, None))"""
+        with self.read_lock:
+            row = self.reader.execute("SELECT value, updated FROM meta WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def _write_loop(self):
+        last_compact = last_count = time.monotonic()
+        while True:
+            with self.cond:
+                while not self.ops and not self.closed:
+                    if not self.cond.wait(timeout=min(self.compact_interval, self.count_interval)):
+                        break
+                closing = self.closed
+            if not closing and self.commit_interval:
+                time.sleep(self.commit_interval)  # 잠시 기다려 여러 요청의 기록을 한 번에 commit
+            with self.cond:
+                ops, self.ops = self.ops, []
+            if ops:
+                self._commit(ops)
+            if self.compaction and time.monotonic() - last_compact >= self.compact_interval:
+                self.compact()
+                last_compact = time.monotonic()
+            if time.monotonic() - last_count >= self.count_interval:
+                self._refresh_pending()
+                last_count = time.monotonic()
+            if closing and not self.ops:
+                return
+
+    def _commit(self, ops):
+        now = time.time()
+        try:
+            self.db.execute("BEGIN")
+            for op in ops:
+                kind, args = op[0], op[1]
+                if kind == "insert":
+                    ids = []
+                    for payload in args:
+                        cursor = self.db.execute("INSERT INTO alerts (created, payload) VALUES (?, ?)", (now, payload))
+                        ids.append(cursor.lastrowid)
+                    op[3] = ids
+                elif kind == "ack":
+                    op[3] = self.db.executemany("UPDATE alerts SET state = 1 WHERE id = ? AND state = 0",
+                                                [(alert_id,) for alert_id in args]).rowcount
+                elif kind == "meta":
+                    self.db.execute("INSERT OR REPLACE INTO meta (key, value, updated) VALUES (?, ?, ?)",
+                                    (args[0], args[1], now))
+                elif kind == "retry":
+                    ids, next_attempt, done_recipients = args
+                    for alert_id in ids:
+                        row = self.db.execute("SELECT done_recipients FROM alerts WHERE id = ? AND state = 0",
+                                              (alert_id,)).fetchone()
+                        if row is None:
+                            continue
+                        done = json.dumps(sorted(set(json.loads(row[0])) | done_recipients), ensure_ascii=False)
+                        self.db.execute("UPDATE alerts SET attempts = attempts + 1, next_attempt = ?, "
+                                        "done_recipients = ? WHERE id = ?", (next_attempt, done, alert_id))
+            self.db.execute("COMMIT")
+        except Exception as e:
+            logging.exception("❌ Alert store commit failed")
+            try:
+                self.db.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            for op in ops:
+                op[3] = e
+        else:
+            with self.lock:
+                for op in ops:
+                    if op[0] == "insert":
+                        self.pending += len(op[3])
+                        self.stats["stored"] += len(op[3])
+                    elif op[0] == "ack":
+                        self.pending = max(0, self.pending - op[3])
+                        self.stats["delivered"] += op[3]
+                    elif op[0] == "retry":
+                        self.stats["retried"] += len(op[1][0])
+                self.stats["commits"] += 1
+        for op in ops:
+            if op[0] == "ack":
+                self.release(op[1])
+            elif op[0] == "retry":
+                self.release(op[1][0])
+            if op[2]:
+                op[2].set()
+
+    def compact(self):
+        """전송이 끝난 알림 삭제, 오래된 미전송 알림 만료, WAL/빈 페이지 정리"""
+        if not self.auto_vacuum_checked:
+            self._enable_auto_vacuum()
+        try:
+            expired = self.db.execute("UPDATE alerts SET state = 2 WHERE state = 0 AND created < ?",
+                                      (time.time() - self.max_age,)).rowcount
+            if expired:
+                logging.warning(f"⌛ Expired {expired} alerts older than {self.max_age}s without delivery")
+            self.db.execute("DELETE FROM alerts WHERE state != 0")
+            self.db.executescript("PRAGMA incremental_vacuum")  # 한 단계에 한 페이지씩 반환 (execute는 한 단계만 실행)
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # 반환한 페이지를 본 파일에 반영해 파일 크기 축소
+            with self.lock:
+                self.pending = max(0, self.pending - expired)
+                self.stats["expired"] += expired
+                self.stats["compactions"] += 1
+        except sqlite3.Error:
+            logging.exception("❌ Alert store compaction failed")
+
+    def _refresh_pending(self):
+        """미전송 건수를 파일에서 다시 셈 (다른 프로세스의 기록/전송 반영)"""
+        try:
+            pending = self._count_pending()
+        except sqlite3.Error:
+            logging.exception("❌ Alert store count failed")
+            return
+        with self.lock:
+            self.pending = pending
+
+    # 🔹 메모리로 읽기 (claim)
+    def try_claim(self, alert_id):
+        """메모리에 여유가 있으면 알림을 메모리에 올림 (이미 올라가 있거나 여유가 없으면 False)"""
+        with self.lock:
+            if alert_id in self.claimed or len(self.claimed) >= self.memory_limit:
+                return False
+            self.claimed.add(alert_id)
+            return True
+
+    def release(self, ids):
+        with self.lock:
+            self.claimed.difference_update(ids)
+
+    def claim_ready(self, limit):
+        """디스크에만 있는 전송 대기 알림을 메모리 여유만큼 읽어 [(id, attempts, job)] 반환
+
+        이전 시도에서 이미 받은 수신자가 있으면 job["done_recipients"]에 담는다.
+        """
+        with self.lock:
+            room = min(limit, self.memory_limit - len(self.claimed))
+            skip = len(self.claimed)
+        if room <= 0:
+            return []
+        with self.read_lock:
+            rows = self.reader.execute(
+                "SELECT id, attempts, payload, done_recipients FROM alerts "
+                "WHERE state = 0 AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (time.time(), room + skip)).fetchall()
+        claimed = []
+        for alert_id, attempts, payload, done_recipients in rows:
+            if len(claimed) < room and self.try_claim(alert_id):
+                job = json.loads(payload)
+                done_recipients = json.loads(done_recipients)
+                if done_recipients:
+                    job["done_recipients"] = done_recipients
+                claimed.append((alert_id, attempts, job))
+        return claimed
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, pending=self.pending, in_memory=len(self.claimed))
+
+    def close(self):
+        """남은 기록을 commit하고 종료"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.writer.join(timeout=10)
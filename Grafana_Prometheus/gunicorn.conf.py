@@ -0,0 +1,51 @@
+"""
+webhook.py 운영 실행 설정 (gunicorn, 멀티 프로세스 + 프로세스마다 스레드)
+
+    pip install gunicorn
+    cd /path/to/Grafana_Prometheus && gunicorn -c gunicorn.conf.py webhook:app
+
+- 워커 프로세스 여러 개가 요청을 나누어 받고, 받은 알림은 모두 ALERT_STORE_FILE(SQLite WAL)에 기록
+- 묶음 처리/SMS 전송/재시도는 DISPATCHER_LOCK_FILE 잠금을 얻은 워커 하나만 담당
+  (큐, 묶음 처리, 폭주 판단이 워커마다 나뉘지 않음 / 전송 담당 워커가 죽으면 다른 워커가 이어받음)
+- ALERT_STORE_FILE = None이면 워커끼리 알림을 공유할 수 없으므로 워커 1개로 실행
+
+systemd 예시 (/etc/systemd/system/webhook.service)
+    [Service]
+    WorkingDirectory=/path/to/Grafana_Prometheus
+    ExecStart=/usr/local/bin/gunicorn -c gunicorn.conf.py webhook:app
+    ExecReload=/bin/kill -HUP $MAINPID
+    Restart=always
+"""
+import logging
+
+import webhook
+
+# 🔹 서버 설정
+bind = "0.0.0.0:9200"
+worker_class = "gthread"  # 워커마다 스레드로 동시 요청 처리 (디스크 commit 대기 중에도 다른 요청 처리)
+workers = 4
+threads = 32
+backlog = 2048            # 알림이 몰릴 때 대기할 수 있는 연결 수
+keepalive = 5             # Alertmanager 연결 재사용 (초)
+timeout = 30
+graceful_timeout = 30
+preload_app = False       # 스레드(기록/전송)는 fork 후 워커마다 시작해야 함
+
+# 🔹 로그 설정
+accesslog = None          # 알림 내용은 webhook.py의 LOG_FILE에 기록
+errorlog = "/var/log/WebHook/gunicorn.log"
+loglevel = "info"
+
+config_error = webhook.check_config()
+if config_error:
+    logging.error(f"❌ {config_error}")
+    raise SystemExit(f"❌ {config_error}")
+
+if not webhook.ALERT_STORE_FILE and workers > 1:
+    logging.warning("⚠️ ALERT_STORE_FILE is not set, running gunicorn with a single worker")
+    workers = 1
+
+
+def post_worker_init(worker):
+    """워커 프로세스마다 알림 보관소를 열고 전송 담당 선출 시작"""
+    webhook.init_worker()
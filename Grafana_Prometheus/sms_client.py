@@ -0,0 +1,138 @@
+import http.client
+import logging
+import queue
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SMSSendError(Exception):
+    """SMS 전송 실패 (재시도 후에도 실패한 수신자 목록 포함)"""
+
+    def __init__(self, failures, sent=(), permanent=()):
+        self.failures = failures           # [(phone, 오류 설명)]
+        self.sent = list(sent)             # 전송에 성공한 수신자 (다시 보내지 않음)
+        self.permanent = set(permanent)    # 4xx 응답으로 실패한 수신자 (재시도해도 실패하므로 다시 보내지 않음)
+        super().__init__(", ".join(f"{phone}: {detail}" for phone, detail in failures))
+
+
+class SMSClient:
+    """SMS 전송 API용 HTTP 클라이언트
+
+    - keep-alive 연결을 풀에 보관하고 재사용 (메시지마다 curl 프로세스와 TCP 연결을 새로 만들지 않음)
+    - 수신자별 요청을 동시에 전송
+    - 연결 오류, 시간 초과, 5xx 응답은 지수 백오프로 재시도 (4xx는 재시도하지 않음)
+    """
+
+    def __init__(self, url, contacts, pool_size=8, timeout=5.0, retries=2, backoff=0.5):
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"invalid SMS_SEND_URL: {url}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path += f"?{parsed.query}"
+        self.contacts = [phone for phone in contacts if phone]
+        if not self.contacts:
+            logging.error("❌ No SMS contacts configured, alerts will not be delivered until SMS_CONTACTS is set")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        # 동시 요청 수 = 풀의 최대 연결 수
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.idle = queue.LifoQueue()  # 재사용 대기 중인 연결 (최근 사용한 연결부터 재사용)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sms-http")
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, body):
+        """요청 하나 전송 (재사용한 연결이 서버 쪽에서 끊겼으면 새 연결로 한 번 더 시도)"""
+        headers = {"Content-Type": "application/x-www-form-urlencoded", "Connection": "keep-alive"}
+        with self.slots:
+            try:
+                connection, reused = self.idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._connect(), False
+
+            while True:
+                try:
+                    connection.request("POST", self.path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    data = response.read().decode("utf-8", "replace")
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    connection.close()
+                    if not reused:
+                        raise
+                    connection, reused = self._connect(), False
+                    continue
+                except Exception:
+                    connection.close()
+                    raise
+
+                if response.will_close:
+                    connection.close()
+                else:
+                    self.idle.put(connection)
+                return response.status, data
+
+    def send_one(self, phone, message):
+        """수신자 한 명에게 전송 (응답 내용 반환, 재시도 후에도 실패하면 예외)"""
+        body = urllib.parse.urlencode({"msg": message, "phone": phone})
+        for attempt in range(self.retries + 1):
+            try:
+                status, data = self._request(body)
+                if status < 500:
+                    if status >= 400:
+                        raise SMSSendError([(phone, f"HTTP {status}: {data.strip()[:200]}")], permanent=[phone])
+                    return data
+                error = f"HTTP {status}: {data.strip()[:200]}"
+            except SMSSendError:
+                raise
+            except (OSError, http.client.HTTPException) as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.retries:
+                delay = self.backoff * (2 ** attempt)
+                logging.warning(f"🔁 SMS retry {attempt + 1}/{self.retries} to {phone} in {delay:.1f}s ({error})")
+                time.sleep(delay / 2 + random.uniform(0, delay / 2))
+        raise SMSSendError([(phone, error)])
+
+    def send(self, message, skip=()):
+        """skip(이미 받은 수신자)을 뺀 모든 수신자에게 동시에 전송
+
+        일부 수신자가 실패해도 나머지는 전송한 뒤 SMSSendError (성공/영구 실패 수신자 포함)
+        """
+        if not self.contacts:
+            # 아무에게도 보내지 않았으므로 전송 완료로 처리되지 않도록 실패로 알림
+            raise SMSSendError([("-", "no SMS contacts configured")])
+        futures = {phone: self.executor.submit(self.send_one, phone, message)
+                   for phone in self.contacts if phone not in skip}
+        failures, sent, permanent = [], [], set()
+        for phone, future in futures.items():
+            try:
+                response = future.result()
+                sent.append(phone)
+                logging.info(f"✅ Alert sent to {phone}, SMS API Response: {response.strip()[:200]}")
+            except SMSSendError as e:
+                failures.extend(e.failures)
+                permanent |= e.permanent
+            except Exception as e:
+                failures.append((phone, f"{type(e).__name__}: {e}"))
+        if failures:
+            raise SMSSendError(failures, sent=sent, permanent=permanent)
+        return len(futures)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
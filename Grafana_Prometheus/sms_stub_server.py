@@ -0,0 +1,87 @@
+"""
+SMS 전송 API 테스트용 스텁 서버
+운영 SMS API(smssend.php) 대신 실행하여 webhook.py의 SMS 전송을 실제 문자 발송 없이 확인
+
+    python3 sms_stub_server.py --port 9300
+    webhook.py의 SMS_SEND_URL = "http://127.0.0.1:9300/smssend.php"
+
+- POST (msg, phone 폼 데이터): 받은 문자를 기록하고 "OK" 응답 (keep-alive 지원)
+- GET /messages: 받은 문자 목록 (JSON)
+- --delay, --fail-rate: 응답 지연과 무작위 500 응답으로 재시도/시간 초과 동작 확인
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+messages = []
+messages_lock = threading.Lock()
+
+
+class SMSStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 연결 재사용 확인용
+    delay = 0.0
+    fail_rate = 0.0
+
+    def reply(self, status, body, content_type="text/plain; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode("utf-8"))
+        phone = form.get("phone", [""])[0]
+        message = form.get("msg", [""])[0]
+
+        if self.delay:
+            time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            self.reply(500, "FAIL")
+            return
+
+        with messages_lock:
+            messages.append({"time": time.time(), "phone": phone, "msg": message,
+                             "client_port": self.client_address[1]})
+        self.reply(200, "OK")
+
+    def do_GET(self):
+        if self.path != "/messages":
+            self.reply(404, "Not Found")
+            return
+        with messages_lock:
+            body = json.dumps(messages, ensure_ascii=False)
+        self.reply(200, body, "application/json; charset=utf-8")
+
+    def log_message(self, format, *args):
+        print(f"📨 {self.address_string()} - {format % args}")
+
+
+def serve(host="127.0.0.1", port=9300, delay=0.0, fail_rate=0.0):
+    """스텁 서버 생성 (serve_forever()는 호출하는 쪽에서 실행)"""
+    handler = type("Handler", (SMSStubHandler,), {"delay": delay, "fail_rate": fail_rate})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SMS 전송 API 테스트용 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9300)
+    parser.add_argument("--delay", type=float, default=0.0, help="응답 지연 시간 (초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.delay, args.fail_rate)
+    print(f"🚀 SMS stub server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
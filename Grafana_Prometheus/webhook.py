@@ -1,13 +1,78 @@
+import atexit
+import fcntl
 import logging
 from flask import Flask, request
+import os
+import queue
+import re
 import subprocess
+import threading
+import time
 import traceback
 
+from alert_coalescer import AlertCoalescer
+from alert_store import AlertStore
+from sms_client import SMSClient, SMSSendError
+
 app = Flask(__name__)
 
 SMS_SCRIPT = "/root/Check_SMS/Prometheus_sms.sh"
 LOG_FILE = "/var/log/WebHook/WebHook.log"
 
+# 🔹 SMS 전송 설정
+#   http   : 내장 HTTP 클라이언트로 SMS_SEND_URL에 직접 전송 (keep-alive 연결 재사용, 수신자별 동시 전송)
+#   script : 알림마다 SMS_SCRIPT 실행 (기존 방식)
+SMS_SENDER = "http"
+SMS_SEND_URL = "http://apiserver/smssend.php"
+SMS_CONTACTS = ["", ""]     # 여러 개의 연락처 (비어 있으면 시작하지 않음)
+SMS_POOL_SIZE = 8           # SMS API 최대 동시 연결 수
+SMS_HTTP_TIMEOUT = 5        # SMS API 연결/응답 제한 시간 (초)
+SMS_RETRY_COUNT = 2         # 연결 오류/시간 초과/5xx 응답 시 재시도 횟수
+SMS_RETRY_BACKOFF = 0.5     # 재시도 대기 기본 시간 (초), 재시도마다 2배
+
+# 🔹 알림 전송 큐 설정
+# 요청은 검증 후 큐에 넣고 바로 202로 응답하며, 실제 SMS 전송은 워커 스레드가 처리
+ALERT_QUEUE_SIZE = 1000     # 큐에 쌓아 둘 최대 알림 수
+ALERT_WORKERS = 4           # 동시에 SMS를 전송할 워커 수
+SMS_TIMEOUT = 30            # SMS 스크립트 실행 제한 시간 (초)
+
+# 큐가 가득 찼을 때 처리 방법
+#   reject      : 503 + Retry-After로 응답하여 Alertmanager가 다시 보내도록 함 (backpressure)
+#   drop_oldest : 가장 오래된 알림을 버리고 새 알림을 넣음
+#   drop_newest : 새 알림을 버리고 202로 응답
+QUEUE_FULL_POLICY = "reject"
+RETRY_AFTER_SECONDS = 10    # reject 시 Retry-After 헤더 값 (초)
+
+# 🔹 알림 묶음 설정
+# 같은 alertname/instance 알림은 COALESCE_WINDOW초 동안 모아 요약 문자 한 건으로 전송 (0이면 알림마다 전송)
+# STORM_WINDOW초 동안 받은 알림이 STORM_THRESHOLD건을 넘으면 DIGEST_INTERVAL초마다 전체 요약 한 건만 전송
+COALESCE_WINDOW = 30
+STORM_THRESHOLD = 50
+STORM_WINDOW = 60
+DIGEST_INTERVAL = 300
+DIGEST_MAX_ITEMS = 5        # 다이제스트 문자에 표시할 최대 그룹 수
+
+# 🔹 알림 디스크 보관 설정 (SQLite WAL)
+# 받은 알림은 디스크에 기록한 뒤 응답하고, 전송에 성공하면 완료 표시 (재시작/SMS API 장애 시에도 유실 없음)
+# 메모리에는 ALERT_MEMORY_LIMIT건까지만 올리고 나머지는 디스크에서 대기 (이 경우 QUEUE_FULL_POLICY 대신 디스크에 보관)
+ALERT_STORE_FILE = "/var/lib/WebHook/alerts.db"  # None이면 디스크에 보관하지 않음
+ALERT_STORE_COMMIT_INTERVAL = 0.05  # 여러 요청의 기록을 모아 commit(fsync)하는 간격 (초)
+ALERT_MEMORY_LIMIT = 1000           # 메모리에 올려 둘 최대 알림 수
+ALERT_STORE_MAX_PENDING = 100000    # 디스크에 쌓아 둘 최대 미전송 알림 수 (초과 시 503 + Retry-After)
+ALERT_RETRY_BASE = 5                # 전송 실패 시 재시도 간격 기본값 (초, 실패마다 2배)
+ALERT_RETRY_MAX = 300               # 재시도 간격 최대값 (초)
+ALERT_MAX_AGE = 86400               # 이 시간(초) 안에 전송하지 못한 알림은 폐기
+ALERT_COMPACT_INTERVAL = 60         # 전송 완료 알림 삭제 및 파일 정리 간격 (초)
+ALERT_REPLAY_INTERVAL = 0.5         # 디스크에서 대기 중인 알림을 확인하는 간격 (초)
+
+# 🔹 다중 워커 실행 설정 (gunicorn -c gunicorn.conf.py webhook:app)
+# 모든 워커 프로세스가 요청을 받아 ALERT_STORE_FILE에 기록하고, DISPATCHER_LOCK_FILE 잠금(fcntl)을 얻은
+# 워커 하나만 묶음 처리/SMS 전송/파일 정리를 맡음 (다른 워커가 기록한 알림은 디스크에서 읽어 옴)
+# 전송 담당 워커가 종료되면 잠금이 풀리고 다른 워커가 이어받음
+DISPATCHER_LOCK_FILE = "/var/lib/WebHook/dispatcher.lock"
+LEADER_RETRY_INTERVAL = 5           # 전송 담당 잠금 재시도 간격 (초)
+STATUS_PUBLISH_INTERVAL = 5         # 전송 담당 워커가 /status용 상태를 파일에 기록하는 간격 (초)
+
 # 🔹 로그 설정
 logging.basicConfig(
     filename=LOG_FILE,
@@ -16,53 +81,323 @@ logging.basicConfig(
     encoding="utf-8",
 )
 
+alert_queue = queue.Queue(maxsize=ALERT_QUEUE_SIZE)
+enqueue_lock = threading.Lock()
+stats_lock = threading.Lock()
+stats = {"accepted": 0, "rejected": 0, "dropped": 0, "spilled": 0, "sent": 0, "failed": 0}
+workers = []
+sms_client = None
+coalescer = None
+alert_store = None
+leader_lock = None
+
+
+def count(key, amount=1):
+    with stats_lock:
+        stats[key] += amount
+
+
+def validate_payload(data):
+    """Alertmanager webhook 페이로드 검증 (오류 메시지 반환, 정상이면 None)"""
+    if not isinstance(data, dict):
+        return "payload must be a JSON object"
+    alerts = data.get("alerts")
+    if not isinstance(alerts, list):
+        return "'alerts' must be a list"
+    for index, alert in enumerate(alerts):
+        if not isinstance(alert, dict):
+            return f"alerts[{index}] must be an object"
+        for key in ("labels", "annotations"):
+            if not isinstance(alert.get(key, {}), dict):
+                return f"alerts[{index}].{key} must be an object"
+    return None
+
+
+def build_message(alert):
+    """알림 하나를 SMS 문자 내용으로 변환"""
+    alert_status = alert.get("status", "firing")  # firing 또는 resolved
+    instance = alert.get("labels", {}).get("instance", "알 수 없는 서버")
+
+    if alert_status == "resolved":
+        summary = f"[해결] {alert.get('annotations', {}).get('summary', '[알림] 서버 이벤트 해결')}"
+        description = alert.get("annotations", {}).get(
+            "description", "No description available."
+        )
+    else:
+        summary = alert.get("annotations", {}).get("summary", f"[알림] {instance} 서버 이벤트 발생")
+        description = alert.get("annotations", {}).get(
+            "description", "No description available."
+        )
+
+    # 문자 내용 구성
+    message = f"{summary}\n{description}"
+    message = " ".join(message.split())
+    message = "".join(c for c in message if c.isprintable())
+
+    # 소수점 처리 (소수점 2자리까지만 표시)
+    message = re.sub(r'(\d+\.\d{3,})', lambda m: f"{float(m.group(1)):.2f}", message)
+    return message
+
+
+def enqueue(job):
+    """큐에 알림 추가 (QUEUE_FULL_POLICY에 따라 처리, 큐에 넣었으면 True)"""
+    try:
+        alert_queue.put_nowait(job)
+        return True
+    except queue.Full:
+        pass
+
+    if alert_store:
+        # 디스크에 이미 기록되어 있으므로 메모리에서만 내려놓고 나중에 다시 읽음
+        alert_store.release(job["ids"])
+        count("spilled")
+        return True
+
+    if QUEUE_FULL_POLICY == "drop_oldest":
+        try:
+            dropped = alert_queue.get_nowait()
+            alert_queue.task_done()
+            count("dropped")
+            logging.warning(f"🗑️ Queue full, dropped oldest alert: {dropped['alert_name']} from {dropped['instance']}")
+        except queue.Empty:
+            pass
+        try:
+            alert_queue.put_nowait(job)
+            return True
+        except queue.Full:
+            pass
+
+    count("dropped")
+    logging.warning(f"🗑️ Queue full, dropped alert: {job['alert_name']} from {job['instance']}")
+    return False
+
+
+def send_alert(job):
+    """SMS 알림 전송 (실패해도 다른 알림 전송에는 영향 없음)"""
+    if SMS_SENDER == "http":
+        sms_client.send(job["message"], skip=job.get("done_recipients", ()))
+        return
+
+    result = subprocess.run(
+        [SMS_SCRIPT, job["message"]],
+        shell=False,
+        check=True,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        timeout=SMS_TIMEOUT,
+    )
+    logging.info(f"✅ SMS Script Output: {result.stdout}")
+    if result.stderr:
+        logging.warning(f"⚠️ SMS Script Error: {result.stderr}")
+
+
+def dispatch(job):
+    """알림을 묶음 처리 또는 전송 큐로 전달"""
+    if coalescer:
+        coalescer.add(job)
+    else:
+        enqueue(job)
+
+
+def worker_loop():
+    while True:
+        job = alert_queue.get()
+        try:
+            send_alert(job)
+            count("sent")
+            if alert_store:
+                alert_store.ack(job["ids"])
+        except SMSSendError as e:
+            # 받은 수신자와 4xx(잘못된 번호 등)로 거절된 수신자는 다시 보내지 않고 나머지 수신자에게만 재시도
+            count("failed")
+            retryable = [phone for phone, _ in e.failures if phone not in e.permanent]
+            for phone, detail in e.failures:
+                if phone in e.permanent:
+                    logging.error(f"❌ SMS rejected for {phone}, not retrying: {job['alert_name']} from {job['instance']} ({detail})")
+            if retryable:
+                logging.error(f"❌ SMS send failed to {retryable}: {job['alert_name']} from {job['instance']} ({e})")
+            if alert_store:
+                if retryable:
+                    done = set(job.get("done_recipients", ())) | set(e.sent) | e.permanent
+                    alert_store.retry(job["ids"], job.get("attempts", 0), done)
+                else:
+                    alert_store.ack(job["ids"])
+        except Exception:
+            count("failed")
+            logging.error(f"❌ SMS send failed: {job['alert_name']} from {job['instance']}\n{traceback.format_exc()}")
+            if alert_store:
+                alert_store.retry(job["ids"], job.get("attempts", 0), job.get("done_recipients", ()))
+        finally:
+            alert_queue.task_done()
+
+
+def replay_loop():
+    """디스크에서 대기 중인 알림(다른 워커가 기록, 재시작 전 미전송, 메모리 부족으로 보관, 재시도 대기)을
+    메모리 여유만큼 읽어 전달"""
+    published = 0.0
+    while True:
+        if time.monotonic() - published >= STATUS_PUBLISH_INTERVAL:
+            alert_store.put_meta("dispatcher", dispatcher_snapshot())
+            published = time.monotonic()
+
+        ready = []
+        # 묶음 처리를 거치지 않으면 전송 큐의 빈 자리만큼만 읽음 (큐가 가득 차서 다시 내려놓는 일이 없도록)
+        limit = ALERT_MEMORY_LIMIT if coalescer else alert_queue.maxsize - alert_queue.qsize()
+        try:
+            if limit > 0:
+                ready = alert_store.claim_ready(limit)
+            for alert_id, attempts, job in ready:
+                dispatch(dict(job, ids=[alert_id], attempts=attempts))
+        except Exception:
+            logging.error(f"❌ Alert replay failed\n{traceback.format_exc()}")
+        # 읽을 알림이 더 있거나 큐 자리를 기다리는 중이면 짧게, 디스크에 대기 알림이 없으면 ALERT_REPLAY_INTERVAL만큼 대기
+        time.sleep(0.1 if ready or limit <= 0 else ALERT_REPLAY_INTERVAL)
+
+
+def check_config():
+    """시작 전 설정 확인 (오류 메시지 반환, 정상이면 None)"""
+    if SMS_SENDER == "http" and not [phone for phone in SMS_CONTACTS if phone]:
+        return "SMS_CONTACTS is empty, no one would receive alerts"
+    return None
+
+
+def open_store(compaction=True):
+    """알림 보관소 열기 (ALERT_STORE_FILE이 None이거나 이미 열었으면 무시)"""
+    global alert_store
+    if ALERT_STORE_FILE and alert_store is None:
+        alert_store = AlertStore(ALERT_STORE_FILE, commit_interval=ALERT_STORE_COMMIT_INTERVAL,
+                                 memory_limit=ALERT_MEMORY_LIMIT, retry_base=ALERT_RETRY_BASE,
+                                 retry_max=ALERT_RETRY_MAX, max_age=ALERT_MAX_AGE,
+                                 compact_interval=ALERT_COMPACT_INTERVAL, compaction=compaction)
+        atexit.register(alert_store.close)
+
+
+def start_workers():
+    """SMS 전송 워커 시작 (이미 시작했으면 무시)"""
+    global sms_client, coalescer
+    if workers:
+        return
+    open_store()
+    if alert_store:
+        alert_store.compaction = True
+    if COALESCE_WINDOW > 0:
+        coalescer = AlertCoalescer(enqueue, window=COALESCE_WINDOW, storm_threshold=STORM_THRESHOLD,
+                                   storm_window=STORM_WINDOW, digest_interval=DIGEST_INTERVAL,
+                                   digest_max_items=DIGEST_MAX_ITEMS)
+        coalescer.start()
+    if SMS_SENDER == "http":
+        sms_client = SMSClient(SMS_SEND_URL, SMS_CONTACTS, pool_size=SMS_POOL_SIZE, timeout=SMS_HTTP_TIMEOUT,
+                               retries=SMS_RETRY_COUNT, backoff=SMS_RETRY_BACKOFF)
+    for index in range(ALERT_WORKERS):
+        worker = threading.Thread(target=worker_loop, name=f"sms-worker-{index}", daemon=True)
+        worker.start()
+        workers.append(worker)
+    if alert_store:
+        threading.Thread(target=replay_loop, name="alert-replay", daemon=True).start()
+    logging.info(f"🚀 Started {ALERT_WORKERS} SMS workers in pid {os.getpid()} (sender {SMS_SENDER}, queue size {ALERT_QUEUE_SIZE}, policy {QUEUE_FULL_POLICY})")
+
+
+def leader_loop():
+    """전송 담당 잠금을 얻을 때까지 재시도하고, 얻으면 이 프로세스에서 SMS 전송 워커 시작"""
+    global leader_lock
+    lock_file = open(DISPATCHER_LOCK_FILE, "a+")
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except OSError:
+            time.sleep(LEADER_RETRY_INTERVAL)
+    leader_lock = lock_file  # 프로세스가 끝날 때까지 잠금 유지
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(f"{os.getpid()}\n")
+    lock_file.flush()
+    logging.info(f"👑 pid {os.getpid()} is now the alert dispatcher")
+    start_workers()
+
+
+def init_worker():
+    """다중 워커 실행 시 워커 프로세스마다 호출 (gunicorn.conf.py의 post_worker_init)
+
+    알림 보관소를 열어 요청을 받을 준비를 하고, 전송 담당(리더) 선출은 백그라운드에서 계속 시도한다.
+    ALERT_STORE_FILE이 없으면 워커끼리 알림을 공유할 수 없으므로 워커마다 따로 전송한다.
+    """
+    if not ALERT_STORE_FILE:
+        logging.warning("⚠️ ALERT_STORE_FILE is not set, every worker dispatches its own alerts")
+        start_workers()
+        return
+    directory = os.path.dirname(DISPATCHER_LOCK_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    open_store(compaction=False)
+    threading.Thread(target=leader_loop, name="dispatcher-election", daemon=True).start()
+
+
+def dispatcher_snapshot():
+    """전송 담당 프로세스 상태 (/status에서 사용)"""
+    with stats_lock:
+        current = dict(stats)
+    current.update(pid=os.getpid(), queue_depth=alert_queue.qsize(), queue_size=ALERT_QUEUE_SIZE,
+                   workers=len(workers), policy=QUEUE_FULL_POLICY)
+    if coalescer:
+        current["coalescer"] = coalescer.snapshot()
+    if alert_store:
+        current["store"] = alert_store.snapshot()
+    return current
+
+
 @app.route("/alert", methods=["POST"])
 def alert():
     try:
-        data = request.json
-        alerts = data.get("alerts", [])
+        data = request.get_json(silent=True)
+        error = validate_payload(data)
+        if error:
+            logging.warning(f"⚠️ Invalid payload: {error}")
+            return f"Bad Request: {error}", 400
 
-        for alert in alerts:
+        jobs = []
+        for alert in data["alerts"]:
             alert_name = alert.get("labels", {}).get("alertname", "").strip()
-            alert_status = alert.get("status", "firing")  # firing 또는 resolved
             instance = alert.get("labels", {}).get("instance", "알 수 없는 서버")
-            
-            if alert_status == "resolved":
-                summary = f"[해결] {alert.get('annotations', {}).get('summary', '[알림] 서버 이벤트 해결')}"
-                description = alert.get("annotations", {}).get(
-                    "description", "No description available."
-                )
-            else:
-                summary = alert.get("annotations", {}).get("summary", f"[알림] {instance} 서버 이벤트 발생")
-                description = alert.get("annotations", {}).get(
-                    "description", "No description available."
-                )
-
-            # 문자 내용 구성
-            message = f"{summary}\n{description}"
-            message = " ".join(message.split())
-            message = "".join(c for c in message if c.isprintable())
-            
-            # 소수점 처리 (소수점 2자리까지만 표시)
-            import re
-            message = re.sub(r'(\d+\.\d{3,})', lambda m: f"{float(m.group(1)):.2f}", message)
+            message = build_message(alert)
 
             logging.info(f"📢 Received Alert: {alert_name} from {instance}, Message: {message}")
+            jobs.append({"alert_name": alert_name, "instance": instance, "status": alert.get("status", "firing"),
+                         "message": message})
+
+        if alert_store:
+            # 디스크에 기록(commit)된 뒤에 응답하고, 메모리 여유가 없으면 디스크에서 대기
+            if alert_store.pending + len(jobs) > ALERT_STORE_MAX_PENDING:
+                count("rejected", len(jobs))
+                logging.warning(f"⏳ Alert store full ({alert_store.pending} pending), rejected {len(jobs)} alerts")
+                return "Alert store full", 503, {"Retry-After": str(RETRY_AFTER_SECONDS)}
 
-            # 🔹 SMS 알림 전송
-            result = subprocess.run(
-                [SMS_SCRIPT, message],
-                shell=False,
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-            )
-            logging.info(f"✅ SMS Script Output: {result.stdout}")
-            if result.stderr:
-                logging.warning(f"⚠️ SMS Script Error: {result.stderr}")
-
-        return "Alert received", 200
+            # 전송 담당 프로세스면 바로 전달, 아니면 전송 담당 프로세스가 디스크에서 읽어 감
+            for job, alert_id in zip(jobs, alert_store.append(jobs)):
+                if workers and alert_store.try_claim(alert_id):
+                    dispatch(dict(job, ids=[alert_id]))
+            count("accepted", len(jobs))
+            return f"Alert accepted ({len(jobs)}/{len(jobs)} stored)", 202
+
+        with enqueue_lock:
+            # 큐 공간이 부족하면 일부만 넣지 않고 전체를 거절하여 Alertmanager가 그대로 다시 보내도록 함
+            # (묶음 처리 중이면 요약 문자만 큐에 들어가므로 큐가 가득 찬 경우에만 거절)
+            needed = 1 if coalescer else len(jobs)
+            if QUEUE_FULL_POLICY == "reject" and alert_queue.maxsize - alert_queue.qsize() < needed:
+                count("rejected", len(jobs))
+                logging.warning(f"⏳ Queue full ({alert_queue.qsize()}/{alert_queue.maxsize}), rejected {len(jobs)} alerts")
+                return "Alert queue full", 503, {"Retry-After": str(RETRY_AFTER_SECONDS)}
+
+            if coalescer:
+                for job in jobs:
+                    coalescer.add(job)
+                queued = len(jobs)
+            else:
+                queued = sum(1 for job in jobs if enqueue(job))
+
+        count("accepted", queued)
+        return f"Alert accepted ({queued}/{len(jobs)} queued)", 202
 
     except Exception:
         error_message = traceback.format_exc()
@@ -70,5 +405,23 @@ def alert():
         return f"Internal Server Error: {error_message}", 500
 
 
+@app.route("/status", methods=["GET"])
+def status():
+    current = dispatcher_snapshot()
+    current["role"] = "dispatcher" if workers else "receiver"
+    if alert_store and not workers:
+        # 다른 프로세스가 전송을 맡고 있으면 마지막으로 기록한 상태도 함께 표시
+        dispatcher, updated = alert_store.get_meta("dispatcher")
+        if dispatcher:
+            current["dispatcher"] = dict(dispatcher, age_seconds=round(time.time() - updated, 1))
+    return current, 200
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=9200)
+    # 개발/단일 프로세스 실행 (운영에서는 gunicorn -c gunicorn.conf.py webhook:app)
+    config_error = check_config()
+    if config_error:
+        logging.error(f"❌ {config_error}")
+        raise SystemExit(f"❌ {config_error}")
+    start_workers()
+    app.run(host="0.0.0.0", port=9200, threaded=True)
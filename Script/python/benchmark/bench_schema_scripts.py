@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스키마 스크립트 벤치마크 (Python 3.11.9)
+목적: 운영 DB 없이 가짜 DB-API 드라이버(fake_dbapi.py)로 테넌트 데이터베이스 수천 개를 흉내 내어
+      각 스크립트의 실행 시간, 연결 수, 쿼리 수를 측정
+
+동작 방식:
+1. 가짜 서버 생성 (데이터베이스 수, 데이터베이스당 테이블 수, 연결/쿼리 지연 시간 설정)
+2. 가짜 드라이버를 psycopg2 / pymysql 대신 등록하고 스크립트의 main()을 그대로 실행
+   (메뉴 입력은 '2) 특정 테이블이 존재하는 데이터베이스 자동 검색'으로 고정)
+3. 같은 서버에서 두 번 실행하여 첫 실행(cold)과 변경 없는 재실행(warm)을 각각 측정
+4. 스크립트별 실행 시간, 연결 수, 쿼리 수, 데이터베이스당 연결/쿼리 수 출력
+
+사용법:
+    python3 bench_schema_scripts.py
+    python3 bench_schema_scripts.py --databases 3000 --tables 20 --connect-latency 0.02 --query-latency 0.002
+    python3 bench_schema_scripts.py --scripts postgresql_table --workers 1,8,32
+"""
+
+import os
+import sys
+import io
+import time
+import argparse
+import tempfile
+import importlib.util
+import contextlib
+import builtins
+from typing import List, Dict
+
+import fake_dbapi
+
+# ========================================
+# 측정 대상 스크립트 설정
+# ========================================
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (스크립트 경로, 가짜 서버 종류, 워커 수 옵션 지원 여부)
+SCRIPTS = {
+    'postgresql_table': (os.path.join(SCRIPT_DIR, 'postgresql', 'table_create_postgresql.py'), 'postgresql', True),
+    'mariadb_table': (os.path.join(SCRIPT_DIR, 'mariadb', 'table_create_mariadb.py'), 'mysql', True),
+    'mariadb_column': (os.path.join(SCRIPT_DIR, 'mariadb', 'column_check_alter_mariadb_pattern.py'), 'mysql', True),
+}
+
+DRIVER_MODULES = {'postgresql': 'psycopg2', 'mysql': 'pymysql'}
+
+
+def load_script(path: str, flavor: str, server: fake_dbapi.FakeServer):
+    """가짜 드라이버를 등록한 상태로 스크립트를 새 모듈로 읽기"""
+    sys.modules[DRIVER_MODULES[flavor]] = fake_dbapi.make_module(server, flavor)
+    module_name = f"bench_{os.path.splitext(os.path.basename(path))[0]}_{time.monotonic_ns()}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_main(module, argv: List[str]) -> str:
+    """스크립트 main() 실행 (메뉴 입력 고정, 출력은 수집하여 반환)"""
+    output = io.StringIO()
+    saved_argv, saved_input = sys.argv, builtins.input
+    sys.argv = [module.__file__] + argv
+    builtins.input = lambda prompt='': '2'
+    try:
+        with contextlib.redirect_stdout(output):
+            try:
+                module.main()
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    print(f"SystemExit({e.code})")
+    finally:
+        sys.argv, builtins.input = saved_argv, saved_input
+    return output.getvalue()
+
+
+def measure(name: str, args: argparse.Namespace, workers: int) -> List[Dict]:
+    """스크립트 하나를 cold/warm 두 번 실행하여 측정 결과 반환"""
+    path, flavor, supports_workers = SCRIPTS[name]
+    server = fake_dbapi.build_server(
+        flavor, args.databases, args.tables,
+        connect_latency=args.connect_latency, query_latency=args.query_latency, ddl_latency=args.ddl_latency)
+    argv = ['--workers', str(workers)] if supports_workers else []
+    argv += ['--metrics-file', '']  # node_exporter 디렉토리에 메트릭을 기록하지 않음
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        saved_cwd = os.getcwd()
+        os.chdir(work_dir)  # 스냅샷/리스트 파일 등은 임시 디렉토리에 생성
+        try:
+            for phase in ('cold', 'warm'):
+                module = load_script(path, flavor, server)
+                server.reset_stats()
+                started = time.perf_counter()
+                output = run_main(module, argv)
+                elapsed = time.perf_counter() - started
+                if args.verbose:
+                    print(output)
+
+                tenants = max(1, args.databases)
+                results.append({
+                    'script': name, 'workers': workers if supports_workers else 1, 'phase': phase,
+                    'seconds': elapsed, 'connections': server.connections, 'queries': server.queries,
+                    'ddl': server.ddl_statements,
+                    'connections_per_db': server.connections / tenants,
+                    'queries_per_db': server.queries / tenants,
+                    'max_queries_one_db': max(server.queries_by_db.values(), default=0),
+                    'unhandled': dict(server.unhandled),
+                })
+        finally:
+            os.chdir(saved_cwd)
+    return results
+
+
+def print_results(results: List[Dict]):
+    """측정 결과 표 출력"""
+    header = (f"{'script':<18} {'workers':>7} {'phase':<5} {'time(s)':>9} {'conns':>8} {'conns/db':>8} "
+              f"{'queries':>9} {'queries/db':>10} {'ddl':>7}")
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(f"{row['script']:<18} {row['workers']:>7} {row['phase']:<5} {row['seconds']:>9.3f} "
+              f"{row['connections']:>8} {row['connections_per_db']:>8.2f} {row['queries']:>9} "
+              f"{row['queries_per_db']:>10.2f} {row['ddl']:>7}")
+
+    unhandled = {}
+    for row in results:
+        for statement, count in row['unhandled'].items():
+            unhandled[statement] = unhandled.get(statement, 0) + count
+    if unhandled:
+        print("")
+        print("⚠️  가짜 드라이버가 해석하지 못한 쿼리 (빈 결과로 처리됨):")
+        for statement, count in sorted(unhandled.items(), key=lambda item: -item[1]):
+            print(f"   {count:>6} × {statement}")
+
+
+def parse_args() -> argparse.Namespace:
+    """명령행 옵션 파싱"""
+    parser = argparse.ArgumentParser(description="스키마 스크립트 벤치마크 (가짜 DB 드라이버 사용)")
+    parser.add_argument('--scripts', default=','.join(SCRIPTS),
+                        help=f"측정할 스크립트 (쉼표 구분, 기본값: {','.join(SCRIPTS)})")
+    parser.add_argument('--databases', type=int, default=500, help="테넌트 데이터베이스 수 (기본값: 500)")
+    parser.add_argument('--tables', type=int, default=10,
+                        help="데이터베이스당 대상 패턴 테이블 수 (기본값: 10)")
+    parser.add_argument('--connect-latency', type=float, default=0.002, help="연결당 지연 시간(초)")
+    parser.add_argument('--query-latency', type=float, default=0.0005, help="쿼리당 지연 시간(초)")
+    parser.add_argument('--ddl-latency', type=float, default=0.002, help="DDL 구문당 추가 지연 시간(초)")
+    parser.add_argument('--workers', default='1',
+                        help="워커 수 목록 (쉼표 구분, 워커 옵션을 지원하는 스크립트만 적용)")
+    parser.add_argument('--verbose', action='store_true', help="스크립트 출력도 함께 표시")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+    names = [name.strip() for name in args.scripts.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCRIPTS]
+    if unknown:
+        print(f"❌ 알 수 없는 스크립트: {unknown} (가능: {list(SCRIPTS)})")
+        sys.exit(1)
+    worker_counts = [int(value) for value in args.workers.split(',') if value.strip()]
+
+    print(f"🧪 가짜 서버: 데이터베이스 {args.databases}개 × 대상 테이블 {args.tables}개, "
+          f"연결 {args.connect_latency * 1000:.1f}ms / 쿼리 {args.query_latency * 1000:.1f}ms / "
+          f"DDL +{args.ddl_latency * 1000:.1f}ms")
+    print("")
+
+    results = []
+    for name in names:
+        counts = worker_counts if SCRIPTS[name][2] else [1]
+        for workers in counts:
+            results.extend(measure(name, args, workers))
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
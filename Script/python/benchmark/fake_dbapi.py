@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가짜 DB-API 드라이버 (벤치마크용)
+목적: 운영 DB 없이 스키마 스크립트의 확장성을 측정하기 위해
+      psycopg2 / pymysql 대신 사용할 수 있는 메모리 기반 가짜 드라이버
+
+동작 방식:
+1. FakeServer가 수천 개의 데이터베이스/테이블 상태를 메모리에 보관
+2. make_module()로 만든 모듈을 sys.modules['psycopg2'] 또는 sys.modules['pymysql']에 등록
+3. 스크립트가 실행하는 쿼리를 패턴으로 해석하여 결과를 돌려주고 상태를 변경
+4. 연결/쿼리마다 설정한 지연 시간을 넣고, 데이터베이스별 연결 수와 쿼리 수를 집계
+
+스크립트가 실행하는 쿼리만 해석하므로 범용 SQL 엔진이 아니다.
+해석하지 못한 쿼리는 빈 결과를 돌려주고 unhandled 목록에 기록한다.
+"""
+
+import re
+import time
+import types
+import threading
+from collections import defaultdict
+from typing import List, Dict, Tuple, Optional
+
+
+class FakeTable:
+    """가짜 테이블 (컬럼과 크기 정보만 보관)"""
+
+    def __init__(self, columns: Optional[Dict[str, str]] = None, rows: int = 0,
+                 row_bytes: int = 200, kind: str = 'r'):
+        self.columns = dict(columns or {'id': ''})  # 컬럼명 -> 코멘트
+        self.rows = rows
+        self.row_bytes = row_bytes
+        self.kind = kind  # 'r': 일반 테이블, 'p': 파티션 부모 테이블
+        self.algorithms = {'INSTANT', 'INPLACE', 'COPY'}  # ALTER TABLE에서 지원하는 알고리즘
+
+    @property
+    def data_length(self) -> int:
+        return self.rows * self.row_bytes
+
+
+class FakeDatabase:
+    """가짜 데이터베이스"""
+
+    def __init__(self, oid: int):
+        self.oid = oid
+        self.tables: Dict[str, FakeTable] = {}
+        self.indexes: Dict[str, Tuple[str, bool]] = {}  # 인덱스명 -> (테이블명, 유효 여부)
+        self.partitions: Dict[str, List[str]] = defaultdict(list)  # 부모 테이블 -> 파티션 목록
+        self.ledger: Optional[Dict[str, str]] = None  # change_id -> checksum (테이블이 없으면 None)
+        # metadata lock을 잡고 있는 가짜 세션 (id, 경과 초, 상태, 쿼리) - 있으면 DDL이 lock_wait_timeout으로 실패
+        self.lock_holders: List[tuple] = []
+        self.triggers: Dict[str, str] = {}  # 트리거명 -> 테이블명
+        self.osc_progress: Optional[Dict[str, tuple]] = None  # 온라인 스키마 변경 진행 상태 (테이블이 없으면 None)
+
+
+class FakeServer:
+    """가짜 DB 서버 (상태, 지연 시간, 통계)"""
+
+    def __init__(self, connect_latency: float = 0.0, query_latency: float = 0.0, ddl_latency: float = 0.0):
+        self.connect_latency = connect_latency
+        self.query_latency = query_latency
+        self.ddl_latency = ddl_latency
+        self.databases: Dict[str, FakeDatabase] = {}
+        self.threads_running = 1  # SHOW GLOBAL STATUS LIKE 'Threads_running'
+        self.replica_lag: Optional[int] = 0  # SHOW SLAVE STATUS의 Seconds_Behind_Master (None이면 복제 중지)
+        self.lock = threading.RLock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """통계 초기화"""
+        self.connections = 0
+        self.queries = 0
+        self.ddl_statements = 0
+        self.connections_by_db = defaultdict(int)
+        self.queries_by_db = defaultdict(int)
+        self.unhandled: Dict[str, int] = defaultdict(int)
+
+    def add_database(self, name: str) -> FakeDatabase:
+        """데이터베이스 추가"""
+        database = FakeDatabase(oid=16384 + len(self.databases))
+        self.databases[name] = database
+        return database
+
+    def record_connect(self, database: Optional[str]):
+        with self.lock:
+            self.connections += 1
+            self.connections_by_db[database or '(server)'] += 1
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+
+    def record_query(self, database: Optional[str], ddl: bool = False):
+        with self.lock:
+            self.queries += 1
+            self.queries_by_db[database or '(server)'] += 1
+            if ddl:
+                self.ddl_statements += 1
+        latency = self.query_latency + (self.ddl_latency if ddl else 0.0)
+        if latency:
+            time.sleep(latency)
+
+
+def build_server(flavor: str, databases: int, tables_per_db: int, reference_table: str = 'chatbot_setup',
+                 table_name_format: str = 'TEST_{:04d}_CHATING_PROCESS', rows_per_table: int = 1000,
+                 **latency) -> FakeServer:
+    """테넌트 데이터베이스가 여러 개 있는 가짜 서버 생성
+
+    flavor가 'mysql'이면 시스템 데이터베이스(mysql, information_schema)도 함께 만든다.
+    """
+    server = FakeServer(**latency)
+    if flavor == 'postgresql':
+        server.add_database('postgres')
+    else:
+        for name in ('information_schema', 'mysql', 'performance_schema'):
+            server.add_database(name)
+
+    for index in range(databases):
+        database = server.add_database(f'tenant_{index:05d}')
+        database.tables[reference_table] = FakeTable()
+        for table_index in range(tables_per_db):
+            # 뒤쪽 테이블일수록 크게 만들어 크기 편차를 둠
+            rows = rows_per_table * (1 + table_index)
+            database.tables[table_name_format.format(table_index)] = FakeTable(rows=rows)
+    return server
+
+
+# ========================================
+# 공통: 쿼리 해석기
+# ========================================
+class Dispatcher:
+    """정규식 → 처리 함수 목록 (먼저 일치한 처리 함수 사용)"""
+
+    def __init__(self):
+        self.rules = []
+
+    def rule(self, pattern: str, ddl: bool = False):
+        compiled = re.compile(pattern, re.IGNORECASE | re.DOTALL)
+
+        def decorator(handler):
+            self.rules.append((compiled, handler, ddl))
+            return handler
+        return decorator
+
+    def match(self, sql: str):
+        for compiled, handler, ddl in self.rules:
+            found = compiled.search(sql)
+            if found:
+                return handler, found, ddl
+        return None, None, False
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _columns_of(rows: List[tuple]) -> Optional[list]:
+    if not rows:
+        return None
+    return [(f"col{i}",) for i in range(len(rows[0]))]
+
+
+# ========================================
+# PostgreSQL (psycopg2 흉내)
+# ========================================
+pg = Dispatcher()
+
+
+def _pg_db(cursor) -> FakeDatabase:
+    return cursor.connection.server.databases[cursor.connection.database]
+
+
+@pg.rule(r'^SELECT 1$')
+def _pg_select_one(cursor, match, params):
+    return [(1,)]
+
+
+@pg.rule(r'^(SET|RESET) ')
+def _pg_set(cursor, match, params):
+    return []
+
+
+@pg.rule(r'FROM pg_database')
+def _pg_databases(cursor, match, params):
+    server = cursor.connection.server
+    rows = [(name, database.oid, None) for name, database in server.databases.items()]
+    if match.string.startswith('SELECT datname FROM'):
+        return [(row[0],) for row in rows]
+    return rows
+
+
+@pg.rule(r'FROM pg_tables WHERE schemaname')
+def _pg_public_tables(cursor, match, params):
+    return [(name,) for name in _pg_db(cursor).tables]
+
+
+@pg.rule(r'FROM information_schema\.tables')
+def _pg_table_count(cursor, match, params):
+    return [(1 if params[0] in _pg_db(cursor).tables else 0,)]
+
+
+@pg.rule(r'FROM pg_locks')
+def _pg_locks(cursor, match, params):
+    return []
+
+
+@pg.rule(r'^SELECT c\.relkind FROM pg_class')
+def _pg_relkind(cursor, match, params):
+    table = _pg_db(cursor).tables.get(params[0])
+    return [(table.kind,)] if table else []
+
+
+@pg.rule(r'FROM pg_inherits')
+def _pg_partitions(cursor, match, params):
+    parent = re.search(r'"(\w+)"', params[0]).group(1)
+    return [(name,) for name in _pg_db(cursor).partitions.get(parent, [])]
+
+
+@pg.rule(r'FROM pg_class')
+def _pg_relations(cursor, match, params):
+    database = _pg_db(cursor)
+    rows = []
+    for name in params[0]:
+        if name in database.tables:
+            rows.append((name, database.tables[name].kind, True))
+        elif name in database.indexes:
+            rows.append((name, 'i', database.indexes[name][1]))
+    return rows
+
+
+@pg.rule(r'^SELECT "checksum" FROM "(\w+)"')
+def _pg_ledger_select(cursor, match, params):
+    ledger = _pg_db(cursor).ledger
+    if ledger is None:
+        raise cursor.connection.module.ProgrammingError(
+            f'relation "{match.group(1)}" does not exist', pgcode='42P01')
+    return [(ledger[params[0]],)] if params[0] in ledger else []
+
+
+@pg.rule(r'^INSERT INTO "\w+" \("change_id"')
+def _pg_ledger_insert(cursor, match, params):
+    _pg_db(cursor).ledger[params[0]] = params[1]
+    return []
+
+
+def _pg_apply_ddl(database: FakeDatabase, statement: str):
+    """PostgreSQL DDL 구문 하나를 상태에 반영"""
+    found = re.match(r'CREATE TABLE IF NOT EXISTS "(\w+)" PARTITION OF "(\w+)"', statement)
+    if found:
+        if found.group(1) not in database.partitions[found.group(2)]:
+            database.partitions[found.group(2)].append(found.group(1))
+        return
+    found = re.match(r'CREATE TABLE IF NOT EXISTS "(\w+)"', statement)
+    if found:
+        if found.group(1) == 'schema_change_ledger':
+            if database.ledger is None:
+                database.ledger = {}
+            return
+        kind = 'p' if re.search(r'\)\s*PARTITION BY', statement) else 'r'
+        database.tables.setdefault(found.group(1), FakeTable(kind=kind))
+        return
+    found = re.match(r'CREATE (?:UNIQUE )?INDEX (?:CONCURRENTLY )?IF NOT EXISTS "(\w+)" ON "(\w+)"', statement)
+    if found:
+        database.indexes.setdefault(found.group(1), (found.group(2), True))
+        return
+    found = re.match(r'DROP INDEX (?:CONCURRENTLY )?IF EXISTS "(\w+)"', statement)
+    if found:
+        database.indexes.pop(found.group(1), None)
+        return
+    found = re.match(r'ALTER TABLE "(\w+)" DETACH PARTITION "(\w+)"', statement)
+    if found:
+        database.partitions[found.group(1)].remove(found.group(2))
+        database.tables[found.group(2)] = FakeTable()
+        return
+    found = re.match(r'DROP TABLE IF EXISTS "(\w+)"', statement)
+    if found:
+        database.tables.pop(found.group(1), None)
+
+
+@pg.rule(r'^(CREATE|DROP|ALTER) ', ddl=True)
+def _pg_ddl(cursor, match, params):
+    database = _pg_db(cursor)
+    for statement in match.string.split(';'):
+        statement = statement.strip()
+        if statement:
+            _pg_apply_ddl(database, statement)
+    return []
+
+
+# ========================================
+# MariaDB (pymysql 흉내)
+# ========================================
+my = Dispatcher()
+
+
+def _my_schema(cursor, name: Optional[str]) -> FakeDatabase:
+    server = cursor.connection.server
+    name = name or cursor.connection.database
+    if name not in server.databases:
+        raise cursor.connection.module.OperationalError(1049, f"Unknown database '{name}'")
+    return server.databases[name]
+
+
+@my.rule(r'^SELECT 1$')
+def _my_select_one(cursor, match, params):
+    return [(1,)]
+
+
+@my.rule(r'^SET (SESSION )?')
+def _my_set(cursor, match, params):
+    return []
+
+
+@my.rule(r"^SHOW GLOBAL STATUS LIKE 'Threads_running'$")
+def _my_threads_running(cursor, match, params):
+    return [('Threads_running', str(cursor.connection.server.threads_running))]
+
+
+@my.rule(r'^SHOW (SLAVE|REPLICA) STATUS$')
+def _my_replica_status(cursor, match, params):
+    cursor.column_names = ['Slave_IO_Running', 'Slave_SQL_Running', 'Seconds_Behind_Master']
+    return [('Yes', 'Yes', cursor.connection.server.replica_lag)]
+
+
+@my.rule(r'^USE `(\w+)`$')
+def _my_use(cursor, match, params):
+    _my_schema(cursor, match.group(1))
+    cursor.connection.database = match.group(1)
+    return []
+
+
+@my.rule(r'^SHOW DATABASES$')
+def _my_show_databases(cursor, match, params):
+    return [(name,) for name in cursor.connection.server.databases]
+
+
+@my.rule(r"^SHOW TABLES LIKE '(\w+)'$")
+def _my_show_tables_like(cursor, match, params):
+    return [(match.group(1),)] if match.group(1) in _my_schema(cursor, None).tables else []
+
+
+@my.rule(r'^SHOW TABLES$')
+def _my_show_tables(cursor, match, params):
+    return [(name,) for name in _my_schema(cursor, None).tables]
+
+
+@my.rule(r'^SELECT DISTINCT table_schema FROM information_schema\.tables WHERE table_name = %s$')
+def _my_schemas_by_table(cursor, match, params):
+    return [(name,) for name, database in cursor.connection.server.databases.items()
+            if params[0] in database.tables]
+
+
+@my.rule(r'^SELECT COUNT\(\*\) FROM information_schema\.tables WHERE table_schema = %s AND table_name = %s$')
+def _my_table_count(cursor, match, params):
+    database = cursor.connection.server.databases.get(params[0])
+    return [(1 if database and params[1] in database.tables else 0,)]
+
+
+@my.rule(r'^SELECT COUNT\(\*\) FROM information_schema\.columns '
+         r'WHERE table_schema = %s AND table_name = %s AND column_name = %s$')
+def _my_column_count(cursor, match, params):
+    database = cursor.connection.server.databases.get(params[0])
+    table = database.tables.get(params[1]) if database else None
+    return [(1 if table and params[2] in table.columns else 0,)]
+
+
+@my.rule(r"^SELECT table_schema, table_name, data_length, index_length, table_rows FROM information_schema\.tables "
+         r"WHERE table_schema IN \(([%s, ]+)\) AND table_type = 'BASE TABLE'$")
+def _my_tables_by_schema(cursor, match, params):
+    databases = cursor.connection.server.databases
+    return [(schema, table_name, table.data_length, 0, table.rows) for schema in params if schema in databases
+            for table_name, table in databases[schema].tables.items()]
+
+
+@my.rule(r'^SELECT table_schema, table_name, column_name FROM information_schema\.columns '
+         r'WHERE table_schema IN \(([%s, ]+)\) AND column_name IN \(([%s, ]+)\)$')
+def _my_column_inventory(cursor, match, params):
+    schema_count = match.group(1).count('%s')
+    schemas, columns = params[:schema_count], {name.lower() for name in params[schema_count:]}
+    databases = cursor.connection.server.databases
+    return [(schema, table_name, column)
+            for schema in schemas if schema in databases
+            for table_name, table in databases[schema].tables.items()
+            for column in table.columns if column.lower() in columns]
+
+
+@my.rule(r'FROM information_schema\.metadata_lock_info')
+def _my_lock_blockers(cursor, match, params):
+    return list(_my_schema(cursor, params[0]).lock_holders)
+
+
+def _my_check_metadata_lock(cursor, database: FakeDatabase):
+    if database.lock_holders:
+        raise cursor.connection.module.OperationalError(
+            1205, "Lock wait timeout exceeded; try restarting transaction")
+
+
+@my.rule(r'^SELECT checksum FROM `(\w+)`\.`(\w+)` WHERE change_id = %s$')
+def _my_ledger_select(cursor, match, params):
+    ledger = _my_schema(cursor, match.group(1)).ledger
+    if ledger is None:
+        raise cursor.connection.module.ProgrammingError(
+            1146, f"Table '{match.group(1)}.{match.group(2)}' doesn't exist")
+    return [(ledger[params[0]],)] if params[0] in ledger else []
+
+
+# ---- 섀도 테이블 온라인 스키마 변경 (기본 키는 1..rows로 가정) ----
+@my.rule(r'^SELECT column_name, data_type, column_key FROM information_schema\.columns '
+         r'WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position$')
+def _my_table_columns(cursor, match, params):
+    table = _my_schema(cursor, params[0]).tables[params[1]]
+    return [(column, 'int' if column == 'id' else 'text', 'PRI' if column == 'id' else '')
+            for column in table.columns]
+
+
+@my.rule(r'^SELECT \(SELECT COUNT\(\*\) FROM information_schema\.key_column_usage')
+def _my_osc_inspect(cursor, match, params):
+    database = _my_schema(cursor, params[0])
+    return [(0, 0, 1 if params[-1] in database.tables else 0)]
+
+
+@my.rule(r'^SELECT COUNT\(\*\) FROM information_schema\.triggers')
+def _my_trigger_count(cursor, match, params):
+    database = _my_schema(cursor, params[0])
+    return [(sum(1 for name in params[2:] if database.triggers.get(name) == params[1]),)]
+
+
+@my.rule(r'^SELECT data_length \+ index_length FROM information_schema\.tables '
+         r'WHERE table_schema = %s AND table_name = %s$')
+def _my_table_bytes(cursor, match, params):
+    table = _my_schema(cursor, params[0]).tables.get(params[1])
+    return [(table.data_length,)] if table else []
+
+
+def _my_osc_progress(cursor, name: str) -> Dict[str, tuple]:
+    database = _my_schema(cursor, name)
+    if database.osc_progress is None:
+        raise cursor.connection.module.ProgrammingError(1146, f"Table '{name}.schema_osc_progress' doesn't exist")
+    return database.osc_progress
+
+
+@my.rule(r'^CREATE TABLE IF NOT EXISTS `(\w+)`\.`schema_osc_progress`', ddl=True)
+def _my_osc_progress_create(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    if database.osc_progress is None:
+        database.osc_progress = {}
+    return []
+
+
+@my.rule(r'^SELECT definition, last_pk, max_pk, copied_rows, status FROM `(\w+)`\.`schema_osc_progress`')
+def _my_osc_progress_select(cursor, match, params):
+    progress = _my_osc_progress(cursor, match.group(1))
+    return [progress[params[0]]] if params[0] in progress else []
+
+
+@my.rule(r'^INSERT INTO `(\w+)`\.`schema_osc_progress`')
+def _my_osc_progress_insert(cursor, match, params):
+    _my_osc_progress(cursor, match.group(1))[params[0]] = tuple(params[1:])
+    return []
+
+
+@my.rule(r'^DELETE FROM `(\w+)`\.`schema_osc_progress` WHERE table_name = %s$')
+def _my_osc_progress_delete(cursor, match, params):
+    _my_osc_progress(cursor, match.group(1)).pop(params[0], None)
+    return []
+
+
+@my.rule(r'^CREATE TABLE `(\w+)`\.`(\w+)` LIKE `\w+`\.`(\w+)`$', ddl=True)
+def _my_create_table_like(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    if match.group(2) in database.tables:
+        raise cursor.connection.module.OperationalError(1050, f"Table '{match.group(2)}' already exists")
+    source = database.tables[match.group(3)]
+    database.tables[match.group(2)] = FakeTable(columns=source.columns, row_bytes=source.row_bytes)
+    return []
+
+
+@my.rule(r'^CREATE TRIGGER `(\w+)`\.`(\w+)` AFTER \w+ ON `\w+`\.`(\w+)`', ddl=True)
+def _my_create_trigger(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    _my_check_metadata_lock(cursor, database)
+    database.triggers[match.group(2)] = match.group(3)
+    return []
+
+
+@my.rule(r'^DROP TRIGGER IF EXISTS `(\w+)`\.`(\w+)`$', ddl=True)
+def _my_drop_trigger(cursor, match, params):
+    _my_schema(cursor, match.group(1)).triggers.pop(match.group(2), None)
+    return []
+
+
+@my.rule(r'^DROP TABLE IF EXISTS `(\w+)`\.`(\w+)`$', ddl=True)
+def _my_drop_table(cursor, match, params):
+    _my_schema(cursor, match.group(1)).tables.pop(match.group(2), None)
+    return []
+
+
+@my.rule(r'^SELECT MIN\(`\w+`\), MAX\(`\w+`\) FROM `(\w+)`\.`(\w+)`$')
+def _my_key_range(cursor, match, params):
+    rows = _my_schema(cursor, match.group(1)).tables[match.group(2)].rows
+    return [(1, rows) if rows else (None, None)]
+
+
+@my.rule(r'^SELECT `\w+` FROM `(\w+)`\.`(\w+)` WHERE `\w+` > %s ORDER BY `\w+` LIMIT 1 OFFSET %s$')
+def _my_chunk_boundary(cursor, match, params):
+    rows = _my_schema(cursor, match.group(1)).tables[match.group(2)].rows
+    key = int(params[0]) + int(params[1]) + 1
+    return [(key,)] if key <= rows else []
+
+
+@my.rule(r'^INSERT IGNORE INTO `(\w+)`\.`(\w+)` .* FROM `\w+`\.`(\w+)` FORCE INDEX')
+def _my_copy_chunk(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    source = database.tables[match.group(3)]
+    copied = max(0, min(int(params[1]), source.rows) - max(int(params[0]), 0))
+    database.tables[match.group(2)].rows += copied
+    cursor.affected_rows = copied
+    return []
+
+
+@my.rule(r'^RENAME TABLE `(\w+)`\.`(\w+)` TO `\w+`\.`(\w+)`, `\w+`\.`(\w+)` TO `\w+`\.`(\w+)`$', ddl=True)
+def _my_rename_tables(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    _my_check_metadata_lock(cursor, database)
+    for source, target in ((match.group(2), match.group(3)), (match.group(4), match.group(5))):
+        database.tables[target] = database.tables.pop(source)
+        for trigger, table in list(database.triggers.items()):
+            if table == source:
+                database.triggers[trigger] = target
+    return []
+
+
+@my.rule(r'^CREATE TABLE IF NOT EXISTS `(\w+)`\.`schema_change_ledger`', ddl=True)
+def _my_ledger_create(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    if database.ledger is None:
+        database.ledger = {}
+    return []
+
+
+@my.rule(r'^INSERT INTO `(\w+)`\.`schema_change_ledger`')
+def _my_ledger_insert(cursor, match, params):
+    _my_schema(cursor, match.group(1)).ledger[params[0]] = params[1]
+    return []
+
+
+@my.rule(r'^ALTER TABLE (?:`(\w+)`\.)?`(\w+)` (.*)$', ddl=True)
+def _my_alter_table(cursor, match, params):
+    database = _my_schema(cursor, match.group(1))
+    _my_check_metadata_lock(cursor, database)
+    table = database.tables.get(match.group(2))
+    if table is None:
+        raise cursor.connection.module.ProgrammingError(1146, f"Table '{match.group(2)}' doesn't exist")
+    clauses = match.group(3)
+    algorithm = re.search(r'ALGORITHM=(\w+)', clauses)
+    if algorithm and algorithm.group(1).upper() not in table.algorithms:
+        raise cursor.connection.module.OperationalError(
+            1846, f"{algorithm.group(1).upper()} is not supported for this operation. Try a different algorithm.")
+    for column, comment in re.findall(r"ADD COLUMN `(\w+)`[^,]*?(?:COMMENT '((?:[^'\\]|\\.)*)')?(?:,|$)", clauses):
+        if column in table.columns:
+            raise cursor.connection.module.OperationalError(1060, f"Duplicate column name '{column}'")
+        table.columns[column] = comment
+    for column, comment in re.findall(r"MODIFY COLUMN `(\w+)`.*?COMMENT '((?:[^'\\]|\\.)*)'", clauses):
+        table.columns[column] = comment
+    return []
+
+
+@my.rule(r'^CREATE TABLE `(\w+)`', ddl=True)
+def _my_create_table(cursor, match, params):
+    database = _my_schema(cursor, None)
+    _my_check_metadata_lock(cursor, database)
+    if match.group(1) in database.tables:
+        raise cursor.connection.module.OperationalError(1050, f"Table '{match.group(1)}' already exists")
+    database.tables[match.group(1)] = FakeTable()
+    return []
+
+
+# ========================================
+# 드라이버 모듈 생성
+# ========================================
+class FakeCursor:
+    """DB-API 커서"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows: List[tuple] = []
+        self.description = None
+        self.column_names: Optional[List[str]] = None  # 처리 함수가 컬럼 이름을 지정할 때 사용
+        self.affected_rows: Optional[int] = None       # 처리 함수가 변경 행 수를 지정할 때 사용
+        self.rowcount = -1
+
+    def execute(self, sql: str, params=None):
+        connection = self.connection
+        if connection.closed:
+            raise connection.module.InterfaceError("connection already closed")
+        statement = _normalize(sql)
+        handler, match, ddl = connection.dispatcher.match(statement)
+        connection.server.record_query(connection.stats_database(statement, params), ddl)
+        if handler is None:
+            with connection.server.lock:
+                connection.server.unhandled[statement[:80]] += 1
+            self.rows = []
+        else:
+            with connection.server.lock:
+                self.column_names = None
+                self.affected_rows = None
+                self.rows = list(handler(self, match, params) or [])
+        if self.column_names:
+            self.description = [(name,) for name in self.column_names]
+        else:
+            self.description = _columns_of(self.rows)
+        self.rowcount = len(self.rows) if self.affected_rows is None else self.affected_rows
+        return self.rowcount
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    """DB-API 연결"""
+
+    def __init__(self, module, database: Optional[str]):
+        self.module = module
+        self.server: FakeServer = module.server
+        self.dispatcher: Dispatcher = module.dispatcher
+        self.database = database
+        self.autocommit = False
+        self.closed = 0
+
+    def stats_database(self, statement: str, params) -> Optional[str]:
+        """쿼리를 집계할 데이터베이스 (쿼리/파라미터에 데이터베이스 이름이 있으면 그 데이터베이스)"""
+        if self.module.flavor == 'mysql':
+            found = re.search(r'`(\w+)`\.`', statement)
+            if found:
+                return found.group(1)
+            if params and isinstance(params[0], str) and params[0] in self.server.databases:
+                return params[0]
+        return self.database
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def ping(self, reconnect: bool = False):
+        return True
+
+    def escape(self, value) -> str:
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def make_module(server: FakeServer, flavor: str) -> types.ModuleType:
+    """sys.modules에 등록할 가짜 드라이버 모듈 생성 (flavor: 'postgresql' 또는 'mysql')"""
+    name = 'psycopg2' if flavor == 'postgresql' else 'pymysql'
+    module = types.ModuleType(name)
+    module.server = server
+    module.flavor = flavor
+    module.dispatcher = pg if flavor == 'postgresql' else my
+
+    class Error(Exception):
+        def __init__(self, *args, pgcode: Optional[str] = None):
+            super().__init__(*args)
+            self.pgcode = pgcode
+
+    module.Error = Error
+    for error_name in ('InterfaceError', 'DatabaseError', 'OperationalError', 'ProgrammingError',
+                       'IntegrityError', 'InternalError'):
+        setattr(module, error_name, type(error_name, (Error,), {}))
+    module.MySQLError = Error
+    module.err = types.SimpleNamespace(**{n: getattr(module, n) for n in (
+        'Error', 'MySQLError', 'OperationalError', 'ProgrammingError', 'InternalError')})
+
+    def connect(*args, **kwargs):
+        database = kwargs.get('database') or kwargs.get('dbname') or kwargs.get('db')
+        server.record_connect(database)
+        if database is not None and database not in server.databases:
+            if flavor == 'postgresql':
+                raise module.OperationalError(f'database "{database}" does not exist')
+            raise module.OperationalError(1049, f"Unknown database '{database}'")
+        connection = FakeConnection(module, database)
+        if 'autocommit' in kwargs:
+            connection.autocommit = kwargs['autocommit']
+        return connection
+
+    module.connect = connect
+    return module
@@ -16,12 +16,23 @@ import pymysql
 import sys
 import os
 import re
-from typing import List, Dict, Tuple
+import json
+import time
+import hashlib
+import argparse
+import threading
+from typing import List, Dict, Tuple, Optional, Callable
+
+# 세 스크립트가 함께 쓰는 공용 모듈 (Script/python/schema_common.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema_common import RunMetrics, write_run_metrics, backoff_delay, connect_worker, process_databases, \
+    add_runner_args, apply_connection_args, write_run_summary
 
 # ========================================
 # MariaDB 서버 접속 정보 설정
 # ========================================
 DB_HOST = 'localhost'
+DB_PORT = 3306
 DB_USER = 'user'
 DB_PASS = 'password'
 
@@ -67,6 +78,145 @@ COMMENTS = {
 }
 
 
+# ========================================
+# 테이블/컬럼 목록 일괄 조회 설정
+# ========================================
+# 테이블 검색 방법
+# - 'bulk': 모든 대상 데이터베이스의 테이블 목록을 information_schema.tables에서 한 번에 조회
+# - 'per_database': 데이터베이스마다 USE + SHOW TABLES로 조회 (기존 방식)
+TABLE_DISCOVERY = 'bulk'
+
+# 테이블×컬럼마다 information_schema.columns를 조회하지 않고,
+# 대상 데이터베이스들의 컬럼 목록을 한 번에 읽어 메모리에서 존재 여부를 확인
+# (information_schema 조회는 테이블이 많은 서버에서 느리므로 왕복 횟수를 줄임)
+# 한 쿼리에 넣을 데이터베이스 수 (IN 목록이 너무 길어지지 않도록 나누어 조회)
+INFORMATION_SCHEMA_BATCH_SIZE = 200
+
+# 'bulk' 검색 시 함께 읽은 테이블 크기(data_length + index_length)로 작업 순서를 정함
+# (큰 테이블이 있는 데이터베이스부터, 데이터베이스 안에서는 큰 테이블부터 처리하여 마지막에 큰 작업이 몰리지 않게 함)
+SCHEDULE_LARGEST_FIRST = True
+PROGRESS_REPORT_INTERVAL = 10.0  # 진행률/남은 시간 출력 최소 간격 (초)
+
+# ========================================
+# 병렬 처리 설정
+# ========================================
+# 1이면 기존처럼 순차 처리, 2 이상이면 워커마다 별도 연결로 여러 데이터베이스를 동시에 처리
+# 워커는 데이터베이스 단위로 작업을 받으므로 같은 데이터베이스에서 ALTER가 동시에 실행되지 않음
+MAX_WORKERS = 1  # --workers 옵션으로 변경 가능
+
+# ========================================
+# 변경 이력(ledger) 설정
+# ========================================
+# 데이터베이스별로 적용한 변경 ID와 체크섬(COLUMNS/COMMENTS + 대상 테이블 목록)을 기록해 두고,
+# 같은 버전이 이미 적용된 데이터베이스는 기본 키 조회 한 번으로 건너뜀
+# 컬럼을 수동으로 삭제한 경우 등 전체 확인이 필요하면 --no-ledger 옵션 사용
+USE_LEDGER = True
+LEDGER_TABLE = 'schema_change_ledger'
+
+LEDGER_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS `{database}`.`{table}` (
+  `change_id` VARCHAR(191) NOT NULL,
+  `checksum` CHAR(64) NOT NULL,
+  `applied_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`change_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# 테이블이 없을 때 MariaDB 오류 코드 (ER_NO_SUCH_TABLE)
+ER_NO_SUCH_TABLE = 1146
+
+# ========================================
+# 온라인 DDL 설정
+# ========================================
+# ALTER TABLE에 알고리즘을 명시하여 테이블 복사(쓰기 잠금)가 조용히 일어나지 않도록 함
+# INSTANT(메타데이터만 변경) → INPLACE, LOCK=NONE(읽기/쓰기 허용) 순서로 시도하고,
+# 둘 다 지원되지 않으면 ALLOW_COPY_ALGORITHM(또는 --allow-copy)이 켜진 경우에만 COPY로 실행
+ONLINE_DDL_ALGORITHMS = [
+    ('INSTANT', "ALGORITHM=INSTANT"),
+    ('INPLACE', "ALGORITHM=INPLACE, LOCK=NONE"),
+]
+COPY_DDL_ALGORITHM = ('COPY', "ALGORITHM=COPY")
+ALLOW_COPY_ALGORITHM = False
+
+# 요청한 알고리즘/잠금 수준을 지원하지 않을 때 MariaDB 오류 코드
+# (ER_ALTER_OPERATION_NOT_SUPPORTED, ER_ALTER_OPERATION_NOT_SUPPORTED_REASON)
+ALTER_NOT_SUPPORTED_ERRORS = {1845, 1846}
+
+# ========================================
+# 섀도 테이블 온라인 스키마 변경 설정 (대용량 테이블)
+# ========================================
+# ALTER(INPLACE)도 오래 걸리는 대용량 테이블은 섀도 테이블에 새 컬럼을 추가하고
+# 기본 키 범위 청크 단위로 행을 복사한 뒤 RENAME TABLE로 교체 (복사 중 변경분은 트리거로 반영)
+# 정수형 단일 컬럼 기본 키가 있고 외래 키/다른 트리거가 없는 테이블만 가능하며, 아니면 일반 ALTER로 처리
+OSC_ENABLED = False                  # --online-schema-change 옵션으로 켤 수 있음
+OSC_MIN_TABLE_GB = 10.0              # 이 크기(data_length + index_length, GB) 이상인 테이블에만 적용
+OSC_CHUNK_TARGET_SECONDS = 0.5       # 청크 하나를 복사하는 목표 시간 (초)
+OSC_CHUNK_SIZE_INITIAL = 1000        # 첫 청크 행 수
+OSC_CHUNK_SIZE_MIN = 100             # 청크 최소 행 수
+OSC_CHUNK_SIZE_MAX = 50000           # 청크 최대 행 수
+OSC_REPORT_INTERVAL = 10.0           # 복사 진행 상황 출력 간격 (초)
+OSC_DROP_OLD_TABLE = True            # 교체 후 이전 테이블(_<table>_old) 삭제 여부
+OSC_PROGRESS_TABLE = 'schema_osc_progress'
+
+OSC_PROGRESS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS `{database}`.`{table}` (
+  `table_name` VARCHAR(64) NOT NULL,
+  `definition` CHAR(64) NOT NULL,
+  `last_pk` DECIMAL(20,0) NULL,
+  `max_pk` DECIMAL(20,0) NULL,
+  `copied_rows` BIGINT NOT NULL DEFAULT 0,
+  `status` VARCHAR(16) NOT NULL,
+  `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`table_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+OSC_INTEGER_TYPES = {'tinyint', 'smallint', 'mediumint', 'int', 'bigint'}
+
+# ========================================
+# DDL 잠금 보호 설정 (metadata lock)
+# ========================================
+# ALTER 대상 테이블의 metadata lock을 오래 잡고 있는 세션(metadata_lock_info 플러그인, 없으면 innodb_trx)이나
+# 그 테이블의 metadata lock을 기다리는 세션(processlist)이 있으면 DDL 실행을 미루고,
+# DDL이 metadata lock 대기열에서 애플리케이션 쿼리를 막지 않도록 세션 lock_wait_timeout을 짧게 설정
+# (초과 시 재시도, 끝내 실행하지 못한 테이블은 마지막에 출력)
+DDL_LOCK_WAIT_TIMEOUT = 5        # DDL 세션의 lock_wait_timeout (초)
+DDL_BLOCKER_MIN_AGE = 5          # 대상 테이블 잠금을 이 시간(초) 이상 잡고 있는 세션을 blocker로 판단
+DDL_RETRY_COUNT = 3              # blocker 또는 lock_wait_timeout 발생 시 재시도 횟수
+DDL_RETRY_BASE_DELAY = 2.0       # 재시도 대기 기본 시간(초), 재시도마다 2배 + 지터
+DDL_RETRY_MAX_DELAY = 30.0       # 재시도 대기 최대 시간(초)
+
+# lock_wait_timeout 초과 시 MariaDB 오류 코드 (ER_LOCK_WAIT_TIMEOUT)
+ER_LOCK_WAIT_TIMEOUT = 1205
+# information_schema에 없는 테이블 조회 시 MariaDB 오류 코드 (ER_UNKNOWN_TABLE, metadata_lock_info 플러그인 미설치)
+ER_UNKNOWN_TABLE = 1109
+
+# ========================================
+# 부하 기반 속도 조절 설정 (throttle)
+# ========================================
+# 테이블마다 ALTER 전에 주 서버의 Threads_running과 복제 서버의 Seconds_Behind_Master를 확인하여
+# 임계값을 넘으면 내려갈 때까지 일시 중지하고, 임계값에 가까워지면 테이블 사이에 대기 시간을 넣어 속도를 줄임
+THROTTLE_ENABLED = True              # --no-throttle 옵션으로 끌 수 있음
+THROTTLE_MAX_THREADS_RUNNING = 50    # 주 서버 Threads_running 임계값
+THROTTLE_MAX_REPLICA_LAG = 10        # 복제 지연(Seconds_Behind_Master) 임계값 (초)
+THROTTLE_SLOWDOWN_START = 0.5        # 임계값 대비 이 비율부터 테이블 사이 대기 시작
+THROTTLE_MAX_DELAY = 2.0             # 임계값 직전일 때 테이블 사이 최대 대기 시간 (초)
+THROTTLE_CHECK_INTERVAL = 1.0        # 부하 재확인 최소 간격 (초, 이 간격 안에서는 마지막 측정값 사용)
+THROTTLE_PAUSE_SECONDS = 5.0         # 임계값 초과 시 재확인까지 대기 시간 (초)
+
+# 복제 지연을 확인할 복제 서버 목록 ('host' 또는 'host:port', 접속 계정은 DB_USER/DB_PASS 사용)
+REPLICA_HOSTS = [
+    # 'replica1.example.com',
+    # 'replica2.example.com:3307',
+]
+
+# ========================================
+# Prometheus 메트릭 설정 (node_exporter textfile collector)
+# ========================================
+# 실행이 끝나면 데이터베이스별 연결/검색/DDL 소요 시간과 처리 결과 건수를 textfile 형식으로 기록
+# node_exporter의 --collector.textfile.directory 경로와 맞출 것 (None이면 기록하지 않음)
+METRICS_TEXTFILE = '/var/lib/node_exporter/textfile_collector/schema_column_check_alter_mariadb.prom'
+
 # ========================================
 # 시스템 데이터베이스 목록 (제외할 DB)
 # ========================================
@@ -75,31 +225,287 @@ SYSTEM_DBS = {
     'sys', 'test', 'tmp', 'temp'
 }
 
+class DDLLockTimeout(Exception):
+    """DDL이 lock_wait_timeout 안에 metadata lock을 얻지 못함 (재시도 대상)"""
+
+class TableMatcher:
+    """대상 테이블 판별기 (포함 패턴과 제외 패턴들을 미리 컴파일하여 재사용)"""
+
+    def __init__(self, pattern: str, excluded_patterns: List[str]):
+        self.pattern = pattern
+        self.excluded_patterns = list(excluded_patterns)
+        self.include_re = re.compile(pattern)
+        # 제외 패턴들을 이름 있는 그룹 하나로 묶어 한 번에 검사하고, 일치한 그룹으로 어느 패턴인지 확인
+        self.exclude_re = None
+        if self.excluded_patterns:
+            self.exclude_re = re.compile("|".join(
+                f"(?P<x{index}>{excluded})" for index, excluded in enumerate(self.excluded_patterns)))
+
+    def excluded_by(self, table_name: str) -> Optional[str]:
+        """테이블을 제외시킨 패턴 반환 (제외 대상이 아니면 None)"""
+        if self.exclude_re is None:
+            return None
+        found = self.exclude_re.match(table_name)
+        if not found:
+            return None
+        return self.excluded_patterns[int(found.lastgroup[1:])]
+
+    def filter(self, table_names: List[str], database: Optional[str] = None,
+               log: Callable[[str], None] = print) -> List[str]:
+        """포함 패턴에 맞고 제외 패턴에 해당하지 않는 테이블만 반환"""
+        matching_tables = []
+        for table_name in table_names:
+            if not self.include_re.match(table_name):
+                continue
+            excluded_pattern = self.excluded_by(table_name)
+            if excluded_pattern is not None:
+                label = f"{database}.{table_name}" if database else table_name
+                log(f"    🚫 제외된 테이블: {label} (패턴: {excluded_pattern})")
+                continue
+            matching_tables.append(table_name)
+        return matching_tables
+
+TABLE_MATCHER = TableMatcher(TARGET_TABLE_PATTERN, EXCLUDED_TABLE_PATTERNS)
+
+class ProgressTracker:
+    """처리한 데이터 크기 기준 진행률과 남은 시간 추정 (여러 스레드에서 함께 사용 가능)
+
+    실제로 변경한 테이블 크기만 처리량으로 세고, 변경할 필요가 없었거나 건너뛴 테이블은
+    전체 작업량에서 뺀다 (다시 실행할 때 처리 속도와 남은 시간이 부풀려지지 않도록).
+    테이블 크기를 모르면 (데이터베이스별 검색) 처리한 데이터베이스 수 기준으로 추정한다.
+    """
+
+    def __init__(self, total_bytes: int, total_databases: int):
+        self.total_bytes = total_bytes
+        self.by_bytes = total_bytes > 0
+        self.total_databases = total_databases
+        self.done_bytes = 0
+        self.done_databases = 0
+        self.started = time.monotonic()
+        self.reported = 0.0
+        self.lock = threading.Lock()
+
+    def advance(self, done_bytes: int, skipped_bytes: int = 0) -> Optional[str]:
+        """데이터베이스 하나 처리 완료 기록 (출력할 진행 상황이 있으면 반환)
+
+        done_bytes는 실제로 변경한 테이블 크기, skipped_bytes는 변경하지 않은 테이블 크기
+        """
+        with self.lock:
+            self.done_bytes += done_bytes
+            self.total_bytes = max(self.done_bytes, self.total_bytes - skipped_bytes)
+            self.done_databases += 1
+            now = time.monotonic()
+            finished = self.done_databases >= self.total_databases
+            if not finished and now - self.reported < PROGRESS_REPORT_INTERVAL:
+                return None
+            self.reported = now
+            elapsed = now - self.started
+
+            if self.by_bytes:
+                ratio = self.done_bytes / self.total_bytes if self.total_bytes > 0 else 1.0
+                rate = self.done_bytes / elapsed if elapsed > 0 else 0.0
+                remaining_bytes = self.total_bytes - self.done_bytes
+                if remaining_bytes <= 0:
+                    remaining = 0.0
+                else:
+                    remaining = remaining_bytes / rate if rate > 0 else None
+                detail = (f"{format_bytes(self.done_bytes)}/{format_bytes(self.total_bytes)}, "
+                          f"{format_bytes(rate)}/s")
+            else:
+                ratio = self.done_databases / self.total_databases
+                rate = self.done_databases / elapsed if elapsed > 0 else 0.0
+                remaining = (self.total_databases - self.done_databases) / rate if rate > 0 else None
+                detail = f"데이터베이스 {self.done_databases}/{self.total_databases}"
+
+            eta = format_duration(remaining) if remaining is not None else "알 수 없음"
+            return (f"⏱️  진행률 {ratio * 100:.1f}% ({detail}), 경과 {format_duration(elapsed)}, "
+                    f"남은 시간 약 {eta}")
+
+class LoadThrottle:
+    """서버 부하와 복제 지연에 따른 실행 속도 조절 (여러 스레드에서 함께 사용 가능)
+
+    부하는 임계값 대비 비율로 계산하며 (여러 지표 중 가장 큰 값),
+    1.0 이상이면 내려갈 때까지 일시 중지하고 THROTTLE_SLOWDOWN_START 이상이면 비례하여 대기한다.
+    """
+
+    def __init__(self, host: str, user: str, password: str, replica_hosts: List[str],
+                 max_threads_running: int, max_replica_lag: int):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.replica_hosts = list(replica_hosts)
+        self.max_threads_running = max_threads_running
+        self.max_replica_lag = max_replica_lag
+        self.lock = threading.Lock()
+        self.connections = {}  # host -> 부하 확인용 연결
+        self.checked_at = 0.0
+        self.load = 0.0
+        self.reasons = []
+        self.paused_seconds = 0.0  # 워커별 일시 중지 시간 합계 (초)
+        self.delayed_seconds = 0.0  # 워커별 감속 대기 시간 합계 (초)
+
+    def get_connection(self, host: str):
+        """부하 확인용 연결 (끊겼으면 재연결)"""
+        connection = self.connections.get(host)
+        if connection is not None:
+            try:
+                connection.ping(reconnect=True)
+                return connection
+            except Exception:
+                self.connections.pop(host, None)
+        name, _, port = host.partition(':')
+        connection = pymysql.connect(host=name, port=int(port or 3306), user=self.user,
+                                     password=self.password, charset='utf8mb4', autocommit=True)
+        self.connections[host] = connection
+        return connection
+
+    def sample(self, log: Callable[[str], None] = print) -> Tuple[float, List[str]]:
+        """현재 부하 측정 (임계값 대비 최대 비율, 임계값을 넘은 지표 설명)"""
+        load = 0.0
+        reasons = []
+
+        try:
+            cursor = self.get_connection(self.host).cursor()
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+            row = cursor.fetchone()
+            cursor.close()
+            threads_running = int(row[1]) if row else 0
+            load = max(load, threads_running / self.max_threads_running)
+            if threads_running >= self.max_threads_running:
+                reasons.append(f"Threads_running {threads_running} ≥ {self.max_threads_running}")
+        except Exception as e:
+            log(f"      ⚠️  Threads_running 조회 실패: {e}")
+
+        for replica in self.replica_hosts:
+            try:
+                cursor = self.get_connection(replica).cursor()
+                cursor.execute("SHOW SLAVE STATUS")
+                rows = cursor.fetchall()
+                names = [column[0] for column in cursor.description or []]
+                cursor.close()
+            except Exception as e:
+                # 복제 지연을 알 수 없으면 안전하게 일시 중지
+                load = max(load, float('inf'))
+                reasons.append(f"{replica} 복제 상태 조회 실패: {e}")
+                continue
+
+            if not rows or 'Seconds_Behind_Master' not in names:
+                continue
+            for row in rows:
+                lag = row[names.index('Seconds_Behind_Master')]
+                if lag is None:
+                    load = max(load, float('inf'))
+                    reasons.append(f"{replica} 복제 중지 (Seconds_Behind_Master NULL)")
+                    continue
+                load = max(load, int(lag) / self.max_replica_lag)
+                if int(lag) >= self.max_replica_lag:
+                    reasons.append(f"{replica} 복제 지연 {lag}초 ≥ {self.max_replica_lag}초")
+
+        return load, reasons
+
+    def wait(self, target: str, log: Callable[[str], None] = print):
+        """부하가 임계값 아래로 내려갈 때까지 대기하고, 임계값에 가까우면 비례하여 추가 대기
+
+        target은 대기 중인 작업 대상(database.table), log는 호출한 매니저의 출력 함수
+        (병렬 처리 시 데이터베이스별 출력 버퍼에 기록되어 다른 데이터베이스 출력과 섞이지 않음)
+        """
+        waited = 0.0
+        while True:
+            # 측정값은 워커들이 함께 사용하므로 임계값을 넘으면 모든 워커가 각자 일시 중지
+            with self.lock:
+                if time.monotonic() - self.checked_at >= THROTTLE_CHECK_INTERVAL:
+                    self.load, self.reasons = self.sample(log)
+                    self.checked_at = time.monotonic()
+                load, reasons = self.load, list(self.reasons)
+            if load < 1.0:
+                break
+            log(f"      🐢 {target}: 부하 임계값 초과로 일시 중지 ({THROTTLE_PAUSE_SECONDS:g}초 후 재확인): "
+                + ", ".join(reasons))
+            time.sleep(THROTTLE_PAUSE_SECONDS)
+            waited += THROTTLE_PAUSE_SECONDS
+
+        if waited:
+            log(f"      ▶️  {target}: 부하 감소로 재개 (일시 중지 {waited:g}초)")
+            with self.lock:
+                self.paused_seconds += waited
+
+        delay = 0.0
+        if load > THROTTLE_SLOWDOWN_START:
+            delay = THROTTLE_MAX_DELAY * (load - THROTTLE_SLOWDOWN_START) / (1.0 - THROTTLE_SLOWDOWN_START)
+            time.sleep(delay)
+            with self.lock:
+                self.delayed_seconds += delay
+
+        if waited or delay:
+            RUN_METRICS.observe('throttle', waited + delay)
+
+    def close(self):
+        """부하 확인용 연결 해제"""
+        for connection in self.connections.values():
+            try:
+                connection.close()
+            except Exception:
+                pass
+        self.connections.clear()
+
+# 실행 메트릭
+RUN_METRICS = RunMetrics('column_check_alter_mariadb_pattern')
+
 class MariaDBColumnManager:
     """MariaDB 컬럼 관리 클래스"""
 
-    def __init__(self, host: str, user: str, password: str):
+    def __init__(self, host: str, user: str, password: str, port: int = 3306):
         self.host = host
+        self.port = port
         self.user = user
         self.password = password
         self.connection = None
         self.cursor = None
+        self.column_inventory = {}  # database -> {(table_name, column_name 소문자)}
+        self.table_sizes = {}       # (database, table_name) -> (data_length + index_length, table_rows)
+        self.algorithm_counts = {}  # 알고리즘 -> 테이블 수
+        self.copied_tables = []     # COPY 알고리즘으로 변경된 테이블 (database.table)
+        self.skipped_tables = []    # 잠금 문제로 건너뛴 테이블 (database.table)
+        self.altered_tables = []    # 마지막 process_database에서 실제로 변경한 테이블 (진행률 계산용)
+        self.metadata_lock_info = None  # metadata_lock_info 플러그인 사용 가능 여부 (None이면 아직 모름)
+        self.throttle = None        # LoadThrottle (None이면 속도 조절 안 함)
+        self.output = None          # 병렬 처리 시 데이터베이스별 출력 버퍼
+
+    def log(self, message: str):
+        """출력 (버퍼 수집 중이면 버퍼에 저장)"""
+        if self.output is not None:
+            self.output.append(message)
+        else:
+            print(message)
+
+    def begin_capture(self):
+        """데이터베이스별 출력 수집 시작"""
+        self.output = []
+
+    def end_capture(self) -> List[str]:
+        """데이터베이스별 출력 수집 종료 후 수집된 출력 반환"""
+        lines, self.output = self.output or [], None
+        return lines
 
     def connect(self) -> bool:
         """MariaDB 연결"""
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                charset='utf8mb4',
-                autocommit=True
-            )
+            with RUN_METRICS.timer('connect'):
+                self.connection = pymysql.connect(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    charset='utf8mb4',
+                    autocommit=True
+                )
             self.cursor = self.connection.cursor()
-            print("✅ MariaDB 연결 성공")
+            # DDL이 metadata lock을 오래 기다리며 뒤따르는 쿼리를 막지 않도록 대기 시간 제한
+            self.cursor.execute("SET SESSION lock_wait_timeout = %s", (DDL_LOCK_WAIT_TIMEOUT,))
+            self.log("✅ MariaDB 연결 성공")
             return True
         except Exception as e:
-            print(f"❌ MariaDB 연결 실패: {e}")
+            self.log(f"❌ MariaDB 연결 실패: {e}")
             return False
 
     def disconnect(self):
@@ -115,7 +521,7 @@ class MariaDBColumnManager:
             self.cursor.execute("SELECT 1")
             return True
         except Exception as e:
-            print(f"❌ 연결 테스트 실패: {e}")
+            self.log(f"❌ 연결 테스트 실패: {e}")
             return False
 
     def get_databases_by_table(self, table_name: str) -> List[str]:
@@ -130,14 +536,14 @@ class MariaDBColumnManager:
             databases = [row[0] for row in self.cursor.fetchall()]
             return databases
         except Exception as e:
-            print(f"❌ 데이터베이스 조회 실패: {e}")
+            self.log(f"❌ 데이터베이스 조회 실패: {e}")
             return []
 
     def get_databases_from_file(self, file_path: str) -> List[str]:
         """파일에서 데이터베이스 목록 읽기"""
         try:
             if not os.path.exists(file_path):
-                print(f"❌ 파일을 찾을 수 없습니다: {file_path}")
+                self.log(f"❌ 파일을 찾을 수 없습니다: {file_path}")
                 return []
 
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -148,7 +554,7 @@ class MariaDBColumnManager:
                         databases.append(line)
                 return databases
         except Exception as e:
-            print(f"❌ 파일 읽기 실패: {e}")
+            self.log(f"❌ 파일 읽기 실패: {e}")
             return []
 
     def get_all_databases(self) -> List[str]:
@@ -159,10 +565,10 @@ class MariaDBColumnManager:
                         if row[0] not in SYSTEM_DBS]
             return databases
         except Exception as e:
-            print(f"❌ 데이터베이스 목록 조회 실패: {e}")
+            self.log(f"❌ 데이터베이스 목록 조회 실패: {e}")
             return []
 
-    def get_matching_tables(self, database: str, pattern: str) -> List[str]:
+    def get_matching_tables(self, database: str, matcher: TableMatcher) -> List[str]:
         """정규식 패턴에 맞는 테이블 목록 조회 (제외 패턴 적용)"""
         try:
             self.cursor.execute(f"USE `{database}`")
@@ -170,26 +576,37 @@ class MariaDBColumnManager:
             tables = [row[0] for row in self.cursor.fetchall()]
 
             # 정규식 패턴에 맞는 테이블 필터링
-            matching_tables = []
-            for table in tables:
-                # 포함 패턴 확인
-                if re.match(pattern, table):
-                    # 제외 패턴 확인
-                    is_excluded = False
-                    for excluded_pattern in EXCLUDED_TABLE_PATTERNS:
-                        if re.match(excluded_pattern, table):
-                            is_excluded = True
-                            print(f"    🚫 제외된 테이블: {table} (패턴: {excluded_pattern})")
-                            break
-                    
-                    if not is_excluded:
-                        matching_tables.append(table)
-
-            return matching_tables
+            return matcher.filter(tables, log=self.log)
         except Exception as e:
-            print(f"  ❌ 테이블 목록 조회 실패: {e}")
+            self.log(f"  ❌ 테이블 목록 조회 실패: {e}")
             return []
 
+    def discover_matching_tables(self, databases: List[str],
+                                 matcher: TableMatcher) -> Optional[Dict[str, List[str]]]:
+        """모든 대상 데이터베이스의 테이블 목록을 일괄 조회하여 데이터베이스별 대상 테이블 반환 (실패 시 None)"""
+        try:
+            tables_by_database = {database: [] for database in databases}
+            for offset in range(0, len(databases), INFORMATION_SCHEMA_BATCH_SIZE):
+                batch = databases[offset:offset + INFORMATION_SCHEMA_BATCH_SIZE]
+                placeholders = ", ".join(["%s"] * len(batch))
+                query = f"""
+                    SELECT table_schema, table_name, data_length, index_length, table_rows
+                    FROM information_schema.tables
+                    WHERE table_schema IN ({placeholders}) AND table_type = 'BASE TABLE'
+                """
+                self.cursor.execute(query, tuple(batch))
+                for schema, table_name, data_length, index_length, table_rows in self.cursor.fetchall():
+                    if schema in tables_by_database:
+                        tables_by_database[schema].append(table_name)
+                        self.table_sizes[(schema, table_name)] = (int(data_length or 0) + int(index_length or 0),
+                                                                  int(table_rows or 0))
+
+            return {database: matcher.filter(sorted(tables), database)
+                    for database, tables in tables_by_database.items()}
+        except Exception as e:
+            self.log(f"⚠️  테이블 목록 일괄 조회 실패 (데이터베이스별 조회로 진행): {e}")
+            return None
+
     def table_exists(self, database: str, table_name: str) -> bool:
         """테이블 존재 여부 확인"""
         try:
@@ -197,11 +614,36 @@ class MariaDBColumnManager:
             self.cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
             return self.cursor.fetchone() is not None
         except Exception as e:
-            print(f"  ❌ 테이블 존재 여부 확인 실패: {e}")
+            self.log(f"  ❌ 테이블 존재 여부 확인 실패: {e}")
+            return False
+
+    def load_column_inventory(self, databases: List[str], column_names: List[str]) -> bool:
+        """대상 데이터베이스들의 컬럼 목록을 일괄 조회하여 메모리에 보관 (처리할 컬럼만 조회)"""
+        try:
+            column_names = [name.lower() for name in column_names]
+            column_placeholders = ", ".join(["%s"] * len(column_names))
+            for offset in range(0, len(databases), INFORMATION_SCHEMA_BATCH_SIZE):
+                batch = databases[offset:offset + INFORMATION_SCHEMA_BATCH_SIZE]
+                schema_placeholders = ", ".join(["%s"] * len(batch))
+                query = f"""
+                    SELECT table_schema, table_name, column_name
+                    FROM information_schema.columns
+                    WHERE table_schema IN ({schema_placeholders}) AND column_name IN ({column_placeholders})
+                """
+                self.cursor.execute(query, (*batch, *column_names))
+                inventory = {database: set() for database in batch}
+                for schema, table_name, column_name in self.cursor.fetchall():
+                    inventory.setdefault(schema, set()).add((table_name, column_name.lower()))
+                self.column_inventory.update(inventory)
+            return True
+        except Exception as e:
+            self.log(f"⚠️  컬럼 목록 일괄 조회 실패 (개별 조회로 진행): {e}")
             return False
 
     def column_exists(self, database: str, table_name: str, column_name: str) -> bool:
-        """컬럼 존재 여부 확인"""
+        """컬럼 존재 여부 확인 (일괄 조회한 컬럼 목록이 있으면 메모리에서 확인)"""
+        if database in self.column_inventory:
+            return (table_name, column_name.lower()) in self.column_inventory[database]
         try:
             query = """
                 SELECT COUNT(*)
@@ -212,69 +654,642 @@ class MariaDBColumnManager:
             count = self.cursor.fetchone()[0]
             return count > 0
         except Exception as e:
-            print(f"    ❌ 컬럼 존재 여부 확인 실패: {e}")
+            self.log(f"    ❌ 컬럼 존재 여부 확인 실패: {e}")
             return False
 
-    def add_column(self, database: str, table_name: str, column_name: str, column_type: str) -> bool:
-        """컬럼 추가"""
+    def build_add_columns_sql(self, database: str, table_name: str, columns: Dict[str, str],
+                              comments: Dict[str, str], algorithm_clause: Optional[str] = None) -> str:
+        """누락된 컬럼들을 코멘트와 함께 한 번에 추가하는 ALTER TABLE 구문 생성"""
+        clauses = []
+        for column_name, column_type in columns.items():
+            clause = f"ADD COLUMN `{column_name}` {column_type}"
+            if comments.get(column_name):
+                clause += f" COMMENT {self.connection.escape(comments[column_name])}"
+            clauses.append(clause)
+        if algorithm_clause:
+            clauses.append(algorithm_clause)
+        return f"ALTER TABLE `{database}`.`{table_name}` " + ", ".join(clauses)
+
+    def add_columns(self, database: str, table_name: str, columns: Dict[str, str],
+                    comments: Dict[str, str], allow_copy: bool = False) -> Optional[str]:
+        """컬럼 추가 (테이블당 ALTER TABLE 한 번으로 모든 컬럼과 코멘트를 함께 추가하여 재구성도 한 번만 발생)
+
+        INSTANT → INPLACE, LOCK=NONE → (allow_copy면) COPY 순서로 시도하고 사용된 알고리즘을 반환
+        (실패 시 None, lock_wait_timeout 초과 시 DDLLockTimeout 발생)
+        """
+        algorithms = ONLINE_DDL_ALGORITHMS + ([COPY_DDL_ALGORITHM] if allow_copy else [])
+        for algorithm, algorithm_clause in algorithms:
+            try:
+                self.cursor.execute(self.build_add_columns_sql(database, table_name, columns, comments,
+                                                               algorithm_clause))
+            except Exception as e:
+                if e.args and e.args[0] == ER_LOCK_WAIT_TIMEOUT:
+                    raise DDLLockTimeout(str(e)) from e
+                if e.args and e.args[0] in ALTER_NOT_SUPPORTED_ERRORS:
+                    self.log(f"      ↪️  {algorithm} 불가: {e.args[1] if len(e.args) > 1 else e}")
+                    continue
+                self.log(f"      ❌ 컬럼 추가 실패: {e}")
+                return None
+
+            if database in self.column_inventory:
+                self.column_inventory[database].update((table_name, name.lower()) for name in columns)
+            self.algorithm_counts[algorithm] = self.algorithm_counts.get(algorithm, 0) + 1
+            if algorithm == COPY_DDL_ALGORITHM[0]:
+                self.copied_tables.append(f"{database}.{table_name}")
+            return algorithm
+
+        self.log(f"      ❌ 컬럼 추가 실패: 온라인 알고리즘({', '.join(name for name, _ in algorithms)})으로 "
+                 f"변경할 수 없습니다 (COPY는 --allow-copy로 허용)")
+        return None
+
+    def get_table_bytes(self, database: str, table_name: str) -> int:
+        """테이블 크기 (data_length + index_length, 조회 실패 시 0)"""
+        if (database, table_name) in self.table_sizes:
+            return self.table_sizes[(database, table_name)][0]
         try:
-            query = f"ALTER TABLE `{table_name}` ADD COLUMN `{column_name}` {column_type}"
-            self.cursor.execute(query)
-            return True
+            query = """
+                SELECT data_length + index_length
+                FROM information_schema.tables
+                WHERE table_schema = %s AND table_name = %s
+            """
+            self.cursor.execute(query, (database, table_name))
+            row = self.cursor.fetchone()
+            return int(row[0] or 0) if row else 0
         except Exception as e:
-            print(f"      ❌ 컬럼 추가 실패: {e}")
-            return False
+            self.log(f"      ⚠️  테이블 크기 조회 실패: {e}")
+            return 0
+
+    def find_lock_blockers(self, database: str, table_name: str) -> List[Tuple]:
+        """대상 테이블의 metadata lock을 오래 잡고 있는 세션과 그 테이블의 metadata lock을 기다리는 세션 조회
+
+        잠금 보유 세션은 metadata_lock_info 플러그인으로 테이블 단위로 확인하며,
+        플러그인이 없으면 innodb_trx의 오래 열린 트랜잭션 중 현재 쿼리가 대상 테이블을 참조하거나
+        같은 스키마에서 쿼리 없이 열려 있는(트랜잭션 중 유휴) 세션을 잠금 보유 세션으로 본다.
+        (innodb_trx에는 트랜잭션이 잡은 테이블 목록이 없으므로 유휴 세션은 스키마 단위로 판단)
+        """
+        # 대기 세션은 processlist에 잠금 대상 테이블이 없으므로 쿼리에 테이블 이름이 있는지로 판단
+        table_like = "%" + table_name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        waiting_query = """
+            SELECT p.id, p.time, p.state, LEFT(COALESCE(p.info, ''), 80)
+            FROM information_schema.processlist p
+            WHERE p.id <> CONNECTION_ID()
+              AND p.state LIKE 'Waiting for table metadata lock%%'
+              AND p.info LIKE %s
+        """
+        try:
+            if self.metadata_lock_info is not False:
+                try:
+                    query = """
+                        SELECT m.thread_id,
+                               COALESCE(TIMESTAMPDIFF(SECOND, t.trx_started, NOW()), p.time, 0),
+                               COALESCE(p.state, m.lock_mode), LEFT(COALESCE(t.trx_query, p.info, ''), 80)
+                        FROM information_schema.metadata_lock_info m
+                        LEFT JOIN information_schema.innodb_trx t ON t.trx_mysql_thread_id = m.thread_id
+                        LEFT JOIN information_schema.processlist p ON p.id = m.thread_id
+                        WHERE m.thread_id <> CONNECTION_ID()
+                          AND m.table_schema = %s AND m.table_name = %s
+                          AND COALESCE(TIMESTAMPDIFF(SECOND, t.trx_started, NOW()), p.time, 0) >= %s
+                        UNION ALL
+                    """ + waiting_query
+                    self.cursor.execute(query, (database, table_name, DDL_BLOCKER_MIN_AGE, table_like))
+                    self.metadata_lock_info = True
+                    return list(self.cursor.fetchall())
+                except Exception as e:
+                    if not (e.args and e.args[0] == ER_UNKNOWN_TABLE):
+                        raise
+                    self.metadata_lock_info = False
+                    self.log("      ⚠️  metadata_lock_info 플러그인이 없어 오래 열린 트랜잭션(innodb_trx)으로 "
+                             "잠금 보유 세션을 확인합니다 (INSTALL SONAME 'metadata_lock_info')")
+            query = """
+                SELECT t.trx_mysql_thread_id, TIMESTAMPDIFF(SECOND, t.trx_started, NOW()),
+                       COALESCE(p.state, t.trx_state), LEFT(COALESCE(t.trx_query, p.info, ''), 80)
+                FROM information_schema.innodb_trx t
+                LEFT JOIN information_schema.processlist p ON p.id = t.trx_mysql_thread_id
+                WHERE t.trx_mysql_thread_id <> CONNECTION_ID()
+                  AND ((t.trx_query IS NULL AND p.db = %s) OR t.trx_query LIKE %s)
+                  AND COALESCE(p.state, '') NOT LIKE 'Waiting for table metadata lock%%'
+                  AND TIMESTAMPDIFF(SECOND, t.trx_started, NOW()) >= %s
+                UNION ALL
+            """ + waiting_query
+            self.cursor.execute(query, (database, table_like, DDL_BLOCKER_MIN_AGE, table_like))
+            return list(self.cursor.fetchall())
+        except Exception as e:
+            self.log(f"      ⚠️  잠금 상태 조회 실패: {e}")
+            return []
+
+    def log_lock_blockers(self, blockers: List[Tuple]):
+        """blocker 세션 출력"""
+        for thread_id, age, state, query in blockers:
+            self.log(f"      🔒 blocker: id={thread_id} {age}초 ({state}) {query}")
+
+    def add_columns_guarded(self, database: str, table_name: str, columns: Dict[str, str],
+                            comments: Dict[str, str], allow_copy: bool = False) -> Optional[str]:
+        """잠금 보호 하에 컬럼 추가 (사용된 알고리즘 반환, 실패 시 None)
+
+        blocker/lock_wait_timeout으로 끝내 실행하지 못하면 DDLLockTimeout을 발생시킨다.
+        """
+        for attempt in range(DDL_RETRY_COUNT + 1):
+            if attempt > 0:
+                delay = backoff_delay(attempt - 1, DDL_RETRY_BASE_DELAY, DDL_RETRY_MAX_DELAY)
+                self.log(f"      ⏳ {delay:.1f}초 후 재시도 ({attempt}/{DDL_RETRY_COUNT})")
+                time.sleep(delay)
 
-    def add_column_comment(self, database: str, table_name: str, column_name: str,
-                          column_type: str, comment: str) -> bool:
-        """컬럼 코멘트 추가"""
+            blockers = self.find_lock_blockers(database, table_name)
+            if blockers:
+                self.log_lock_blockers(blockers)
+                continue
+
+            try:
+                return self.add_columns(database, table_name, columns, comments, allow_copy)
+            except DDLLockTimeout as e:
+                self.log(f"      🔒 lock_wait_timeout({DDL_LOCK_WAIT_TIMEOUT}초) 초과: {e}")
+
+        raise DDLLockTimeout(f"{database}.{table_name}: {DDL_RETRY_COUNT}회 재시도 후에도 잠금을 얻지 못함")
+
+    def get_applied_checksum(self, database: str, change_id: str) -> Optional[str]:
+        """변경 이력 테이블에서 적용된 체크섬 조회 (기록이 없거나 조회 실패 시 None)"""
+        try:
+            query = f"SELECT checksum FROM `{database}`.`{LEDGER_TABLE}` WHERE change_id = %s"
+            self.cursor.execute(query, (change_id,))
+            row = self.cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            if not (e.args and e.args[0] == ER_NO_SUCH_TABLE):
+                self.log(f"  ⚠️  변경 이력 조회 실패: {e}")
+            return None
+
+    def record_change(self, database: str, change_id: str, checksum: str) -> bool:
+        """변경 이력 테이블에 적용된 변경 ID와 체크섬 기록"""
         try:
-            query = f"ALTER TABLE `{table_name}` MODIFY COLUMN `{column_name}` {column_type} COMMENT '{comment}'"
-            self.cursor.execute(query)
+            self.cursor.execute(LEDGER_TABLE_SQL.format(database=database, table=LEDGER_TABLE))
+            query = f"""
+                INSERT INTO `{database}`.`{LEDGER_TABLE}` (change_id, checksum, applied_at)
+                VALUES (%s, %s, NOW())
+                ON DUPLICATE KEY UPDATE checksum = VALUES(checksum), applied_at = VALUES(applied_at)
+            """
+            self.cursor.execute(query, (change_id, checksum))
             return True
         except Exception as e:
-            print(f"      ⚠️  코멘트 추가 실패: {e}")
+            self.log(f"  ⚠️  변경 이력 기록 실패: {e}")
             return False
 
     def process_database(self, database: str, target_tables: List[str], columns: Dict[str, str],
-                        comments: Dict[str, str]) -> Tuple[int, int]:
-        """데이터베이스 처리"""
-        print(f"▶ {database} 데이터베이스 처리 중...")
-        print(f"  🎯 대상 테이블 패턴: {TARGET_TABLE_PATTERN}")
-        print(f"  📋 매칭된 테이블: {target_tables}")
+                        comments: Dict[str, str], use_ledger: bool = False,
+                        allow_copy: bool = False, osc_min_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """데이터베이스 처리
+
+        use_ledger면 적용 이력이 있는 버전은 건너뛰고, allow_copy면 COPY 알고리즘을 허용하며,
+        osc_min_bytes가 있으면 그 크기 이상인 테이블은 섀도 테이블 방식으로 변경한다.
+        """
+        self.log(f"▶ {database} 데이터베이스 처리 중...")
+        self.log(f"  🎯 대상 테이블 패턴: {TARGET_TABLE_PATTERN}")
+        self.log(f"  📋 매칭된 테이블: {target_tables}")
 
         added_count = 0
         existing_count = 0
+        failed_count = 0
+        skipped_count = 0
+        self.altered_tables = []
+
+        check_seconds = 0.0
+        ddl_seconds = 0.0
+
+        change_id, checksum = ledger_version(target_tables, columns, comments)
+        started = time.perf_counter()
+        applied = use_ledger and self.get_applied_checksum(database, change_id) == checksum
+        check_seconds += time.perf_counter() - started
+        if applied:
+            self.log(f"  ✅ 이미 적용된 버전 (ledger: {checksum[:12]})")
+            RUN_METRICS.observe('column_check', check_seconds)
+            RUN_METRICS.count_result('unchanged')
+            return added_count, len(target_tables) * len(columns)
 
         for table_name in target_tables:
-            print(f"  🎯 테이블 처리: {table_name}")
+            if (database, table_name) in self.table_sizes:
+                table_bytes, table_rows = self.table_sizes[(database, table_name)]
+                self.log(f"  🎯 테이블 처리: {table_name} ({format_bytes(table_bytes)}, 약 {table_rows:,}행)")
+            else:
+                self.log(f"  🎯 테이블 처리: {table_name}")
 
+            # 누락된 컬럼 수집
+            missing_columns = {}
             for column_name, column_type in columns.items():
-                print(f"    🔍 처리 중인 컬럼: '{column_name}'")
-                print(f"    🔍 컬럼 데이터 타입: '{column_type}'")
+                self.log(f"    🔍 처리 중인 컬럼: '{column_name}'")
+                self.log(f"    🔍 컬럼 데이터 타입: '{column_type}'")
+
+                started = time.perf_counter()
+                exists = self.column_exists(database, table_name, column_name)
+                check_seconds += time.perf_counter() - started
 
-                if self.column_exists(database, table_name, column_name):
-                    print(f"    ✅ 컬럼 존재: {column_name}")
+                if exists:
+                    self.log(f"    ✅ 컬럼 존재: {column_name}")
                     existing_count += 1
                 else:
-                    print(f"    ➕ 컬럼 추가: {column_name}")
-
-                    if self.add_column(database, table_name, column_name, column_type):
-                        print(f"      ✅ 추가 완료: {column_name}")
-                        added_count += 1
-
-                        # 코멘트 추가
-                        if column_name in comments and comments[column_name]:
-                            if self.add_column_comment(database, table_name, column_name,
-                                                     column_type, comments[column_name]):
-                                print(f"      ✅ 코멘트 추가 완료: {column_name}")
-                            else:
-                                print(f"      ⚠️  코멘트 추가 실패: {column_name} (컬럼은 정상 추가됨)")
-                    else:
-                        print(f"      ❌ 추가 실패: {column_name}")
+                    self.log(f"    ➕ 컬럼 추가 대상: {column_name}")
+                    missing_columns[column_name] = column_type
+
+            if not missing_columns:
+                continue
+
+            # 서버 부하/복제 지연이 높으면 대기
+            if self.throttle:
+                self.throttle.wait(f"{database}.{table_name}", self.log)
+
+            # 대용량 테이블은 섀도 테이블 방식으로 변경
+            online_change = None
+            if osc_min_bytes is not None:
+                try:
+                    table_bytes = self.get_table_bytes(database, table_name)
+                    if table_bytes >= osc_min_bytes:
+                        online_change = OnlineSchemaChange(self, database, table_name, missing_columns, comments)
+                        reason = online_change.inspect()
+                        if reason:
+                            self.log(f"      ↪️  섀도 테이블 방식 불가 ({reason}), ALTER TABLE로 진행")
+                            online_change = None
+                        else:
+                            self.log(f"      🌓 섀도 테이블 방식으로 변경 ({table_bytes / 1024 ** 3:.1f}GB)")
+                except Exception as e:
+                    # 크기/구조 확인에 실패해도 이 테이블은 잠금 보호 ALTER로 진행하고 다음 테이블/데이터베이스도 계속 처리
+                    self.log(f"      ⚠️  섀도 테이블 방식 확인 실패 ({e}), ALTER TABLE로 진행")
+                    online_change = None
+
+            # 누락된 컬럼을 코멘트와 함께 ALTER TABLE 한 번으로 추가
+            started = time.perf_counter()
+            try:
+                if online_change:
+                    algorithm = online_change.run()
+                else:
+                    algorithm = self.add_columns_guarded(database, table_name, missing_columns, comments,
+                                                         allow_copy)
+            except DDLLockTimeout:
+                self.log(f"      ⏸️  잠금 문제로 건너뜀: {table_name}")
+                self.skipped_tables.append(f"{database}.{table_name}")
+                skipped_count += len(missing_columns)
+                continue
+            finally:
+                ddl_seconds += time.perf_counter() - started
+
+            if algorithm:
+                self.log(f"      ✅ 추가 완료: {list(missing_columns)} (ALGORITHM={algorithm})")
+                added_count += len(missing_columns)
+                self.altered_tables.append(table_name)
+            else:
+                self.log(f"      ❌ 추가 실패: {list(missing_columns)}")
+                failed_count += len(missing_columns)
+
+        RUN_METRICS.observe('column_check', check_seconds)
+        if added_count or failed_count or skipped_count:
+            RUN_METRICS.observe('ddl', ddl_seconds)
+        if failed_count:
+            RUN_METRICS.count_result('failure')
+        elif skipped_count:
+            RUN_METRICS.count_result('deferred')
+        else:
+            RUN_METRICS.count_result('success' if added_count else 'unchanged')
+
+        if use_ledger and failed_count == 0 and skipped_count == 0:
+            self.record_change(database, change_id, checksum)
 
         return added_count, existing_count
 
+class OnlineSchemaChange:
+    """섀도 테이블 방식 온라인 스키마 변경 (컬럼 추가)
+
+    1. 원본과 같은 구조의 섀도 테이블을 만들고 새 컬럼 추가
+    2. 원본 테이블의 INSERT/UPDATE/DELETE를 트리거로 섀도 테이블에 반영
+    3. 기본 키 범위 청크 단위로 기존 행 복사 (청크 크기는 OSC_CHUNK_TARGET_SECONDS에 맞춰 조절)
+    4. RENAME TABLE 한 번으로 원본과 섀도 테이블을 원자적으로 교체
+
+    진행 상태를 OSC_PROGRESS_TABLE에 기록하므로 중단되면 다음 실행에서 마지막 청크부터 이어서 진행한다.
+    """
+
+    def __init__(self, manager: 'MariaDBColumnManager', database: str, table_name: str,
+                 columns: Dict[str, str], comments: Dict[str, str]):
+        self.manager = manager
+        self.cursor = manager.cursor
+        self.database = database
+        self.table_name = table_name
+        self.columns = columns
+        self.comments = comments
+        self.shadow_table = osc_object_name(table_name, 'new')
+        self.old_table = osc_object_name(table_name, 'old')
+        self.triggers = {event: osc_object_name(table_name, event.lower()[:3])
+                         for event in ('INSERT', 'UPDATE', 'DELETE')}
+        definition = json.dumps({'columns': columns, 'comments': comments}, ensure_ascii=False, sort_keys=True)
+        self.definition = hashlib.sha256(definition.encode('utf-8')).hexdigest()
+        self.table_columns = []
+        self.primary_key = None
+
+    def qualified(self, name: str) -> str:
+        return f"`{self.database}`.`{name}`"
+
+    def inspect(self) -> Optional[str]:
+        """온라인 스키마 변경이 불가능한 이유 반환 (가능하면 None)"""
+        self.cursor.execute("""
+            SELECT column_name, data_type, column_key
+            FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s
+            ORDER BY ordinal_position
+        """, (self.database, self.table_name))
+        rows = self.cursor.fetchall()
+        self.table_columns = [row[0] for row in rows]
+        primary_key = [row for row in rows if row[2] == 'PRI']
+        if len(primary_key) != 1 or primary_key[0][1].lower() not in OSC_INTEGER_TYPES:
+            return "정수형 단일 컬럼 기본 키가 없음"
+        self.primary_key = primary_key[0][0]
+
+        self.cursor.execute("""
+            SELECT
+              (SELECT COUNT(*) FROM information_schema.key_column_usage
+               WHERE referenced_table_name IS NOT NULL
+                 AND ((table_schema = %s AND table_name = %s)
+                      OR (referenced_table_schema = %s AND referenced_table_name = %s))),
+              (SELECT COUNT(*) FROM information_schema.triggers
+               WHERE event_object_schema = %s AND event_object_table = %s AND trigger_name NOT IN (%s, %s, %s)),
+              (SELECT COUNT(*) FROM information_schema.tables
+               WHERE table_schema = %s AND table_name = %s)
+        """, (self.database, self.table_name, self.database, self.table_name,
+              self.database, self.table_name, *self.triggers.values(), self.database, self.old_table))
+        foreign_keys, other_triggers, old_tables = self.cursor.fetchone()
+        if foreign_keys:
+            return "외래 키가 있는 테이블"
+        if other_triggers:
+            return "다른 트리거가 있는 테이블"
+        if old_tables:
+            return f"이전 작업의 {self.old_table} 테이블이 남아 있음"
+        return None
+
+    def execute_ddl(self, sql: str):
+        """metadata lock이 필요한 DDL 실행 (blocker/lock_wait_timeout이면 재시도, 끝내 실패하면 DDLLockTimeout)"""
+        for attempt in range(DDL_RETRY_COUNT + 1):
+            if attempt > 0:
+                delay = backoff_delay(attempt - 1, DDL_RETRY_BASE_DELAY, DDL_RETRY_MAX_DELAY)
+                self.manager.log(f"      ⏳ {delay:.1f}초 후 재시도 ({attempt}/{DDL_RETRY_COUNT})")
+                time.sleep(delay)
+
+            blockers = self.manager.find_lock_blockers(self.database, self.table_name)
+            if blockers:
+                self.manager.log_lock_blockers(blockers)
+                continue
+
+            try:
+                self.cursor.execute(sql)
+                return
+            except Exception as e:
+                if not (e.args and e.args[0] == ER_LOCK_WAIT_TIMEOUT):
+                    raise
+                self.manager.log(f"      🔒 lock_wait_timeout({DDL_LOCK_WAIT_TIMEOUT}초) 초과: {e}")
+
+        raise DDLLockTimeout(f"{self.database}.{self.table_name}: {DDL_RETRY_COUNT}회 재시도 후에도 잠금을 얻지 못함")
+
+    def load_progress(self) -> Optional[Tuple]:
+        """진행 상태 조회 (definition, last_pk, max_pk, copied_rows, status)"""
+        try:
+            self.cursor.execute(f"""
+                SELECT definition, last_pk, max_pk, copied_rows, status
+                FROM {self.qualified(OSC_PROGRESS_TABLE)} WHERE table_name = %s
+            """, (self.table_name,))
+            return self.cursor.fetchone()
+        except Exception as e:
+            if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+                return None
+            raise
+
+    def save_progress(self, last_pk, max_pk, copied_rows: int, status: str):
+        """진행 상태 기록"""
+        self.cursor.execute(f"""
+            INSERT INTO {self.qualified(OSC_PROGRESS_TABLE)}
+              (table_name, definition, last_pk, max_pk, copied_rows, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE definition = VALUES(definition), last_pk = VALUES(last_pk),
+              max_pk = VALUES(max_pk), copied_rows = VALUES(copied_rows), status = VALUES(status)
+        """, (self.table_name, self.definition, last_pk, max_pk, copied_rows, status))
+
+    def triggers_installed(self) -> bool:
+        """섀도 테이블 동기화 트리거가 모두 있는지 확인"""
+        self.cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.triggers
+            WHERE event_object_schema = %s AND event_object_table = %s AND trigger_name IN (%s, %s, %s)
+        """, (self.database, self.table_name, *self.triggers.values()))
+        return self.cursor.fetchone()[0] == len(self.triggers)
+
+    def cleanup(self):
+        """트리거, 섀도 테이블, 진행 상태 삭제"""
+        for trigger in self.triggers.values():
+            self.execute_ddl(f"DROP TRIGGER IF EXISTS {self.qualified(trigger)}")
+        self.cursor.execute(f"DROP TABLE IF EXISTS {self.qualified(self.shadow_table)}")
+        try:
+            self.cursor.execute(f"DELETE FROM {self.qualified(OSC_PROGRESS_TABLE)} WHERE table_name = %s",
+                                (self.table_name,))
+        except Exception as e:
+            if not (e.args and e.args[0] == ER_NO_SUCH_TABLE):
+                raise
+
+    def prepare(self):
+        """섀도 테이블 생성, 새 컬럼 추가, 동기화 트리거 설치"""
+        self.cursor.execute(OSC_PROGRESS_TABLE_SQL.format(database=self.database, table=OSC_PROGRESS_TABLE))
+        self.cursor.execute(f"CREATE TABLE {self.qualified(self.shadow_table)} LIKE {self.qualified(self.table_name)}")
+        self.cursor.execute(self.manager.build_add_columns_sql(self.database, self.shadow_table,
+                                                               self.columns, self.comments))
+
+        column_list = ", ".join(f"`{column}`" for column in self.table_columns)
+        new_values = ", ".join(f"NEW.`{column}`" for column in self.table_columns)
+        shadow = self.qualified(self.shadow_table)
+        table = self.qualified(self.table_name)
+        key = f"`{self.primary_key}`"
+        replace_new = f"REPLACE INTO {shadow} ({column_list}) VALUES ({new_values})"
+        delete_old = f"DELETE IGNORE FROM {shadow} WHERE {key} <=> OLD.{key}"
+        bodies = {
+            'INSERT': replace_new,
+            'UPDATE': f"BEGIN {delete_old}; {replace_new}; END",
+            'DELETE': delete_old,
+        }
+        for event, trigger in self.triggers.items():
+            self.execute_ddl(f"CREATE TRIGGER {self.qualified(trigger)} AFTER {event} ON {table} "
+                             f"FOR EACH ROW {bodies[event]}")
+
+        self.cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}")
+        min_pk, max_pk = self.cursor.fetchone()
+        last_pk = None if min_pk is None else min_pk - 1
+        self.save_progress(last_pk, max_pk, 0, 'copying' if max_pk is not None else 'copied')
+
+    def copy_rows(self, last_pk, max_pk, copied_rows: int) -> int:
+        """기본 키 범위 청크 단위로 원본 행을 섀도 테이블에 복사 (복사한 행 수 반환)"""
+        column_list = ", ".join(f"`{column}`" for column in self.table_columns)
+        shadow = self.qualified(self.shadow_table)
+        table = self.qualified(self.table_name)
+        key = f"`{self.primary_key}`"
+        chunk_size = OSC_CHUNK_SIZE_INITIAL
+        last_report = time.monotonic()
+
+        while last_pk < max_pk:
+            if self.manager.throttle:
+                self.manager.throttle.wait(f"{self.database}.{self.table_name}", self.manager.log)
+
+            # 청크 끝 기본 키 (남은 행이 청크보다 적으면 시작 시점의 최대 키까지)
+            self.cursor.execute(f"SELECT {key} FROM {table} WHERE {key} > %s ORDER BY {key} LIMIT 1 OFFSET %s",
+                                (last_pk, chunk_size - 1))
+            row = self.cursor.fetchone()
+            upper_pk = min(row[0], max_pk) if row else max_pk
+
+            started = time.perf_counter()
+            self.cursor.execute(f"""
+                INSERT IGNORE INTO {shadow} ({column_list})
+                SELECT {column_list} FROM {table} FORCE INDEX (PRIMARY)
+                WHERE {key} > %s AND {key} <= %s LOCK IN SHARE MODE
+            """, (last_pk, upper_pk))
+            elapsed = time.perf_counter() - started
+            copied_rows += max(self.cursor.rowcount, 0)
+            last_pk = upper_pk
+            self.save_progress(last_pk, max_pk, copied_rows, 'copying')
+
+            # 목표 시간에 맞춰 다음 청크 크기 조절 (급격한 변화를 막기 위해 한 번에 최대 2배)
+            ratio = OSC_CHUNK_TARGET_SECONDS / elapsed if elapsed > 0 else 2.0
+            chunk_size = int(min(OSC_CHUNK_SIZE_MAX, max(OSC_CHUNK_SIZE_MIN, chunk_size * min(2.0, ratio))))
+
+            if time.monotonic() - last_report >= OSC_REPORT_INTERVAL:
+                self.manager.log(f"      📦 복사 중: {copied_rows:,}행, 기본 키 {last_pk}/{max_pk} (청크 {chunk_size:,}행)")
+                last_report = time.monotonic()
+
+        self.save_progress(last_pk, max_pk, copied_rows, 'copied')
+        return copied_rows
+
+    def swap(self):
+        """RENAME TABLE로 원본과 섀도 테이블 교체 후 트리거와 이전 테이블 정리"""
+        table = self.qualified(self.table_name)
+        self.execute_ddl(f"RENAME TABLE {table} TO {self.qualified(self.old_table)}, "
+                         f"{self.qualified(self.shadow_table)} TO {table}")
+        # 트리거는 이름이 바뀐 이전 테이블에 남아 있으므로 삭제
+        for trigger in self.triggers.values():
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS {self.qualified(trigger)}")
+        if OSC_DROP_OLD_TABLE:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {self.qualified(self.old_table)}")
+        self.cursor.execute(f"DELETE FROM {self.qualified(OSC_PROGRESS_TABLE)} WHERE table_name = %s",
+                            (self.table_name,))
+
+    def run(self) -> Optional[str]:
+        """온라인 스키마 변경 실행 ('OSC' 반환, 실패 시 None, 잠금 문제로 중단되면 DDLLockTimeout 발생)"""
+        try:
+            progress = self.load_progress()
+            if progress and progress[0] == self.definition and self.triggers_installed():
+                _, last_pk, max_pk, copied_rows, status = progress
+                self.manager.log(f"      ↩️  이전 작업 이어서 진행: {copied_rows:,}행 복사됨, 기본 키 {last_pk}/{max_pk}")
+            else:
+                if progress:
+                    self.manager.log("      🧹 이전 작업 정리 후 다시 시작 (정의 변경 또는 트리거 없음)")
+                # 진행 상태를 기록하기 전에 중단된 경우에도 남은 섀도 테이블/트리거를 정리
+                self.cleanup()
+                self.manager.log(f"      🌓 섀도 테이블 생성: {self.shadow_table}")
+                self.prepare()
+                _, last_pk, max_pk, copied_rows, status = self.load_progress()
+
+            if status == 'copying':
+                copied_rows = self.copy_rows(last_pk, max_pk, copied_rows)
+                self.manager.log(f"      📦 복사 완료: {copied_rows:,}행")
+
+            self.swap()
+            self.manager.log(f"      🔁 테이블 교체 완료: {self.table_name}")
+        except DDLLockTimeout:
+            # 진행 상태와 트리거는 남겨 두고 다음 실행에서 이어서 진행
+            raise
+        except Exception as e:
+            self.manager.log(f"      ❌ 온라인 스키마 변경 실패: {e} (다음 실행에서 이어서 진행)")
+            return None
+
+        if self.database in self.manager.column_inventory:
+            self.manager.column_inventory[self.database].update(
+                (self.table_name, name.lower()) for name in self.columns)
+        self.manager.algorithm_counts['OSC'] = self.manager.algorithm_counts.get('OSC', 0) + 1
+        return 'OSC'
+
+def ledger_version(target_tables: List[str], columns: Dict[str, str],
+                   comments: Dict[str, str]) -> Tuple[str, str]:
+    """변경 이력용 (변경 ID, 체크섬) 계산 - 컬럼 정의나 대상 테이블 목록이 바뀌면 새 버전"""
+    change_id = f"add_columns:{TARGET_TABLE_PATTERN}"[:191]
+    definition = json.dumps({'columns': columns, 'comments': comments, 'tables': sorted(target_tables)},
+                            ensure_ascii=False, sort_keys=True)
+    return change_id, hashlib.sha256(definition.encode('utf-8')).hexdigest()
+
+def schedule_by_size(tables_by_database: Dict[str, List[str]],
+                     table_sizes: Dict[Tuple[str, str], Tuple[int, int]]) -> Dict[str, List[str]]:
+    """큰 테이블부터 처리하도록 정렬 (가장 큰 테이블이 큰 데이터베이스부터, 데이터베이스 안에서는 큰 테이블부터)"""
+    def size(database: str, table_name: str) -> int:
+        return table_sizes.get((database, table_name), (0, 0))[0]
+
+    ordered = {database: sorted(tables, key=lambda table_name: -size(database, table_name))
+               for database, tables in tables_by_database.items()}
+    return dict(sorted(ordered.items(),
+                       key=lambda item: (-max((size(item[0], t) for t in item[1]), default=0),
+                                         -sum(size(item[0], t) for t in item[1]))))
+
+def format_bytes(value: float) -> str:
+    """바이트 수를 읽기 쉬운 단위로 변환"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(value) < 1024:
+            return f"{value:.1f}{unit}" if unit != 'B' else f"{value:.0f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+def format_duration(seconds: float) -> str:
+    """초를 시:분:초 형식으로 변환"""
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def osc_object_name(table_name: str, suffix: str) -> str:
+    """온라인 스키마 변경용 섀도 테이블/트리거 이름 (식별자 최대 길이 64자 유지)"""
+    if len(table_name) > 50:
+        table_name = table_name[:41] + '_' + hashlib.md5(table_name.encode('utf-8')).hexdigest()[:8]
+    return f"_{table_name}_{suffix}"
+
+def parse_args() -> argparse.Namespace:
+    """명령행 옵션 파싱"""
+    parser = argparse.ArgumentParser(description="MariaDB 컬럼 체크 및 추가 스크립트")
+    add_runner_args(parser, globals(), list(DB_SELECTION_CHOICES))
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"동시에 처리할 데이터베이스 수 (데이터베이스마다 ALTER는 한 번에 하나, 기본값: {MAX_WORKERS})")
+    parser.add_argument('--no-ledger', dest='use_ledger', action='store_false', default=USE_LEDGER,
+                        help=f"변경 이력({LEDGER_TABLE})을 무시하고 모든 테이블의 컬럼을 다시 확인")
+    parser.add_argument('--allow-copy', action='store_true', default=ALLOW_COPY_ALGORITHM,
+                        help="INSTANT/INPLACE가 불가능한 테이블은 ALGORITHM=COPY로 변경 (테이블 쓰기 잠금 발생)")
+    parser.add_argument('--online-schema-change', action='store_true', default=OSC_ENABLED,
+                        help="대용량 테이블은 섀도 테이블 복사 후 RENAME TABLE로 교체 (중단 시 이어서 진행)")
+    parser.add_argument('--osc-min-gb', type=float, default=OSC_MIN_TABLE_GB,
+                        help=f"섀도 테이블 방식을 적용할 최소 테이블 크기(GB) (기본값: {OSC_MIN_TABLE_GB})")
+    parser.add_argument('--no-throttle', dest='throttle', action='store_false', default=THROTTLE_ENABLED,
+                        help="Threads_running/복제 지연에 따른 속도 조절 끄기")
+    parser.add_argument('--max-threads-running', type=int, default=THROTTLE_MAX_THREADS_RUNNING,
+                        help=f"일시 중지할 Threads_running 임계값 (기본값: {THROTTLE_MAX_THREADS_RUNNING})")
+    parser.add_argument('--max-replica-lag', type=int, default=THROTTLE_MAX_REPLICA_LAG,
+                        help=f"일시 중지할 복제 지연 임계값(초) (기본값: {THROTTLE_MAX_REPLICA_LAG})")
+    parser.add_argument('--replica-hosts', default=None,
+                        help="복제 지연을 확인할 복제 서버 목록 (쉼표 구분 host[:port], 기본값: REPLICA_HOSTS)")
+    parser.add_argument('--table-discovery', choices=['bulk', 'per_database'], default=TABLE_DISCOVERY,
+                        help=f"대상 테이블 검색 방법 (기본값: {TABLE_DISCOVERY})")
+    parser.add_argument('--metrics-file', default=METRICS_TEXTFILE,
+                        help=f"Prometheus textfile 메트릭 기록 경로 (빈 값이면 기록 안 함, 기본값: {METRICS_TEXTFILE})")
+    return parser.parse_args()
+
+# ========================================
+# 병렬 처리 (워커별 연결 사용)
+# ========================================
+def make_worker_manager(manager: MariaDBColumnManager) -> MariaDBColumnManager:
+    """워커 스레드 전용 매니저 생성 (워커마다 자체 연결 사용, 컬럼/크기 정보와 속도 조절은 공유)"""
+    worker_manager = MariaDBColumnManager(manager.host, manager.user, manager.password, manager.port)
+    worker_manager.column_inventory = manager.column_inventory
+    worker_manager.table_sizes = manager.table_sizes
+    worker_manager.throttle = manager.throttle
+    return worker_manager
+
+def merge_worker_manager(manager: MariaDBColumnManager, worker_manager: MariaDBColumnManager):
+    """워커별 결과를 메인 매니저로 모음"""
+    for algorithm, count in worker_manager.algorithm_counts.items():
+        manager.algorithm_counts[algorithm] = manager.algorithm_counts.get(algorithm, 0) + count
+    manager.copied_tables.extend(worker_manager.copied_tables)
+    manager.skipped_tables.extend(worker_manager.skipped_tables)
+
+# --db-selection 옵션 값 -> 선택 메뉴 번호
+DB_SELECTION_CHOICES = {'file': '1', 'table': '2'}
+
 def get_user_choice() -> str:
     """사용자 선택 메뉴"""
     print("🔧 MariaDB 10.5 컬럼 체크 및 추가 스크립트")
@@ -293,8 +1308,11 @@ def get_user_choice() -> str:
 
 def main():
     """메인 함수"""
-    # 사용자 선택
-    choice = get_user_choice()
+    args = parse_args()
+    apply_connection_args(args, globals(), RUN_METRICS)
+
+    # 사용자 선택 (--db-selection 지정 시 메뉴 생략)
+    choice = DB_SELECTION_CHOICES[args.db_selection] if args.db_selection else get_user_choice()
 
     if choice == '1':
         db_selection_method = "file"
@@ -306,7 +1324,7 @@ def main():
     print("")
 
     # MariaDB 연결
-    manager = MariaDBColumnManager(DB_HOST, DB_USER, DB_PASS)
+    manager = MariaDBColumnManager(DB_HOST, DB_USER, DB_PASS, DB_PORT)
     if not manager.connect():
         sys.exit(1)
 
@@ -320,6 +1338,14 @@ def main():
     print("✅ MariaDB 연결 성공")
     print("")
 
+    # 부하 기반 속도 조절
+    if args.throttle:
+        replica_hosts = REPLICA_HOSTS
+        if args.replica_hosts is not None:
+            replica_hosts = [host.strip() for host in args.replica_hosts.split(',') if host.strip()]
+        manager.throttle = LoadThrottle(f"{DB_HOST}:{DB_PORT}", DB_USER, DB_PASS, replica_hosts,
+                                        args.max_threads_running, args.max_replica_lag)
+
     # 데이터베이스 목록 가져오기
     databases = []
 
@@ -349,6 +1375,8 @@ def main():
         for db in databases:
             print(f"  - {db}")
 
+    # 중복 제거 (같은 데이터베이스가 두 워커에 동시에 배정되지 않도록)
+    databases = list(dict.fromkeys(databases))
     print("")
 
     # 설정 정보 출력
@@ -360,22 +1388,85 @@ def main():
         print(f"🎯 데이터베이스 리스트 파일: {DB_LIST_FILE}")
     print(f"🎯 대상 테이블 패턴: {TARGET_TABLE_PATTERN}")
     print(f"🚫 제외할 테이블 패턴: {EXCLUDED_TABLE_PATTERNS}")
+    print(f"🔍 테이블 검색 방법: {args.table_discovery}")
+    print(f"⚡ 워커 수: {args.workers} (데이터베이스당 동시 ALTER 1개)")
+    if args.online_schema_change:
+        print(f"🌓 섀도 테이블 방식: {args.osc_min_gb:g}GB 이상 테이블 (청크 목표 {OSC_CHUNK_TARGET_SECONDS:g}초)")
+    if manager.throttle:
+        print(f"🐢 속도 조절: Threads_running < {args.max_threads_running}, "
+              f"복제 지연 < {args.max_replica_lag}초 (복제 서버: {manager.throttle.replica_hosts or '없음'})")
+    else:
+        print("🐢 속도 조절: 사용 안 함")
+    print(f"⚙️  DDL 알고리즘: {' → '.join(name for name, _ in ONLINE_DDL_ALGORITHMS)}"
+          + (f" → {COPY_DDL_ALGORITHM[0]} (허용)" if args.allow_copy else " (COPY 허용 안 함)"))
     print(f"📋 처리할 컬럼: {list(COLUMNS.keys())}")
     print("")
 
-    # 각 데이터베이스 처리
-    total_added = 0
-    total_existing = 0
+    # 대상 데이터베이스의 테이블 목록 일괄 조회
+    tables_by_database = None
+    if args.table_discovery == 'bulk':
+        print(f"🔍 테이블 목록 일괄 조회 중... (데이터베이스 {len(databases)}개)")
+        with RUN_METRICS.timer('discovery'):
+            tables_by_database = manager.discover_matching_tables(databases, TABLE_MATCHER)
+
+    # 대상 데이터베이스의 컬럼 목록 일괄 조회
+    print(f"🔍 컬럼 목록 일괄 조회 중... (데이터베이스 {len(databases)}개)")
+    with RUN_METRICS.timer('column_inventory'):
+        manager.load_column_inventory(databases, list(COLUMNS.keys()))
+    print("")
+
+    # 섀도 테이블 방식 적용 크기
+    osc_min_bytes = int(args.osc_min_gb * 1024 ** 3) if args.online_schema_change else None
+
+    # 크기 기준 작업 순서와 진행률
+    total_bytes = 0
+    if tables_by_database is not None:
+        if SCHEDULE_LARGEST_FIRST:
+            tables_by_database = schedule_by_size(tables_by_database, manager.table_sizes)
+            databases = list(tables_by_database)
+        table_count = sum(len(tables) for tables in tables_by_database.values())
+        total_bytes = sum(manager.get_table_bytes(database, table_name)
+                          for database, tables in tables_by_database.items() for table_name in tables)
+        largest = max(((database, table_name) for database, tables in tables_by_database.items()
+                       for table_name in tables), key=lambda key: manager.table_sizes.get(key, (0, 0))[0],
+                      default=None)
+        print(f"📏 작업량: 테이블 {table_count}개, {format_bytes(total_bytes)}"
+              + (f" (가장 큰 테이블: {largest[0]}.{largest[1]} {format_bytes(manager.table_sizes[largest][0])})"
+                 if largest else ""))
+        print("")
+    progress = ProgressTracker(total_bytes, len(databases))
 
-    for database in databases:
-        matching_tables = manager.get_matching_tables(database, TARGET_TABLE_PATTERN)
+    # 각 데이터베이스 처리
+    def column_task(task_manager: MariaDBColumnManager, database: str) -> Tuple[int, int]:
+        added, existing = 0, 0
+        if tables_by_database is not None:
+            matching_tables = tables_by_database.get(database, [])
+        else:
+            with RUN_METRICS.timer('discovery'):
+                matching_tables = task_manager.get_matching_tables(database, TABLE_MATCHER)
         if matching_tables:
-            added, existing = manager.process_database(database, matching_tables, COLUMNS, COMMENTS)
-            total_added += added
-            total_existing += existing
+            added, existing = task_manager.process_database(database, matching_tables, COLUMNS, COMMENTS,
+                                                            use_ledger=args.use_ledger, allow_copy=args.allow_copy,
+                                                            osc_min_bytes=osc_min_bytes)
         else:
-            print(f"▶ {database} 데이터베이스 처리 중...")
-            print(f"  ❌ {TARGET_TABLE_PATTERN} 패턴에 맞는 테이블을 찾을 수 없습니다.")
+            task_manager.log(f"▶ {database} 데이터베이스 처리 중...")
+            task_manager.log(f"  ❌ {TARGET_TABLE_PATTERN} 패턴에 맞는 테이블을 찾을 수 없습니다.")
+            RUN_METRICS.count_result('skipped')
+
+        # 실제로 변경한 테이블만 처리량으로 세고 나머지(이미 적용됨/건너뜀/실패)는 전체 작업량에서 뺌
+        altered = set(task_manager.altered_tables) if matching_tables else set()
+        table_bytes = {table_name: task_manager.table_sizes.get((database, table_name), (0, 0))[0]
+                       for table_name in matching_tables}
+        report = progress.advance(sum(size for table_name, size in table_bytes.items() if table_name in altered),
+                                  sum(size for table_name, size in table_bytes.items() if table_name not in altered))
+        if report:
+            task_manager.log(report)
+        return added, existing
+
+    total_added, total_existing = process_databases(manager, databases, column_task, workers=args.workers,
+                                                     make_worker=make_worker_manager,
+                                                     prepare_worker=connect_worker,
+                                                     merge_worker=merge_worker_manager)
 
     # 결과 출력
     print("")
@@ -392,8 +1483,34 @@ def main():
     print(f"   - 각 컬럼: {list(COLUMNS.keys())}")
     print(f"   - 새로 추가된 컬럼: {total_added}개")
     print(f"   - 이미 존재하는 컬럼: {total_existing}개")
+    if manager.algorithm_counts:
+        print(f"   - 사용된 DDL 알고리즘: "
+              + ", ".join(f"{name} {count}개 테이블" for name, count in sorted(manager.algorithm_counts.items())))
+    if manager.skipped_tables:
+        print(f"   - 잠금 문제로 건너뛴 테이블: {len(manager.skipped_tables)}개 (다시 실행 필요)")
+        for table in manager.skipped_tables:
+            print(f"     - {table}")
+    if manager.throttle and (manager.throttle.paused_seconds or manager.throttle.delayed_seconds):
+        print(f"   - 속도 조절 대기: 일시 중지 {manager.throttle.paused_seconds:.0f}초, "
+              f"감속 {manager.throttle.delayed_seconds:.1f}초")
+    if manager.copied_tables:
+        print(f"   - ⚠️  COPY로 변경된 테이블 (쓰기 잠금 발생): {len(manager.copied_tables)}개")
+        for table in manager.copied_tables:
+            print(f"     - {table}")
+
+    write_run_metrics(RUN_METRICS, args.metrics_file)
+    write_run_summary(args.summary_file, RUN_METRICS, DB_HOST, DB_PORT, {
+        'databases': len(databases),
+        'added_columns': total_added,
+        'existing_columns': total_existing,
+        'algorithms': manager.algorithm_counts,
+        'skipped_tables': manager.skipped_tables,
+        'copied_tables': manager.copied_tables,
+    })
 
     # 연결 해제
+    if manager.throttle:
+        manager.throttle.close()
     manager.disconnect()
 
 if __name__ == "__main__":
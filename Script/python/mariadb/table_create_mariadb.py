@@ -15,12 +15,20 @@ MariaDB 10.5 테이블 생성 스크립트 (Python 3.11.9)
 import pymysql
 import sys
 import os
-from typing import List, Dict, Tuple
+import time
+import argparse
+from typing import List, Tuple, Optional
+
+# 세 스크립트가 함께 쓰는 공용 모듈 (Script/python/schema_common.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema_common import RunMetrics, write_run_metrics, backoff_delay, connect_worker, process_databases, \
+    add_runner_args, apply_connection_args, write_run_summary
 
 # ========================================
 # MariaDB 서버 접속 정보 설정
 # ========================================
 DB_HOST = 'localhost'
+DB_PORT = 3306
 DB_USER = 'user'
 DB_PASS = 'password'
 
@@ -62,6 +70,34 @@ CREATE TABLE `CRAWLING_LOG` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_general_ci COMMENT='크롤링 로그테이블'
 """
 
+# ========================================
+# 병렬 처리 설정
+# ========================================
+# 1이면 기존처럼 순차 처리, 2 이상이면 워커마다 별도 연결로 여러 데이터베이스를 동시에 처리
+# 워커는 데이터베이스 단위로 작업을 받으므로 같은 데이터베이스에서 DDL이 동시에 실행되지 않음
+MAX_WORKERS = 1  # --workers 옵션으로 변경 가능
+
+# ========================================
+# DDL 잠금 보호 설정 (metadata lock)
+# ========================================
+# 새 테이블 생성(CREATE TABLE)은 다른 세션의 행 트랜잭션 뒤에 줄을 서지 않으므로 blocker를 미리 조회하지 않고,
+# 세션 lock_wait_timeout을 짧게 설정하여 metadata lock 대기가 길어지면 재시도
+# (끝내 실행하지 못한 테이블은 마지막에 출력)
+DDL_LOCK_WAIT_TIMEOUT = 5        # DDL 세션의 lock_wait_timeout (초)
+DDL_RETRY_COUNT = 3              # lock_wait_timeout 발생 시 재시도 횟수
+DDL_RETRY_BASE_DELAY = 2.0       # 재시도 대기 기본 시간(초), 재시도마다 2배 + 지터
+DDL_RETRY_MAX_DELAY = 30.0       # 재시도 대기 최대 시간(초)
+
+# lock_wait_timeout 초과 시 MariaDB 오류 코드 (ER_LOCK_WAIT_TIMEOUT)
+ER_LOCK_WAIT_TIMEOUT = 1205
+
+# ========================================
+# Prometheus 메트릭 설정 (node_exporter textfile collector)
+# ========================================
+# 실행이 끝나면 데이터베이스별 연결/검색/DDL 소요 시간과 처리 결과 건수를 textfile 형식으로 기록
+# node_exporter의 --collector.textfile.directory 경로와 맞출 것 (None이면 기록하지 않음)
+METRICS_TEXTFILE = '/var/lib/node_exporter/textfile_collector/schema_table_create_mariadb.prom'
+
 # ========================================
 # 시스템 데이터베이스 목록 (제외할 DB)
 # ========================================
@@ -70,31 +106,60 @@ SYSTEM_DBS = {
     'sys', 'test', 'tmp', 'temp'
 }
 
+class DDLLockTimeout(Exception):
+    """DDL이 lock_wait_timeout 안에 metadata lock을 얻지 못함 (재시도 대상)"""
+
+# 실행 메트릭
+RUN_METRICS = RunMetrics('table_create_mariadb')
+
 class MariaDBTableManager:
     """MariaDB 테이블 관리 클래스"""
     
-    def __init__(self, host: str, user: str, password: str):
+    def __init__(self, host: str, user: str, password: str, port: int = 3306):
         self.host = host
+        self.port = port
         self.user = user
         self.password = password
         self.connection = None
         self.cursor = None
+        self.skipped_tables = []  # 잠금 문제로 건너뛴 테이블 (database.table)
+        self.output = None        # 병렬 처리 시 데이터베이스별 출력 버퍼
+    
+    def log(self, message: str):
+        """출력 (버퍼 수집 중이면 버퍼에 저장)"""
+        if self.output is not None:
+            self.output.append(message)
+        else:
+            print(message)
+    
+    def begin_capture(self):
+        """데이터베이스별 출력 수집 시작"""
+        self.output = []
+    
+    def end_capture(self) -> List[str]:
+        """데이터베이스별 출력 수집 종료 후 수집된 출력 반환"""
+        lines, self.output = self.output or [], None
+        return lines
     
     def connect(self) -> bool:
         """MariaDB 연결"""
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                charset='utf8mb4',
-                autocommit=True
-            )
+            with RUN_METRICS.timer('connect'):
+                self.connection = pymysql.connect(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    charset='utf8mb4',
+                    autocommit=True
+                )
             self.cursor = self.connection.cursor()
-            print("✅ MariaDB 연결 성공")
+            # DDL이 metadata lock을 오래 기다리며 뒤따르는 쿼리를 막지 않도록 대기 시간 제한
+            self.cursor.execute("SET SESSION lock_wait_timeout = %s", (DDL_LOCK_WAIT_TIMEOUT,))
+            self.log("✅ MariaDB 연결 성공")
             return True
         except Exception as e:
-            print(f"❌ MariaDB 연결 실패: {e}")
+            self.log(f"❌ MariaDB 연결 실패: {e}")
             return False
     
     def disconnect(self):
@@ -110,7 +175,7 @@ class MariaDBTableManager:
             self.cursor.execute("SELECT 1")
             return True
         except Exception as e:
-            print(f"❌ 연결 테스트 실패: {e}")
+            self.log(f"❌ 연결 테스트 실패: {e}")
             return False
     
     def get_databases_by_table(self, table_name: str) -> List[str]:
@@ -125,14 +190,14 @@ class MariaDBTableManager:
             databases = [row[0] for row in self.cursor.fetchall()]
             return databases
         except Exception as e:
-            print(f"❌ 데이터베이스 조회 실패: {e}")
+            self.log(f"❌ 데이터베이스 조회 실패: {e}")
             return []
     
     def get_databases_from_file(self, file_path: str) -> List[str]:
         """파일에서 데이터베이스 목록 읽기"""
         try:
             if not os.path.exists(file_path):
-                print(f"❌ 파일을 찾을 수 없습니다: {file_path}")
+                self.log(f"❌ 파일을 찾을 수 없습니다: {file_path}")
                 return []
             
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -143,7 +208,7 @@ class MariaDBTableManager:
                         databases.append(line)
                 return databases
         except Exception as e:
-            print(f"❌ 파일 읽기 실패: {e}")
+            self.log(f"❌ 파일 읽기 실패: {e}")
             return []
     
     def get_all_databases(self) -> List[str]:
@@ -154,7 +219,7 @@ class MariaDBTableManager:
                         if row[0] not in SYSTEM_DBS]
             return databases
         except Exception as e:
-            print(f"❌ 데이터베이스 목록 조회 실패: {e}")
+            self.log(f"❌ 데이터베이스 목록 조회 실패: {e}")
             return []
     
     def table_exists(self, database: str, table_name: str) -> bool:
@@ -169,9 +234,25 @@ class MariaDBTableManager:
             count = self.cursor.fetchone()[0]
             return count > 0
         except Exception as e:
-            print(f"  ❌ 테이블 존재 여부 확인 실패: {e}")
+            self.log(f"  ❌ 테이블 존재 여부 확인 실패: {e}")
             return False
     
+    def create_table_guarded(self, database: str, table_name: str, create_sql: str) -> Optional[bool]:
+        """잠금 보호 하에 테이블 생성 (lock_wait_timeout으로 끝내 실행하지 못하면 None)"""
+        for attempt in range(DDL_RETRY_COUNT + 1):
+            if attempt > 0:
+                delay = backoff_delay(attempt - 1, DDL_RETRY_BASE_DELAY, DDL_RETRY_MAX_DELAY)
+                self.log(f"      ⏳ {delay:.1f}초 후 재시도 ({attempt}/{DDL_RETRY_COUNT})")
+                time.sleep(delay)
+            
+            try:
+                return self.create_table(database, table_name, create_sql)
+            except DDLLockTimeout as e:
+                self.log(f"      🔒 lock_wait_timeout({DDL_LOCK_WAIT_TIMEOUT}초) 초과: {e}")
+        
+        self.skipped_tables.append(f"{database}.{table_name}")
+        return None
+    
     def create_table(self, database: str, table_name: str, create_sql: str) -> bool:
         """테이블 생성"""
         try:
@@ -182,31 +263,69 @@ class MariaDBTableManager:
             self.cursor.execute(create_sql)
             return True
         except Exception as e:
-            print(f"      ❌ 테이블 생성 실패: {e}")
+            if e.args and e.args[0] == ER_LOCK_WAIT_TIMEOUT:
+                raise DDLLockTimeout(str(e)) from e
+            self.log(f"      ❌ 테이블 생성 실패: {e}")
             return False
     
     def process_database(self, database: str, target_table: str, create_sql: str) -> Tuple[int, int]:
         """데이터베이스 처리"""
-        print(f"▶ {database} 데이터베이스 처리 중...")
-        print(f"  🎯 대상 테이블: {target_table}")
+        self.log(f"▶ {database} 데이터베이스 처리 중...")
+        self.log(f"  🎯 대상 테이블: {target_table}")
         
         created_count = 0
         existing_count = 0
         
-        if self.table_exists(database, target_table):
-            print(f"  ✅ 테이블 존재: {target_table}")
+        with RUN_METRICS.timer('discovery'):
+            exists = self.table_exists(database, target_table)
+        
+        if exists:
+            RUN_METRICS.count_result('unchanged')
+            self.log(f"  ✅ 테이블 존재: {target_table}")
             existing_count += 1
         else:
-            print(f"  ➕ 테이블 생성: {target_table}")
+            self.log(f"  ➕ 테이블 생성: {target_table}")
             
-            if self.create_table(database, target_table, create_sql):
-                print(f"      ✅ 생성 완료: {target_table}")
+            with RUN_METRICS.timer('ddl'):
+                created = self.create_table_guarded(database, target_table, create_sql)
+            
+            if created is None:
+                self.log(f"      ⏸️  잠금 문제로 건너뜀: {target_table}")
+                RUN_METRICS.count_result('deferred')
+            elif created:
+                self.log(f"      ✅ 생성 완료: {target_table}")
                 created_count += 1
+                RUN_METRICS.count_result('success')
             else:
-                print(f"      ❌ 생성 실패: {target_table}")
+                self.log(f"      ❌ 생성 실패: {target_table}")
+                RUN_METRICS.count_result('failure')
         
         return created_count, existing_count
 
+# ========================================
+# 병렬 처리 (워커별 연결 사용)
+# ========================================
+def make_worker_manager(manager: MariaDBTableManager) -> MariaDBTableManager:
+    """워커 스레드 전용 매니저 생성 (워커마다 자체 연결 사용)"""
+    return MariaDBTableManager(manager.host, manager.user, manager.password, manager.port)
+
+def merge_worker_manager(manager: MariaDBTableManager, worker_manager: MariaDBTableManager):
+    """워커별 결과를 메인 매니저로 모음"""
+    manager.skipped_tables.extend(worker_manager.skipped_tables)
+
+def parse_args() -> argparse.Namespace:
+    """명령행 옵션 파싱"""
+    parser = argparse.ArgumentParser(description="MariaDB 테이블 생성 스크립트")
+    add_runner_args(parser, globals(), list(DB_SELECTION_CHOICES))
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"동시에 처리할 데이터베이스 수 (기본값: {MAX_WORKERS})")
+    parser.add_argument('--metrics-file', default=METRICS_TEXTFILE,
+                        help=f"Prometheus textfile 메트릭 기록 경로 (빈 값이면 기록 안 함, 기본값: {METRICS_TEXTFILE})")
+    return parser.parse_args()
+
+# --db-selection 옵션 값 -> 선택 메뉴 번호
+DB_SELECTION_CHOICES = {'file': '1', 'table': '2'}
+
 def get_user_choice() -> str:
     """사용자 선택 메뉴"""
     print("🔧 MariaDB 10.5 테이블 생성 스크립트")
@@ -225,8 +344,11 @@ def get_user_choice() -> str:
 
 def main():
     """메인 함수"""
-    # 사용자 선택
-    choice = get_user_choice()
+    args = parse_args()
+    apply_connection_args(args, globals(), RUN_METRICS)
+    
+    # 사용자 선택 (--db-selection 지정 시 메뉴 생략)
+    choice = DB_SELECTION_CHOICES[args.db_selection] if args.db_selection else get_user_choice()
     
     if choice == '1':
         db_selection_method = "file"
@@ -238,7 +360,7 @@ def main():
     print("")
     
     # MariaDB 연결
-    manager = MariaDBTableManager(DB_HOST, DB_USER, DB_PASS)
+    manager = MariaDBTableManager(DB_HOST, DB_USER, DB_PASS, DB_PORT)
     if not manager.connect():
         sys.exit(1)
     
@@ -281,6 +403,8 @@ def main():
         for db in databases:
             print(f"  - {db}")
     
+    # 중복 제거 (같은 데이터베이스가 두 워커에 동시에 배정되지 않도록)
+    databases = list(dict.fromkeys(databases))
     print("")
     
     # 설정 정보 출력
@@ -291,16 +415,17 @@ def main():
     elif db_selection_method == "file":
         print(f"🎯 데이터베이스 리스트 파일: {DB_LIST_FILE}")
     print(f"🎯 대상 테이블: {TARGET_TABLE} (생성 대상)")
+    print(f"⚡ 워커 수: {args.workers}")
     print("")
     
     # 각 데이터베이스 처리
-    total_created = 0
-    total_existing = 0
+    def table_task(task_manager: MariaDBTableManager, database: str) -> Tuple[int, int]:
+        return task_manager.process_database(database, TARGET_TABLE, CREATE_TABLE_SQL)
     
-    for database in databases:
-        created, existing = manager.process_database(database, TARGET_TABLE, CREATE_TABLE_SQL)
-        total_created += created
-        total_existing += existing
+    total_created, total_existing = process_databases(manager, databases, table_task, workers=args.workers,
+                                                      make_worker=make_worker_manager,
+                                                      prepare_worker=connect_worker,
+                                                      merge_worker=merge_worker_manager)
     
     # 결과 출력
     print("")
@@ -314,6 +439,18 @@ def main():
     print(f"   - 대상 데이터베이스 수: {len(databases)}")
     print(f"   - 새로 생성된 테이블: {total_created}개")
     print(f"   - 이미 존재하는 테이블: {total_existing}개")
+    if manager.skipped_tables:
+        print(f"   - 잠금 문제로 건너뛴 테이블: {len(manager.skipped_tables)}개 (다시 실행 필요)")
+        for table in manager.skipped_tables:
+            print(f"     - {table}")
+        
+    write_run_metrics(RUN_METRICS, args.metrics_file)
+    write_run_summary(args.summary_file, RUN_METRICS, DB_HOST, DB_PORT, {
+        'databases': len(databases),
+        'created_tables': total_created,
+        'existing_tables': total_existing,
+        'skipped_tables': manager.skipped_tables,
+    })
     
     # 연결 해제
     manager.disconnect()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+다중 호스트 스키마 변경 실행 스크립트 (Python 3.11.9)
+목적: 인벤토리 파일에 등록된 여러 MariaDB / PostgreSQL 서버에서
+      같은 테이블 생성 또는 컬럼 변경 스크립트를 동시에 실행하고 서버별 결과를 합쳐서 출력
+
+동작 방식:
+1. 인벤토리(INI) 파일에서 서버 목록, 접속 계정, 비밀번호 환경 변수, 서버별 동시 처리 수 읽기
+2. 작업(table/column)과 서버 엔진에 맞는 스크립트를 서버마다 별도 프로세스로 실행
+   (선택 메뉴 없이 --db-selection, 접속 정보는 --host/--port/--user/--password-env로 전달)
+3. 서버별 출력은 실행 디렉토리의 run.log에, 결과 요약은 summary.json에 기록
+   (PostgreSQL 카탈로그 스냅샷은 실행마다 바뀌지 않는 <output-dir>/<서버 이름>/에 두고 다음 실행에서 재사용)
+4. 모든 서버가 끝나면 서버별 결과와 합계를 출력하고 전체 요약을 summary.json으로 기록
+
+사용법:
+    python3 multi_host_runner.py --inventory hosts.ini --task table
+    python3 multi_host_runner.py --inventory hosts.ini --task column --hosts maria-tenant-01,maria-tenant-02
+    python3 multi_host_runner.py --inventory hosts.ini --task table --engine postgresql -- --dry-run
+    ('--' 뒤의 옵션은 각 스크립트에 그대로 전달)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import subprocess
+import configparser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict
+
+from schema_common import SUMMARY_COUNT_KEYS, SUMMARY_LIST_KEYS
+
+# ========================================
+# 인벤토리 설정
+# ========================================
+INVENTORY_FILE = 'hosts.ini'  # 서버 목록 파일 (예시: hosts.ini.example)
+
+# 엔진별 기본 포트 (인벤토리에 port가 없을 때 사용)
+DEFAULT_PORTS = {'mariadb': '3306', 'postgresql': '5432'}
+
+# ========================================
+# 실행 설정
+# ========================================
+MAX_PARALLEL_HOSTS = 4     # 동시에 실행할 서버 수 (0이면 모든 서버를 동시에 실행)
+RUN_OUTPUT_DIR = 'runs'    # 실행 결과 디렉토리 (실행마다 시각별 하위 디렉토리 생성)
+
+# 서버별 Prometheus 메트릭 기록 디렉토리 (빈 값이면 기록하지 않음)
+# 서버마다 파일을 나누어 기록하므로 node_exporter에서 db_host 레이블로 구분됨
+METRICS_DIR = '/var/lib/node_exporter/textfile_collector'
+
+# ========================================
+# 작업별 스크립트 설정
+# ========================================
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 작업 -> {엔진: 스크립트 경로} (엔진이 없으면 해당 서버는 건너뜀)
+TASK_SCRIPTS = {
+    'table': {
+        'mariadb': os.path.join(SCRIPT_DIR, 'mariadb', 'table_create_mariadb.py'),
+        'postgresql': os.path.join(SCRIPT_DIR, 'postgresql', 'table_create_postgresql.py'),
+    },
+    'column': {
+        'mariadb': os.path.join(SCRIPT_DIR, 'mariadb', 'column_check_alter_mariadb_pattern.py'),
+    },
+}
+
+# 서버별 요약(summary.json)에서 합계/건수를 낼 항목은 스크립트와 함께 schema_common.py에서 관리
+
+class InventoryError(Exception):
+    """인벤토리 파일 오류"""
+
+def load_inventory(file_path: str) -> List[Dict]:
+    """인벤토리 파일에서 서버 목록 읽기 (섹션 하나가 서버 하나)"""
+    if not os.path.exists(file_path):
+        raise InventoryError(f"인벤토리 파일을 찾을 수 없습니다: {file_path}")
+
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(file_path, encoding='utf-8')
+    base_dir = os.path.dirname(os.path.abspath(file_path))
+
+    hosts = []
+    for name in parser.sections():
+        section = parser[name]
+        engine = section.get('engine', '').strip().lower()
+        if engine not in DEFAULT_PORTS:
+            raise InventoryError(f"[{name}] engine은 {list(DEFAULT_PORTS)} 중 하나여야 합니다: '{engine}'")
+        for key in ('host', 'user', 'password_env'):
+            if not section.get(key, '').strip():
+                raise InventoryError(f"[{name}] {key} 항목이 필요합니다")
+        try:
+            concurrency = section.getint('concurrency', fallback=1)
+            enabled = section.getboolean('enabled', fallback=True)
+        except ValueError as e:
+            raise InventoryError(f"[{name}] 잘못된 값: {e}")
+        if concurrency < 1:
+            raise InventoryError(f"[{name}] concurrency는 1 이상이어야 합니다: {concurrency}")
+
+        db_selection = section.get('db_selection', 'table').strip()
+        db_list_file = section.get('db_list_file', '').strip()
+        if db_selection == 'file' and not db_list_file:
+            # 스크립트는 서버별 실행 디렉토리에서 실행되므로 기본 db_list.txt를 찾을 수 없음
+            raise InventoryError(f"[{name}] db_selection = file이면 db_list_file 항목이 필요합니다")
+        hosts.append({
+            'name': name,
+            'engine': engine,
+            'host': section['host'].strip(),
+            'port': section.get('port', '').strip() or DEFAULT_PORTS[engine],
+            'user': section['user'].strip(),
+            'password_env': section['password_env'].strip(),
+            'concurrency': concurrency,
+            'db_selection': db_selection,
+            'db_list_file': os.path.join(base_dir, db_list_file) if db_list_file else None,
+            'enabled': enabled,
+        })
+    return hosts
+
+def build_command(host: Dict, script_path: str, summary_file: str, metrics_dir: str,
+                  task: str, script_args: List[str], state_dir: str) -> List[str]:
+    """서버 하나에서 실행할 스크립트 명령 생성 (비밀번호는 환경 변수 이름만 전달)
+
+    state_dir은 실행마다 바뀌지 않는 서버별 디렉토리 (PostgreSQL 카탈로그 스냅샷을 다음 실행에서 재사용)
+    """
+    command = [
+        sys.executable, script_path,
+        '--host', host['host'],
+        '--port', host['port'],
+        '--user', host['user'],
+        '--password-env', host['password_env'],
+        '--workers', str(host['concurrency']),
+        '--db-selection', host['db_selection'],
+        '--summary-file', summary_file,
+        '--metrics-file', os.path.join(metrics_dir, f"schema_{task}_{host['name']}.prom") if metrics_dir else '',
+    ]
+    if host['db_list_file']:
+        command += ['--db-list-file', host['db_list_file']]
+    if host['engine'] == 'postgresql':
+        command += ['--catalog-cache-file', os.path.join(state_dir, 'pg_catalog_snapshot.json')]
+    return command + script_args
+
+def run_host(host: Dict, command: List[str], work_dir: str) -> Dict:
+    """서버 하나의 스크립트 실행 (출력은 run.log에 기록) 후 결과 요약 반환
+
+    스크립트는 서버별 실행 디렉토리에서 실행되므로 상대 경로 파일이 서버끼리 섞이지 않는다.
+    (실행이 끝나도 남겨야 하는 카탈로그 스냅샷은 build_command에서 서버별 고정 경로로 전달)
+    """
+    log_file = os.path.join(work_dir, 'run.log')
+    summary_file = os.path.join(work_dir, 'summary.json')
+    result = {'name': host['name'], 'engine': host['engine'], 'host': host['host'], 'port': host['port'],
+              'log': log_file}
+
+    if host['password_env'] not in os.environ:
+        result.update(status='failure', error=f"비밀번호 환경 변수가 설정되지 않았습니다: {host['password_env']}")
+        return result
+
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    started = time.monotonic()
+    try:
+        with open(log_file, 'w', encoding='utf-8') as log:
+            completed = subprocess.run(command, cwd=work_dir, env=env, stdin=subprocess.DEVNULL,
+                                       stdout=log, stderr=subprocess.STDOUT)
+        returncode = completed.returncode
+    except Exception as e:
+        result.update(status='failure', error=f"실행 실패: {e}", elapsed_seconds=time.monotonic() - started)
+        return result
+
+    result['returncode'] = returncode
+    result['elapsed_seconds'] = time.monotonic() - started
+    try:
+        with open(summary_file, 'r', encoding='utf-8') as f:
+            result['summary'] = json.load(f)
+    except (OSError, ValueError):
+        result['summary'] = None
+
+    if returncode != 0:
+        result.update(status='failure', error=f"종료 코드 {returncode} (로그 확인: {log_file})")
+    elif result['summary'] is None:
+        result.update(status='failure', error=f"결과 요약이 없습니다 (로그 확인: {log_file})")
+    elif not result['summary'].get('success', False):
+        result.update(status='failure', error="처리 실패한 데이터베이스가 있습니다")
+    elif any(result['summary'].get(key) for key in SUMMARY_LIST_KEYS):
+        result['status'] = 'incomplete'  # 잠금 문제 등으로 다시 실행이 필요한 대상이 남음
+    else:
+        result['status'] = 'success'
+    return result
+
+def describe_result(result: Dict) -> str:
+    """서버별 결과 한 줄 설명"""
+    icons = {'success': '✅', 'incomplete': '⚠️ ', 'failure': '❌', 'skipped': '⏭️ '}
+    line = f"{icons[result['status']]} {result['name']} ({result['engine']} {result['host']}:{result['port']})"
+    if 'elapsed_seconds' in result:
+        line += f" {result['elapsed_seconds']:.1f}초"
+
+    summary = result.get('summary') or {}
+    counts = [f"{key} {summary[key]}" for key in SUMMARY_COUNT_KEYS if summary.get(key)]
+    counts += [f"{key} {len(summary[key])}" for key in SUMMARY_LIST_KEYS if summary.get(key)]
+    if counts:
+        line += " - " + ", ".join(counts)
+    if result.get('error'):
+        line += f" - {result['error']}"
+    return line
+
+def merge_results(results: List[Dict]) -> Dict:
+    """서버별 결과 합계"""
+    totals = {key: 0 for key in SUMMARY_COUNT_KEYS + SUMMARY_LIST_KEYS}
+    statuses = {}
+    for result in results:
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+        summary = result.get('summary') or {}
+        for key in SUMMARY_COUNT_KEYS:
+            value = summary.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] += value
+        for key in SUMMARY_LIST_KEYS:
+            totals[key] += len(summary.get(key) or [])
+    return {'hosts': statuses, 'counts': {key: value for key, value in totals.items() if value}}
+
+def parse_args() -> argparse.Namespace:
+    """명령행 옵션 파싱"""
+    parser = argparse.ArgumentParser(description="다중 호스트 스키마 변경 실행 스크립트",
+                                     epilog="'--' 뒤의 옵션은 각 스크립트에 그대로 전달됩니다")
+    parser.add_argument('--inventory', default=INVENTORY_FILE,
+                        help=f"서버 목록 인벤토리 파일 (기본값: {INVENTORY_FILE})")
+    parser.add_argument('--task', choices=list(TASK_SCRIPTS), required=True,
+                        help="실행할 작업 (table: 테이블 생성, column: 컬럼 체크 및 추가)")
+    parser.add_argument('--hosts', default=None,
+                        help="실행할 서버 이름 목록 (쉼표 구분, 기본값: 인벤토리의 모든 서버)")
+    parser.add_argument('--engine', choices=list(DEFAULT_PORTS), default=None,
+                        help="지정한 엔진의 서버만 실행")
+    parser.add_argument('--parallel-hosts', type=int, default=MAX_PARALLEL_HOSTS,
+                        help=f"동시에 실행할 서버 수 (0이면 모든 서버, 기본값: {MAX_PARALLEL_HOSTS})")
+    parser.add_argument('--output-dir', default=RUN_OUTPUT_DIR,
+                        help=f"실행 결과 디렉토리 (기본값: {RUN_OUTPUT_DIR})")
+    parser.add_argument('--metrics-dir', default=METRICS_DIR,
+                        help=f"서버별 Prometheus 메트릭 기록 디렉토리 (빈 값이면 기록 안 함, 기본값: {METRICS_DIR})")
+    parser.add_argument('--print-commands', action='store_true',
+                        help="서버별 실행 명령만 출력하고 실행하지 않음")
+    parser.add_argument('script_args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.script_args and args.script_args[0] == '--':
+        args.script_args = args.script_args[1:]
+    return args
+
+def main():
+    """메인 함수"""
+    args = parse_args()
+
+    try:
+        hosts = load_inventory(args.inventory)
+    except InventoryError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    # 실행 대상 서버 선택
+    if args.hosts:
+        names = [name.strip() for name in args.hosts.split(',') if name.strip()]
+        unknown = [name for name in names if name not in {host['name'] for host in hosts}]
+        if unknown:
+            print(f"❌ 인벤토리에 없는 서버: {unknown}")
+            sys.exit(1)
+        hosts = [host for host in hosts if host['name'] in names]
+    else:
+        hosts = [host for host in hosts if host['enabled']]
+    if args.engine:
+        hosts = [host for host in hosts if host['engine'] == args.engine]
+
+    scripts = TASK_SCRIPTS[args.task]
+    skipped = [host for host in hosts if host['engine'] not in scripts]
+    hosts = [host for host in hosts if host['engine'] in scripts]
+    if not hosts:
+        print(f"❌ '{args.task}' 작업을 실행할 서버가 없습니다.")
+        sys.exit(1)
+
+    run_dir = os.path.abspath(os.path.join(args.output_dir,
+                                           f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{args.task}"))
+    parallel_hosts = args.parallel_hosts if args.parallel_hosts > 0 else len(hosts)
+
+    print("🔧 다중 호스트 스키마 변경 실행")
+    print(f"📋 인벤토리: {args.inventory}")
+    print(f"🎯 작업: {args.task}")
+    print(f"🖥️  대상 서버: {len(hosts)}개 (동시 실행 {min(parallel_hosts, len(hosts))}개)")
+    for host in hosts:
+        print(f"  - {host['name']}: {host['engine']} {host['host']}:{host['port']} "
+              f"(동시 처리 {host['concurrency']}, 선택 방법 {host['db_selection']})")
+    for host in skipped:
+        print(f"  ⏭️  {host['name']}: {host['engine']} 서버는 '{args.task}' 작업을 지원하지 않아 건너뜀")
+    if args.script_args:
+        print(f"⚙️  스크립트 옵션: {' '.join(args.script_args)}")
+    print(f"📁 실행 결과 디렉토리: {run_dir}")
+    print("")
+
+    # 서버별 실행 명령
+    commands = {}
+    for host in hosts:
+        work_dir = os.path.join(run_dir, host['name'])
+        state_dir = os.path.join(os.path.abspath(args.output_dir), host['name'])
+        commands[host['name']] = (work_dir, state_dir, build_command(host, scripts[host['engine']],
+                                                                     os.path.join(work_dir, 'summary.json'),
+                                                                     args.metrics_dir, args.task,
+                                                                     args.script_args, state_dir))
+
+    if args.print_commands:
+        for host in hosts:
+            work_dir, _, command = commands[host['name']]
+            print(f"[{host['name']}] (cd {work_dir})")
+            print("  " + " ".join(command))
+        return
+
+    # 서버별 실행 (서버 안에서의 동시 처리 수는 스크립트의 --workers로 제한)
+    results = []
+    started = time.monotonic()
+    print(f"⚡ {len(hosts)}개 서버 실행 중... (완료 순서대로 출력)")
+    with ThreadPoolExecutor(max_workers=parallel_hosts) as executor:
+        futures = []
+        for host in hosts:
+            work_dir, state_dir, command = commands[host['name']]
+            os.makedirs(work_dir, exist_ok=True)
+            os.makedirs(state_dir, exist_ok=True)
+            futures.append(executor.submit(run_host, host, command, work_dir))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(describe_result(result))
+    for host in skipped:
+        results.append({'name': host['name'], 'engine': host['engine'], 'host': host['host'],
+                        'port': host['port'], 'status': 'skipped',
+                        'error': f"'{args.task}' 작업을 지원하지 않는 엔진"})
+
+    # 서버별 결과 합계
+    order = {host['name']: index for index, host in enumerate(hosts + skipped)}
+    results.sort(key=lambda result: order[result['name']])
+    merged = merge_results(results)
+
+    print("")
+    print("🎉 다중 호스트 실행 완료!")
+    print(f"📊 서버별 결과 (총 {time.monotonic() - started:.1f}초):")
+    for result in results:
+        print(f"   {describe_result(result)}")
+    print("📊 합계:")
+    print("   - 서버: " + ", ".join(f"{status} {count}개" for status, count in sorted(merged['hosts'].items())))
+    for key, value in merged['counts'].items():
+        print(f"   - {key}: {value}")
+
+    summary_file = os.path.join(run_dir, 'summary.json')
+    os.makedirs(run_dir, exist_ok=True)
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump({'task': args.task, 'inventory': os.path.abspath(args.inventory),
+                   'script_args': args.script_args, 'totals': merged, 'hosts': results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"📝 전체 요약 기록: {summary_file}")
+
+    if any(result['status'] == 'failure' for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,28 @@ PostgreSQL 테이블 생성 스크립트 (Python 3.11.9)
 2. 선택된 방법으로 데이터베이스 목록 가져오기
 3. 각 데이터베이스에서 대상 테이블 존재 여부 확인
 4. 없는 테이블은 자동으로 생성
+
+사용법:
+    python3 table_create_postgresql.py              # 순차 처리
+    python3 table_create_postgresql.py --workers 8  # 8개 워커로 병렬 처리
 """
 
 import psycopg2
 import sys
 import os
-from typing import List, Dict, Tuple
+import re
+import json
+import time
+import hashlib
+import argparse
+import datetime
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, Callable
+
+# 세 스크립트가 함께 쓰는 공용 모듈 (Script/python/schema_common.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema_common import RunMetrics, write_run_metrics, backoff_delay, process_databases, \
+    add_runner_args, apply_connection_args, write_run_summary
 
 # ========================================
 # PostgreSQL 서버 접속 정보 설정
@@ -37,6 +53,15 @@ TARGET_TABLES = [
 # ========================================
 REFERENCE_TABLE = 'chatbot_setup'  # 기준 테이블 (데이터베이스 검색용)
 
+# ========================================
+# 카탈로그 스냅샷 캐시 설정 (데이터베이스 검색용)
+# ========================================
+# 데이터베이스별 public 테이블 목록을 파일로 저장해 두고, 다음 실행에서는
+# 새로 생겼거나 OID/생성 시각이 바뀐 데이터베이스만 다시 조회
+# (다시 조회할 데이터베이스는 처리 작업에서 같은 연결로 확인 후 바로 처리)
+CATALOG_CACHE_FILE = 'pg_catalog_snapshot.json'  # 카탈로그 스냅샷 파일
+CATALOG_CACHE_TTL = 24 * 60 * 60  # 스냅샷 유효 시간(초), 지나면 전체 재조회
+
 # ========================================
 # 데이터베이스 리스트 파일 설정
 # ========================================
@@ -62,6 +87,100 @@ CREATE INDEX IF NOT EXISTS "idx_translation_log_target_lang" ON "translation_log
 CREATE INDEX IF NOT EXISTS "idx_translation_log_created_at" ON "translation_log" ("created_at");
 """
 
+# ========================================
+# 병렬 처리 설정
+# ========================================
+# 1이면 기존처럼 순차 처리, 2 이상이면 워커마다 별도 연결로 병렬 처리
+MAX_WORKERS = 1  # --workers 옵션으로 변경 가능
+
+# ========================================
+# 데이터베이스 연결 캐시 설정
+# ========================================
+# 같은 데이터베이스에 대한 조회/생성은 하나의 연결을 재사용 (매니저(워커)별 캐시)
+DB_CONN_CACHE_SIZE = 32     # 유지할 최대 연결 수 (초과 시 가장 오래 사용하지 않은 연결부터 닫음)
+DB_CONN_IDLE_TIMEOUT = 300  # 이 시간(초) 이상 사용하지 않은 연결은 닫음
+
+# ========================================
+# 온라인 인덱스 생성 설정 (CREATE INDEX CONCURRENTLY)
+# ========================================
+# True면 이미 존재하는 테이블의 인덱스를 CONCURRENTLY로 생성하여 쓰기를 막지 않음
+ONLINE_INDEX = False  # --online-index 옵션으로 변경 가능
+INDEX_MAINTENANCE_WORK_MEM = '1GB'      # 인덱스 생성 세션의 maintenance_work_mem
+INDEX_PARALLEL_MAINTENANCE_WORKERS = 2  # 인덱스 생성 세션의 max_parallel_maintenance_workers
+
+# ========================================
+# DDL 잠금 보호 설정
+# ========================================
+# DDL 실행 전 대상 테이블에 잠금을 잡은 오래된 트랜잭션(blocker)이 있으면 실행을 미루고,
+# DDL이 잠금 대기열에서 애플리케이션 쿼리를 막지 않도록 구문별 lock_timeout을 짧게 설정
+DDL_LOCK_TIMEOUT = '3s'          # DDL 구문별 lock_timeout
+DDL_STATEMENT_TIMEOUT = '30min'  # DDL 구문별 statement_timeout ('0'이면 무제한)
+DDL_BLOCKER_MIN_AGE = 5          # 이 시간(초) 이상 열린 트랜잭션이 대상 테이블 잠금을 잡고 있으면 blocker로 판단
+DDL_RETRY_COUNT = 3              # blocker 또는 lock_timeout 발생 시 재시도 횟수
+DDL_RETRY_BASE_DELAY = 2.0       # 재시도 대기 기본 시간(초), 재시도마다 2배 + 지터
+DDL_RETRY_MAX_DELAY = 30.0       # 재시도 대기 최대 시간(초)
+
+# 실행 계획 수립 시 CREATE_TABLE_SQL 구문에서 생성 대상 이름을 찾는 패턴
+CREATE_TABLE_RE = re.compile(r'^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"?(\w+)"?', re.IGNORECASE)
+CREATE_INDEX_RE = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?"?(\w+)"?'
+    r'\s+ON\s+(?:ONLY\s+)?"?(\w+)"?', re.IGNORECASE)
+PARTITION_BY_RE = re.compile(r'\)\s*PARTITION\s+BY\s+', re.IGNORECASE)
+
+# ========================================
+# 파티션 테이블 설정 (translation_log 월별 범위 파티션)
+# ========================================
+# True면 CREATE_TABLE_SQL 대신 CREATE_PARTITIONED_TABLE_SQL로 생성 (--partitioned 옵션으로 변경 가능)
+# 월별 파티션 생성/만료 파티션 정리는 --maintain-partitions 명령으로 주기적으로 실행
+PARTITIONED_TRANSLATION_LOG = False
+PARTITIONED_TABLE = 'translation_log'  # 파티션 부모 테이블
+PARTITION_PREMAKE_MONTHS = 3           # 현재 월 이후 미리 만들어 둘 월별 파티션 수
+PARTITION_RETENTION_MONTHS = 12        # 보관 기간(월), 이보다 오래된 파티션은 분리(DETACH)
+PARTITION_DROP_EXPIRED = False         # True면 분리한 파티션을 삭제(DROP)
+
+# created_at 기준 범위 파티션 (기본 키에 파티션 키 포함 필요)
+# 범위 밖 데이터가 들어가지 않도록 DEFAULT 파티션은 만들지 않고 미래 파티션을 미리 생성함
+CREATE_PARTITIONED_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS "translation_log" (
+  "id" SERIAL,
+  "domain" TEXT NOT NULL,
+  "url" TEXT NOT NULL,
+  "trans_type" VARCHAR(20) NOT NULL,
+  "target_lang" VARCHAR(10) NOT NULL,
+  "model" VARCHAR(50) NOT NULL,
+  "created_at" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at");
+
+CREATE INDEX IF NOT EXISTS "idx_translation_log_domain" ON "translation_log" ("domain");
+CREATE INDEX IF NOT EXISTS "idx_translation_log_target_lang" ON "translation_log" ("target_lang");
+CREATE INDEX IF NOT EXISTS "idx_translation_log_created_at" ON "translation_log" ("created_at");
+"""
+
+# ========================================
+# 변경 이력(ledger) 설정
+# ========================================
+# 데이터베이스별로 적용한 변경 ID와 체크섬을 기록해 두고, 같은 버전이 이미 적용된 데이터베이스는
+# 기본 키 조회 한 번으로 건너뜀 (CREATE_TABLE_SQL이 바뀌면 체크섬이 바뀌어 다시 확인/적용)
+# 테이블을 수동으로 삭제한 경우 등 전체 확인이 필요하면 --no-ledger 옵션 사용
+USE_LEDGER = True
+LEDGER_TABLE = 'schema_change_ledger'
+
+LEDGER_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS "{LEDGER_TABLE}" (
+  "change_id" VARCHAR(200) PRIMARY KEY,
+  "checksum" CHAR(64) NOT NULL,
+  "applied_at" TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# ========================================
+# Prometheus 메트릭 설정 (node_exporter textfile collector)
+# ========================================
+# 실행이 끝나면 데이터베이스별 연결/검색/DDL 소요 시간과 처리 결과 건수를 textfile 형식으로 기록
+# node_exporter의 --collector.textfile.directory 경로와 맞출 것 (None이면 기록하지 않음)
+METRICS_TEXTFILE = '/var/lib/node_exporter/textfile_collector/schema_table_create_postgresql.prom'
+
 # ========================================
 # 시스템 데이터베이스 목록 (제외할 DB)
 # ========================================
@@ -70,6 +189,17 @@ SYSTEM_DBS = {
     'pg_catalog', 'pg_toast', 'pg_temp_1', 'pg_toast_temp_1'
 }
 
+# lock_timeout 초과 시 PostgreSQL 오류 코드 (lock_not_available)
+LOCK_NOT_AVAILABLE = '55P03'
+# 테이블이 없을 때 PostgreSQL 오류 코드 (undefined_table)
+UNDEFINED_TABLE = '42P01'
+
+class DDLLockTimeout(Exception):
+    """DDL이 lock_timeout 안에 잠금을 얻지 못함 (재시도 대상)"""
+
+# 실행 메트릭 (워커 매니저들이 함께 사용)
+RUN_METRICS = RunMetrics('table_create_postgresql')
+
 class PostgreSQLTableManager:
     """PostgreSQL 테이블 관리 클래스"""
     
@@ -80,6 +210,25 @@ class PostgreSQLTableManager:
         self.password = password
         self.connection = None
         self.cursor = None
+        self.output = None  # 병렬 처리 시 데이터베이스별 출력 버퍼
+        self.db_connections = OrderedDict()  # database -> (connection, 마지막 사용 시각)
+        self.deferred_databases = []  # 잠금 문제로 DDL을 실행하지 못한 데이터베이스
+    
+    def log(self, message: str):
+        """출력 (버퍼 수집 중이면 버퍼에 저장)"""
+        if self.output is not None:
+            self.output.append(message)
+        else:
+            print(message)
+    
+    def begin_capture(self):
+        """데이터베이스별 출력 수집 시작"""
+        self.output = []
+    
+    def end_capture(self) -> List[str]:
+        """데이터베이스별 출력 수집 종료 후 수집된 출력 반환"""
+        lines, self.output = self.output or [], None
+        return lines
     
     def connect(self) -> bool:
         """PostgreSQL 연결"""
@@ -99,8 +248,50 @@ class PostgreSQLTableManager:
             print(f"❌ PostgreSQL 연결 실패: {e}")
             return False
     
+    def get_db_connection(self, database: str):
+        """데이터베이스별 연결 반환 (캐시된 연결이 있으면 재사용)"""
+        now = time.monotonic()
+        
+        # 오래 사용하지 않은 연결 정리
+        for cached_db, (conn, last_used) in list(self.db_connections.items()):
+            if now - last_used > DB_CONN_IDLE_TIMEOUT:
+                self.close_db_connection(cached_db)
+        
+        entry = self.db_connections.pop(database, None)
+        if entry is not None and not entry[0].closed:
+            # 끊어진 연결(closed != 0)은 재사용하지 않고 새로 연결
+            conn = entry[0]
+        else:
+            with RUN_METRICS.timer('connect'):
+                conn = psycopg2.connect(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    database=database
+                )
+            conn.autocommit = True
+        
+        # 가장 최근 사용으로 갱신 후 최대 개수 초과분 정리
+        self.db_connections[database] = (conn, now)
+        while len(self.db_connections) > DB_CONN_CACHE_SIZE:
+            oldest_db = next(iter(self.db_connections))
+            self.close_db_connection(oldest_db)
+        return conn
+    
+    def close_db_connection(self, database: str):
+        """캐시된 데이터베이스 연결 닫기"""
+        entry = self.db_connections.pop(database, None)
+        if entry is not None:
+            try:
+                entry[0].close()
+            except Exception:
+                pass
+    
     def disconnect(self):
         """PostgreSQL 연결 해제"""
+        for database in list(self.db_connections):
+            self.close_db_connection(database)
         if self.cursor:
             self.cursor.close()
         if self.connection:
@@ -115,50 +306,127 @@ class PostgreSQLTableManager:
             print(f"❌ 연결 테스트 실패: {e}")
             return False
     
-    def get_databases_by_table(self, table_name: str) -> List[str]:
-        """특정 테이블이 존재하는 데이터베이스 목록 조회"""
+    def get_databases_by_table(self, table_name: str,
+                               refresh_catalog: bool = False) -> Tuple[List[str], Dict, Dict[str, Dict]]:
+        """특정 테이블이 존재하는 데이터베이스 목록 조회 (카탈로그 스냅샷 사용)
+        
+        스냅샷에 없거나 바뀐 데이터베이스는 여기서 연결하지 않고 확인 대상으로 함께 반환한다.
+        (처리 작업에서 테이블을 확인하면 확인과 DDL이 같은 연결을 사용하므로 데이터베이스당 연결 1개)
+        반환: (대상 데이터베이스 목록, 스냅샷, 확인이 필요한 데이터베이스 -> OID/생성 시각)
+        """
         try:
-            # 모든 데이터베이스 목록을 가져온 후 각각에서 테이블 존재 여부 확인
-            all_databases = self.get_all_databases()
-            databases_with_table = []
+            snapshot, changed = self.get_catalog_changes(CATALOG_CACHE_FILE, full=refresh_catalog)
+            catalog = snapshot['databases']
+            databases_with_table = [database for database, entry in catalog.items()
+                                    if table_name in entry['tables']]
             
-            print(f"🔍 {len(all_databases)}개 데이터베이스에서 '{table_name}' 테이블 검색 중...")
+            print(f"🔍 {len(catalog)}개 데이터베이스에서 '{table_name}' 테이블 검색 완료")
+            for database in databases_with_table:
+                print(f"  ✅ {database}: '{table_name}' 테이블 발견")
+            if changed:
+                print(f"  🔎 {len(changed)}개 데이터베이스는 처리하면서 '{table_name}' 테이블 확인")
             
-            for database in all_databases:
-                try:
-                    # 각 데이터베이스에 연결하여 테이블 존재 여부 확인
-                    temp_conn = psycopg2.connect(
-                        host=self.host,
-                        port=self.port,
-                        user=self.user,
-                        password=self.password,
-                        database=database
-                    )
-                    temp_cursor = temp_conn.cursor()
-                    
-                    query = """
-                        SELECT COUNT(*) 
-                        FROM information_schema.tables 
-                        WHERE table_schema = 'public' AND table_name = %s
-                    """
-                    temp_cursor.execute(query, (table_name,))
-                    count = temp_cursor.fetchone()[0]
-                    
-                    if count > 0:
-                        databases_with_table.append(database)
-                        print(f"  ✅ {database}: '{table_name}' 테이블 발견")
-                    
-                    temp_cursor.close()
-                    temp_conn.close()
-                    
-                except Exception as db_error:
-                    print(f"  ⚠️  {database}: 연결 실패 - {db_error}")
-                    continue
-            
-            return databases_with_table
+            return databases_with_table + list(changed), snapshot, changed
         except Exception as e:
             print(f"❌ 데이터베이스 조회 실패: {e}")
-            return []
+            return [], {}, {}
+    
+    def get_database_identities(self) -> Dict[str, Dict]:
+        """데이터베이스별 OID와 생성 시각 조회 (시스템DB 제외)"""
+        # 생성 시각은 PG_VERSION 파일 수정 시각으로 추정 (superuser 또는 pg_read_server_files 권한 필요)
+        try:
+            self.cursor.execute("""
+                SELECT datname, oid, (pg_stat_file('base/' || oid || '/PG_VERSION')).modification
+                FROM pg_database WHERE datistemplate = false
+            """)
+        except Exception:
+            self.cursor.execute("SELECT datname, oid, NULL FROM pg_database WHERE datistemplate = false")
+        
+        return {row[0]: {'oid': int(row[1]), 'created': str(row[2]) if row[2] else None}
+                for row in self.cursor.fetchall() if row[0] not in SYSTEM_DBS}
+    
+    def get_public_tables(self, database: str) -> Optional[List[str]]:
+        """데이터베이스의 public 스키마 테이블 목록 조회 (실패 시 None)"""
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            temp_cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+            tables = sorted(row[0] for row in temp_cursor.fetchall())
+            temp_cursor.close()
+            return tables
+        except Exception as e:
+            self.log(f"  ⚠️  {database}: 연결 실패 - {e}")
+            return None
+    
+    def load_catalog_snapshot(self, file_path: str) -> Dict:
+        """카탈로그 스냅샷 파일 읽기 (없거나 다른 서버의 스냅샷이면 빈 스냅샷)"""
+        empty = {'host': self.host, 'port': self.port, 'refreshed_at': 0, 'databases': {}}
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        
+        if snapshot.get('host') != self.host or snapshot.get('port') != self.port:
+            return empty
+        return snapshot
+    
+    def save_catalog_snapshot(self, file_path: str, snapshot: Dict):
+        """카탈로그 스냅샷 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, file_path)
+    
+    def get_catalog_changes(self, file_path: str, full: bool = False) -> Tuple[Dict, Dict[str, Dict]]:
+        """카탈로그 스냅샷과 다시 조회해야 하는 데이터베이스(-> OID/생성 시각) 반환 (테이블 조회는 하지 않음)
+        
+        스냅샷이 TTL 이내이면 새로 생겼거나 OID/생성 시각이 바뀐 데이터베이스만 다시 조회 대상이 되며,
+        반환한 스냅샷에는 그대로 사용할 수 있는 데이터베이스만 남긴다.
+        """
+        snapshot = self.load_catalog_snapshot(file_path)
+        expired = time.time() - snapshot.get('refreshed_at', 0) > CATALOG_CACHE_TTL
+        if full or expired:
+            snapshot = {'host': self.host, 'port': self.port, 'refreshed_at': time.time(), 'databases': {}}
+        
+        cached = snapshot['databases']
+        identities = self.get_database_identities()
+        changed = [database for database, identity in identities.items()
+                   if database not in cached
+                   or (cached[database]['oid'], cached[database]['created'])
+                   != (identity['oid'], identity['created'])]
+        
+        if full or expired:
+            print(f"📚 카탈로그 스냅샷 전체 갱신: {len(changed)}개 데이터베이스 조회 중...")
+        elif changed:
+            print(f"📚 카탈로그 스냅샷 부분 갱신: {len(changed)}개 데이터베이스 조회 중...")
+        else:
+            print(f"📚 카탈로그 스냅샷 사용: {file_path}")
+        
+        snapshot['databases'] = {database: entry for database, entry in cached.items()
+                                 if database in identities and database not in changed}
+        return snapshot, {database: identities[database] for database in changed}
+    
+    def update_catalog_snapshot(self, file_path: str, snapshot: Dict, changed: Dict[str, Dict],
+                                discovered: Dict[str, Optional[List[str]]]):
+        """다시 조회한 데이터베이스별 테이블 목록을 스냅샷에 반영하여 저장
+        
+        조회 실패(None)했거나 조회하지 못한 데이터베이스는 저장하지 않고 다음 실행에서 다시 조회한다.
+        """
+        for database, tables in discovered.items():
+            if tables is not None and database in changed:
+                snapshot['databases'][database] = dict(changed[database], tables=tables)
+        if changed:
+            try:
+                self.save_catalog_snapshot(file_path, snapshot)
+            except OSError as e:
+                print(f"⚠️  카탈로그 스냅샷 저장 실패: {e}")
+    
+    def refresh_catalog_snapshot(self, file_path: str, full: bool = False) -> Dict[str, List[str]]:
+        """카탈로그 스냅샷 갱신 후 데이터베이스별 public 테이블 목록 반환"""
+        snapshot, changed = self.get_catalog_changes(file_path, full=full)
+        discovered = {database: self.get_public_tables(database) for database in changed}
+        self.update_catalog_snapshot(file_path, snapshot, changed, discovered)
+        return {database: entry['tables'] for database, entry in snapshot['databases'].items()}
     
     def get_databases_from_file(self, file_path: str) -> List[str]:
         """파일에서 데이터베이스 목록 읽기"""
@@ -192,15 +460,8 @@ class PostgreSQLTableManager:
     def table_exists(self, database: str, table_name: str) -> bool:
         """테이블 존재 여부 확인"""
         try:
-            # 해당 데이터베이스에 연결
-            temp_conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=database
-            )
-            temp_cursor = temp_conn.cursor()
+            # 해당 데이터베이스 연결 (캐시 재사용)
+            temp_cursor = self.get_db_connection(database).cursor()
             
             query = """
                 SELECT COUNT(*) 
@@ -211,63 +472,502 @@ class PostgreSQLTableManager:
             count = temp_cursor.fetchone()[0]
             
             temp_cursor.close()
-            temp_conn.close()
             
             return count > 0
         except Exception as e:
-            print(f"  ❌ 테이블 존재 여부 확인 실패: {e}")
+            self.log(f"  ❌ 테이블 존재 여부 확인 실패: {e}")
             return False
     
     def create_table(self, database: str, table_name: str, create_sql: str) -> bool:
         """테이블 생성"""
         try:
-            # 해당 데이터베이스에 연결
-            temp_conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=database
-            )
-            temp_conn.autocommit = True
-            temp_cursor = temp_conn.cursor()
+            # 해당 데이터베이스 연결 (캐시 재사용)
+            temp_cursor = self.get_db_connection(database).cursor()
             
             # 테이블 생성
             temp_cursor.execute(create_sql)
             
             temp_cursor.close()
-            temp_conn.close()
             
             return True
         except Exception as e:
-            print(f"      ❌ 테이블 생성 실패: {e}")
+            if getattr(e, 'pgcode', None) == LOCK_NOT_AVAILABLE:
+                raise DDLLockTimeout(str(e).strip()) from e
+            self.log(f"      ❌ 테이블 생성 실패: {e}")
             return False
     
-    def process_database(self, database: str, target_tables: List[str], create_sql: str) -> Tuple[int, int]:
-        """데이터베이스 처리"""
-        print(f"▶ {database} 데이터베이스 처리 중...")
-        print(f"  🎯 대상 테이블: {target_tables}")
+    def get_existing_relations(self, database: str, names: List[str]) -> Optional[Dict[str, Tuple[str, bool]]]:
+        """public 스키마에 존재하는 테이블/인덱스 조회 (pg_class/pg_index 1회 조회, 실패 시 None)
+        
+        반환값: {이름: (relkind, 유효 여부)} - 인덱스가 아니면 유효 여부는 항상 True
+        """
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            query = """
+                SELECT c.relname, c.relkind, COALESCE(i.indisvalid, true)
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN pg_index i ON i.indexrelid = c.oid
+                WHERE n.nspname = 'public' AND c.relname = ANY(%s)
+            """
+            temp_cursor.execute(query, (list(names),))
+            relations = {row[0]: (row[1], row[2]) for row in temp_cursor.fetchall()}
+            temp_cursor.close()
+            return relations
+        except Exception as e:
+            self.log(f"  ❌ 카탈로그 조회 실패: {e}")
+            return None
+    
+    def plan_database(self, database: str, create_sql: str) -> Optional[List[Dict]]:
+        """생성 계획 수립: CREATE_TABLE_SQL 중 실제로 없는 테이블/인덱스 구문만 반환"""
+        statements = parse_schema_statements(create_sql)
+        names = [stmt['name'] for stmt in statements if stmt['name']]
+        relations = self.get_existing_relations(database, names)
+        if relations is None:
+            return None
+        
+        plan = []
+        for stmt in statements:
+            if stmt['kind'] == 'index':
+                # CONCURRENTLY는 일반 테이블('r')에서만 가능 (파티션 부모 'p'나 새 테이블은 일반 생성)
+                stmt = dict(stmt, table_kind=relations.get(stmt['table'], (None, True))[0])
+            
+            if stmt['name'] not in relations:
+                # 대상을 알 수 없는 구문(kind='other')은 항상 실행
+                plan.append(stmt)
+            elif stmt['kind'] == 'index' and not relations[stmt['name']][1]:
+                # 실패한 인덱스 생성의 잔여물(INVALID)은 삭제 후 다시 생성
+                self.log(f"  ⚠️  INVALID 인덱스 발견: {stmt['name']} (재생성 예정)")
+                plan.append(dict(stmt, rebuild=True))
+        return plan
+    
+    def set_session_settings(self, database: str, settings: Dict[str, Optional[object]]):
+        """데이터베이스 연결의 세션 설정 적용 (값이 None이면 RESET)"""
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            for name, value in settings.items():
+                if value is None:
+                    temp_cursor.execute(f"RESET {name}")
+                else:
+                    temp_cursor.execute(f"SET {name} = %s", (value,))
+            temp_cursor.close()
+        except Exception as e:
+            self.log(f"      ⚠️  세션 설정 실패: {e}")
+    
+    def find_lock_blockers(self, database: str, tables: List[str]) -> List[Tuple]:
+        """대상 테이블 잠금을 오래 잡고 있거나 잠금을 기다리는 세션 조회 (pg_locks/pg_stat_activity)"""
+        if not tables:
+            return []
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            query = """
+                SELECT a.pid, l.mode, l.granted,
+                       COALESCE(EXTRACT(EPOCH FROM now() - a.xact_start)::int, 0),
+                       a.state, LEFT(a.query, 80)
+                FROM pg_locks l
+                JOIN pg_stat_activity a ON a.pid = l.pid
+                WHERE l.locktype = 'relation'
+                  AND l.relation IN (
+                      SELECT c.oid FROM pg_class c
+                      JOIN pg_namespace n ON n.oid = c.relnamespace
+                      WHERE n.nspname = 'public' AND c.relname = ANY(%s))
+                  AND l.pid <> pg_backend_pid()
+                  AND (NOT l.granted OR a.xact_start < now() - make_interval(secs => %s))
+            """
+            temp_cursor.execute(query, (list(tables), DDL_BLOCKER_MIN_AGE))
+            blockers = temp_cursor.fetchall()
+            temp_cursor.close()
+            return blockers
+        except Exception as e:
+            self.log(f"      ⚠️  잠금 상태 조회 실패: {e}")
+            return []
+    
+    def create_index_concurrently(self, database: str, stmt: Dict) -> bool:
+        """인덱스 온라인 생성 (autocommit 연결에서 트랜잭션 없이 CONCURRENTLY 실행)"""
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            if stmt.get('rebuild'):
+                temp_cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{stmt["name"]}"')
+            temp_cursor.execute(to_concurrent_index_sql(stmt['sql']))
+            temp_cursor.close()
+            return True
+        except Exception as e:
+            # 실패 시 남는 INVALID 인덱스는 다음 실행의 계획 단계에서 재생성됨
+            if getattr(e, 'pgcode', None) == LOCK_NOT_AVAILABLE:
+                raise DDLLockTimeout(str(e).strip()) from e
+            self.log(f"      ❌ 인덱스 온라인 생성 실패 ({stmt['name']}): {e}")
+            return False
+    
+    def apply_plan(self, database: str, plan: List[Dict], online_index: bool = False) -> bool:
+        """실행 계획 적용
+        
+        online_index가 True면 기존 일반 테이블의 인덱스는 CONCURRENTLY로 하나씩 생성하고,
+        나머지 구문(새 테이블, 파티션 테이블과 그 인덱스)은 한 번에 실행한다.
+        lock_timeout 초과 시 DDLLockTimeout을 발생시킨다.
+        """
+        online = [stmt for stmt in plan
+                  if online_index and stmt['kind'] == 'index' and stmt.get('table_kind') == 'r']
+        block = [stmt for stmt in plan if stmt not in online]
+        
+        # 구문별 잠금/실행 제한 시간 (세션 설정이므로 각 구문에 개별 적용됨)
+        settings = {'lock_timeout': DDL_LOCK_TIMEOUT, 'statement_timeout': DDL_STATEMENT_TIMEOUT}
+        if any(stmt['kind'] == 'index' for stmt in plan):
+            settings['maintenance_work_mem'] = INDEX_MAINTENANCE_WORK_MEM
+            settings['max_parallel_maintenance_workers'] = INDEX_PARALLEL_MAINTENANCE_WORKERS
+        
+        self.set_session_settings(database, settings)
+        try:
+            success = True
+            if block:
+                block_sql = ";\n".join(
+                    (f'DROP INDEX IF EXISTS "{stmt["name"]}";\n' if stmt.get('rebuild') else '') + stmt['sql']
+                    for stmt in block)
+                success = self.create_table(database, "planned", block_sql)
+            for stmt in online:
+                self.log(f"      🔄 인덱스 온라인 생성 중: {stmt['name']}")
+                success = self.create_index_concurrently(database, stmt) and success
+            return success
+        finally:
+            self.set_session_settings(database, dict.fromkeys(settings))
+    
+    def log_lock_blockers(self, blockers: List[Tuple]):
+        """blocker 세션 출력"""
+        for pid, mode, granted, age, state, query in blockers:
+            status = "보유" if granted else "대기"
+            self.log(f"      🔒 blocker: pid={pid} {mode} {status}, 트랜잭션 {age}초 ({state}) {query}")
+    
+    def execute_guarded(self, database: str, sql: str, tables: List[str]) -> Optional[bool]:
+        """잠금 보호 하에 DDL 구문 하나 실행 (blocker/lock_timeout으로 끝내 실행하지 못하면 None)"""
+        settings = {'lock_timeout': DDL_LOCK_TIMEOUT, 'statement_timeout': DDL_STATEMENT_TIMEOUT}
+        for attempt in range(DDL_RETRY_COUNT + 1):
+            if attempt > 0:
+                delay = backoff_delay(attempt - 1, DDL_RETRY_BASE_DELAY, DDL_RETRY_MAX_DELAY)
+                self.log(f"      ⏳ {delay:.1f}초 후 재시도 ({attempt}/{DDL_RETRY_COUNT})")
+                time.sleep(delay)
+            
+            blockers = self.find_lock_blockers(database, tables)
+            if blockers:
+                self.log_lock_blockers(blockers)
+                continue
+            
+            self.set_session_settings(database, settings)
+            try:
+                return self.create_table(database, tables[0] if tables else "", sql)
+            except DDLLockTimeout as e:
+                self.log(f"      🔒 lock_timeout({DDL_LOCK_TIMEOUT}) 초과: {e}")
+            finally:
+                self.set_session_settings(database, dict.fromkeys(settings))
+        
+        return None
+    
+    def get_partitions(self, database: str, parent: str) -> Optional[List[str]]:
+        """파티션 부모 테이블의 하위 파티션 목록 조회 (파티션 테이블이 아니면 None)"""
+        temp_cursor = self.get_db_connection(database).cursor()
+        temp_cursor.execute("""
+            SELECT c.relkind FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relname = %s
+        """, (parent,))
+        row = temp_cursor.fetchone()
+        if row is None or row[0] != 'p':
+            temp_cursor.close()
+            return None
+        
+        temp_cursor.execute("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+        """, (f'public."{parent}"',))
+        partitions = [row[0] for row in temp_cursor.fetchall()]
+        temp_cursor.close()
+        return partitions
+    
+    def maintain_partitions(self, database: str, parent: str = PARTITIONED_TABLE, dry_run: bool = False,
+                            detach_expired: bool = True) -> Tuple[int, int]:
+        """월별 파티션 유지보수: 미래 파티션 미리 생성, 보관 기간이 지난 파티션 분리/삭제
+        
+        반환값: (생성한 파티션 수, 분리한 파티션 수)
+        """
+        created_count = 0
+        detached_count = 0
+        
+        try:
+            partitions = self.get_partitions(database, parent)
+        except Exception as e:
+            self.log(f"  ❌ 파티션 조회 실패: {e}")
+            return created_count, detached_count
+        if partitions is None:
+            self.log(f"  ⚠️  {parent}: 파티션 테이블이 아님 - 건너뜀")
+            return created_count, detached_count
+        
+        this_month = datetime.date.today().replace(day=1)
+        wanted = [add_months(this_month, offset) for offset in range(PARTITION_PREMAKE_MONTHS + 1)]
+        cutoff = add_months(this_month, -PARTITION_RETENTION_MONTHS)
+        
+        for month in wanted:
+            name = partition_name(parent, month)
+            if name in partitions:
+                continue
+            sql = (f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{parent}" '
+                   f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')")
+            self.log(f"  ➕ 파티션 생성: {name}")
+            if dry_run:
+                created_count += 1
+                continue
+            result = self.execute_guarded(database, sql, [parent])
+            if result:
+                created_count += 1
+            else:
+                self.log(f"      ❌ 파티션 생성 실패: {name}")
+                if result is None and database not in self.deferred_databases:
+                    self.deferred_databases.append(database)
+        
+        if not detach_expired:
+            return created_count, detached_count
+        
+        for name in sorted(partitions):
+            month = parse_partition_month(parent, name)
+            if month is None or month >= cutoff:
+                continue
+            action = "분리 후 삭제" if PARTITION_DROP_EXPIRED else "분리"
+            self.log(f"  ✂️  만료 파티션 {action}: {name}")
+            if dry_run:
+                detached_count += 1
+                continue
+            result = self.execute_guarded(database, f'ALTER TABLE "{parent}" DETACH PARTITION "{name}"', [parent])
+            if not result:
+                self.log(f"      ❌ 파티션 분리 실패: {name}")
+                if result is None and database not in self.deferred_databases:
+                    self.deferred_databases.append(database)
+                continue
+            detached_count += 1
+            if PARTITION_DROP_EXPIRED and not self.create_table(database, name, f'DROP TABLE IF EXISTS "{name}"'):
+                self.log(f"      ❌ 분리된 파티션 삭제 실패: {name}")
+        
+        if dry_run and (created_count or detached_count):
+            self.log(f"  🧪 dry-run: 실행하지 않음")
+        return created_count, detached_count
+    
+    def apply_plan_with_guard(self, database: str, create_sql: str, plan: List[Dict],
+                              online_index: bool = False) -> Optional[bool]:
+        """잠금 보호 하에 실행 계획 적용 (blocker/lock_timeout으로 끝내 실행하지 못하면 None)"""
+        for attempt in range(DDL_RETRY_COUNT + 1):
+            if attempt > 0:
+                delay = backoff_delay(attempt - 1, DDL_RETRY_BASE_DELAY, DDL_RETRY_MAX_DELAY)
+                self.log(f"      ⏳ {delay:.1f}초 후 재시도 ({attempt}/{DDL_RETRY_COUNT})")
+                time.sleep(delay)
+                
+                # 이전 시도에서 일부 구문이 적용되었을 수 있으므로 계획을 다시 수립
+                plan = self.plan_database(database, create_sql)
+                if plan is None:
+                    return False
+                if not plan:
+                    return True
+            
+            new_tables = {stmt['name'] for stmt in plan if stmt['kind'] == 'table'}
+            locked_tables = sorted({stmt['table'] for stmt in plan if stmt['table']} - new_tables)
+            blockers = self.find_lock_blockers(database, locked_tables)
+            if blockers:
+                self.log_lock_blockers(blockers)
+                continue
+            
+            try:
+                return self.apply_plan(database, plan, online_index)
+            except DDLLockTimeout as e:
+                self.log(f"      🔒 lock_timeout({DDL_LOCK_TIMEOUT}) 초과: {e}")
+        
+        return None
+    
+    def get_applied_checksum(self, database: str, change_id: str) -> Optional[str]:
+        """변경 이력 테이블에서 적용된 체크섬 조회 (기록이 없거나 조회 실패 시 None)"""
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            temp_cursor.execute(f'SELECT "checksum" FROM "{LEDGER_TABLE}" WHERE "change_id" = %s', (change_id,))
+            row = temp_cursor.fetchone()
+            temp_cursor.close()
+            return row[0] if row else None
+        except Exception as e:
+            if getattr(e, 'pgcode', None) != UNDEFINED_TABLE:
+                self.log(f"  ⚠️  변경 이력 조회 실패: {e}")
+            return None
+    
+    def record_change(self, database: str, change_id: str, checksum: str) -> bool:
+        """변경 이력 테이블에 적용된 변경 ID와 체크섬 기록"""
+        try:
+            temp_cursor = self.get_db_connection(database).cursor()
+            temp_cursor.execute(LEDGER_TABLE_SQL)
+            temp_cursor.execute(f"""
+                INSERT INTO "{LEDGER_TABLE}" ("change_id", "checksum", "applied_at")
+                VALUES (%s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT ("change_id")
+                DO UPDATE SET "checksum" = EXCLUDED."checksum", "applied_at" = EXCLUDED."applied_at"
+            """, (change_id, checksum))
+            temp_cursor.close()
+            return True
+        except Exception as e:
+            self.log(f"  ⚠️  변경 이력 기록 실패: {e}")
+            return False
+    
+    def process_database(self, database: str, target_tables: List[str], create_sql: str,
+                         dry_run: bool = False, online_index: bool = False,
+                         use_ledger: bool = False) -> Tuple[int, int]:
+        """데이터베이스 처리 (dry_run이면 실행 계획만 출력, use_ledger면 적용 이력이 있는 버전은 건너뜀)"""
+        self.log(f"▶ {database} 데이터베이스 처리 중...")
+        self.log(f"  🎯 대상 테이블: {target_tables}")
         
         created_count = 0
         existing_count = 0
         
-        # 모든 테이블을 한 번에 생성 (의존성 순서 고려)
-        print(f"  📝 테이블 및 인덱스 생성 중...")
-        if self.create_table(database, "all_tables", create_sql):
-            print(f"      ✅ 모든 테이블 생성 완료")
-            created_count = len(target_tables)
+        change_id, checksum = ledger_version(target_tables, create_sql)
+        with RUN_METRICS.timer('discovery'):
+            applied = use_ledger and self.get_applied_checksum(database, change_id) == checksum
+            plan = None if applied else self.plan_database(database, create_sql)
+        
+        if applied:
+            self.log(f"  ✅ 이미 적용된 버전 (ledger: {checksum[:12]})")
+            RUN_METRICS.count_result('unchanged')
+            return created_count, len(target_tables)
+        if plan is None:
+            RUN_METRICS.count_result('failure')
+            return created_count, existing_count
+        
+        missing_tables = {stmt['name'] for stmt in plan if stmt['kind'] == 'table'}
+        planned_tables = [table for table in target_tables if table in missing_tables]
+        existing_count = len(target_tables) - len(planned_tables)
+        
+        if not plan:
+            self.log(f"  ✅ 변경 없음 (모든 테이블 및 인덱스 존재)")
+            if use_ledger and not dry_run:
+                self.record_change(database, change_id, checksum)
+            RUN_METRICS.count_result('unchanged')
+            return created_count, existing_count
+        
+        self.log(f"  📋 실행 계획:")
+        for stmt in plan:
+            rebuild = " (INVALID 재생성)" if stmt.get('rebuild') else ""
+            self.log(f"    - {stmt['kind']} {stmt['name'] or stmt['sql'].splitlines()[0]}{rebuild}")
+        
+        if dry_run:
+            self.log(f"  🧪 dry-run: 실행하지 않음")
+            RUN_METRICS.count_result('dry_run')
+            return len(planned_tables), existing_count
+        
+        # 계획된 구문만 실행 (의존성 순서 유지)
+        self.log(f"  📝 테이블 및 인덱스 생성 중...")
+        with RUN_METRICS.timer('ddl'):
+            success = self.apply_plan_with_guard(database, create_sql, plan, online_index)
+        RUN_METRICS.count_result({None: 'deferred', True: 'success', False: 'failure'}[success])
+        if success is None:
+            self.log(f"  ⏸️  잠금 문제로 처리 보류: {database}")
+            self.deferred_databases.append(database)
+        elif success:
+            self.log(f"      ✅ 계획된 {len(plan)}개 구문 실행 완료")
+            created_count = len(planned_tables)
+            if any(stmt['kind'] == 'table' and stmt['name'] == PARTITIONED_TABLE
+                   and PARTITION_BY_RE.search(stmt['sql']) for stmt in plan):
+                # 새로 만든 파티션 부모 테이블에는 데이터가 들어갈 월별 파티션을 바로 생성
+                self.maintain_partitions(database, PARTITIONED_TABLE, detach_expired=False)
+            if use_ledger:
+                self.record_change(database, change_id, checksum)
         else:
-            print(f"      ❌ 테이블 생성 실패")
+            self.log(f"      ❌ 테이블 생성 실패")
             # 개별 테이블 존재 여부 확인
+            existing_count = 0
             for table_name in target_tables:
                 if self.table_exists(database, table_name):
-                    print(f"  ✅ 테이블 존재: {table_name}")
+                    self.log(f"  ✅ 테이블 존재: {table_name}")
                     existing_count += 1
                 else:
-                    print(f"  ❌ 테이블 없음: {table_name}")
+                    self.log(f"  ❌ 테이블 없음: {table_name}")
         
         return created_count, existing_count
 
+def parse_schema_statements(create_sql: str) -> List[Dict]:
+    """CREATE_TABLE_SQL을 구문 단위로 나누어 생성 대상(테이블/인덱스) 추출
+    
+    구문은 ';' 기준으로 나누므로 문자열 리터럴 안에 ';'가 없어야 한다.
+    """
+    statements = []
+    for sql in create_sql.split(';'):
+        sql = sql.strip()
+        if not sql:
+            continue
+        
+        table_match = CREATE_TABLE_RE.match(sql)
+        index_match = CREATE_INDEX_RE.match(sql)
+        if table_match:
+            statements.append({'kind': 'table', 'name': table_match.group(1), 'table': table_match.group(1), 'sql': sql})
+        elif index_match:
+            statements.append({'kind': 'index', 'name': index_match.group(1), 'table': index_match.group(2), 'sql': sql})
+        else:
+            statements.append({'kind': 'other', 'name': None, 'table': None, 'sql': sql})
+    return statements
+
+def ledger_version(target_tables: List[str], create_sql: str) -> Tuple[str, str]:
+    """변경 이력용 (변경 ID, 체크섬) 계산 - 공백 차이는 무시하고 SQL 내용이 바뀌면 새 버전"""
+    change_id = f"create_table:{','.join(target_tables)}"
+    normalized = " ".join(create_sql.split())
+    return change_id, hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def add_months(month: datetime.date, offset: int) -> datetime.date:
+    """월 단위 날짜 계산 (항상 1일 기준)"""
+    index = month.year * 12 + month.month - 1 + offset
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+def partition_name(parent: str, month: datetime.date) -> str:
+    """월별 파티션 이름 (예: translation_log_p202610)"""
+    return f"{parent}_p{month:%Y%m}"
+
+def parse_partition_month(parent: str, name: str) -> Optional[datetime.date]:
+    """월별 파티션 이름에서 월 추출 (이 스크립트의 이름 규칙이 아니면 None)"""
+    match = re.fullmatch(rf'{re.escape(parent)}_p(\d{{4}})(\d{{2}})', name)
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return None
+    return datetime.date(int(match.group(1)), int(match.group(2)), 1)
+
+def to_concurrent_index_sql(sql: str) -> str:
+    """CREATE INDEX 구문을 CREATE INDEX CONCURRENTLY 구문으로 변환"""
+    return re.sub(r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(?!CONCURRENTLY)', r'CREATE \1INDEX CONCURRENTLY ',
+                  sql, count=1, flags=re.IGNORECASE)
+
+# ========================================
+# 병렬 처리 (워커별 연결 사용)
+# ========================================
+def make_worker_manager(manager: PostgreSQLTableManager) -> PostgreSQLTableManager:
+    """워커 스레드 전용 매니저 생성 (워커마다 자체 연결 사용)"""
+    return PostgreSQLTableManager(DB_HOST, DB_PORT, DB_USER, DB_PASS)
+
+def merge_worker_manager(manager: PostgreSQLTableManager, worker_manager: PostgreSQLTableManager):
+    """워커별 결과를 메인 매니저로 모음"""
+    manager.deferred_databases.extend(worker_manager.deferred_databases)
+
+def parse_args() -> argparse.Namespace:
+    """명령행 옵션 파싱"""
+    parser = argparse.ArgumentParser(description="PostgreSQL 테이블 생성 스크립트")
+    add_runner_args(parser, globals(), list(DB_SELECTION_CHOICES))
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"동시에 처리할 데이터베이스 수 (기본값: {MAX_WORKERS})")
+    parser.add_argument('--catalog-cache-file', default=CATALOG_CACHE_FILE,
+                        help=f"카탈로그 스냅샷 파일 경로 (실행마다 같은 경로를 써야 재사용됨, 기본값: {CATALOG_CACHE_FILE})")
+    parser.add_argument('--refresh-catalog', action='store_true',
+                        help="카탈로그 스냅샷을 전체 갱신하고 종료")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="데이터베이스별 실행 계획(생성할 테이블/인덱스)만 출력하고 실행하지 않음")
+    parser.add_argument('--online-index', action='store_true', default=ONLINE_INDEX,
+                        help="기존 테이블의 인덱스를 CREATE INDEX CONCURRENTLY로 생성 (쓰기 차단 없음)")
+    parser.add_argument('--no-ledger', dest='use_ledger', action='store_false', default=USE_LEDGER,
+                        help=f"변경 이력({LEDGER_TABLE})을 무시하고 모든 데이터베이스를 다시 확인")
+    parser.add_argument('--metrics-file', default=METRICS_TEXTFILE,
+                        help=f"Prometheus textfile 메트릭 기록 경로 (빈 값이면 기록 안 함, 기본값: {METRICS_TEXTFILE})")
+    parser.add_argument('--partitioned', action='store_true', default=PARTITIONED_TRANSLATION_LOG,
+                        help=f"{PARTITIONED_TABLE}을 created_at 기준 월별 범위 파티션 테이블로 생성")
+    parser.add_argument('--maintain-partitions', action='store_true',
+                        help=f"{PARTITIONED_TABLE} 미래 파티션 생성 및 보관 기간 지난 파티션 분리만 실행")
+    return parser.parse_args()
+
+# --db-selection 옵션 값 -> 선택 메뉴 번호
+DB_SELECTION_CHOICES = {'file': '1', 'table': '2', 'all': '3'}
+
 def get_user_choice() -> str:
     """사용자 선택 메뉴"""
     print("🔧 PostgreSQL 테이블 생성 스크립트")
@@ -287,8 +987,23 @@ def get_user_choice() -> str:
 
 def main():
     """메인 함수"""
-    # 사용자 선택
-    choice = get_user_choice()
+    global CATALOG_CACHE_FILE
+    args = parse_args()
+    apply_connection_args(args, globals(), RUN_METRICS)
+    CATALOG_CACHE_FILE = args.catalog_cache_file
+    
+    # 카탈로그 스냅샷 갱신 명령
+    if args.refresh_catalog:
+        manager = PostgreSQLTableManager(DB_HOST, DB_PORT, DB_USER, DB_PASS)
+        if not manager.connect():
+            sys.exit(1)
+        catalog = manager.refresh_catalog_snapshot(CATALOG_CACHE_FILE, full=True)
+        print(f"✅ 카탈로그 스냅샷 갱신 완료: {CATALOG_CACHE_FILE} ({len(catalog)}개 데이터베이스)")
+        manager.disconnect()
+        return
+    
+    # 사용자 선택 (--db-selection 지정 시 메뉴 생략)
+    choice = DB_SELECTION_CHOICES[args.db_selection] if args.db_selection else get_user_choice()
     
     if choice == '1':
         db_selection_method = "file"
@@ -319,10 +1034,11 @@ def main():
     
     # 데이터베이스 목록 가져오기
     databases = []
+    catalog_snapshot, catalog_changes = {}, {}  # 테이블 기반 방법에서 처리하면서 확인할 데이터베이스
     
     if db_selection_method == "table":
         print(f"🔍 {REFERENCE_TABLE} 테이블이 존재하는 데이터베이스 검색 중...")
-        databases = manager.get_databases_by_table(REFERENCE_TABLE)
+        databases, catalog_snapshot, catalog_changes = manager.get_databases_by_table(REFERENCE_TABLE)
         
         if not databases:
             print(f"❌ {REFERENCE_TABLE} 테이블이 존재하는 데이터베이스를 찾을 수 없습니다.")
@@ -331,7 +1047,7 @@ def main():
         
         print(f"✅ {REFERENCE_TABLE} 테이블이 존재하는 데이터베이스:")
         for db in databases:
-            print(f"  - {db}")
+            print(f"  - {db}" + (" (처리하면서 확인)" if db in catalog_changes else ""))
     
     elif db_selection_method == "file":
         print(f"📖 {DB_LIST_FILE} 파일에서 데이터베이스 목록 읽는 중...")
@@ -370,17 +1086,89 @@ def main():
         print(f"🎯 데이터베이스 리스트 파일: {DB_LIST_FILE}")
     elif db_selection_method == "all":
         print("🎯 대상: 모든 데이터베이스 (시스템DB 제외)")
-    print(f"🎯 대상 테이블: {TARGET_TABLES} (생성 대상)")
+    if args.maintain_partitions:
+        print(f"🎯 파티션 유지보수: {PARTITIONED_TABLE} (미리 생성 {PARTITION_PREMAKE_MONTHS}개월, "
+              f"보관 {PARTITION_RETENTION_MONTHS}개월, 만료 파티션 {'삭제' if PARTITION_DROP_EXPIRED else '분리'})")
+    else:
+        print(f"🎯 대상 테이블: {TARGET_TABLES} (생성 대상)")
+    if args.partitioned:
+        print(f"🗂️  파티션 모드: {PARTITIONED_TABLE} 월별 범위 파티션")
+    print(f"⚡ 워커 수: {args.workers}")
+    if args.dry_run:
+        print("🧪 dry-run 모드: 실행 계획만 출력합니다")
+    if args.online_index:
+        print("🔄 온라인 인덱스 생성 모드: CREATE INDEX CONCURRENTLY")
     print("")
     
+    # 스냅샷에 없거나 바뀐 데이터베이스는 작업 연결로 기준 테이블을 확인한 뒤 처리 (데이터베이스당 연결 1개)
+    discovered = {}  # 데이터베이스 -> public 테이블 목록 (조회 실패 시 None)
+    
+    def with_discovery(task: Callable) -> Callable:
+        def run(task_manager: PostgreSQLTableManager, database: str) -> Tuple[int, int]:
+            if database in catalog_changes:
+                tables = task_manager.get_public_tables(database)
+                discovered[database] = tables
+                if tables is None or REFERENCE_TABLE not in tables:
+                    if tables is not None:
+                        task_manager.log(f"⏭️  {database}: '{REFERENCE_TABLE}' 테이블 없음 (대상에서 제외)")
+                    return 0, 0
+            return task(task_manager, database)
+        return run
+    
+    def finish_discovery() -> List[str]:
+        """확인 결과를 스냅샷에 저장하고 기준 테이블이 없던 데이터베이스를 제외한 대상 목록 반환"""
+        if not catalog_changes:
+            return databases
+        manager.update_catalog_snapshot(CATALOG_CACHE_FILE, catalog_snapshot, catalog_changes, discovered)
+        return [database for database in databases
+                if database not in catalog_changes or REFERENCE_TABLE in (discovered.get(database) or [])]
+    
+    # 파티션 유지보수 명령
+    if args.maintain_partitions:
+        def maintain_task(task_manager: PostgreSQLTableManager, database: str) -> Tuple[int, int]:
+            task_manager.log(f"▶ {database} 파티션 유지보수 중...")
+            with RUN_METRICS.timer('partition_maintenance'):
+                return task_manager.maintain_partitions(database, PARTITIONED_TABLE, dry_run=args.dry_run)
+        
+        total_created, total_detached = process_databases(
+            manager, databases, with_discovery(maintain_task), workers=args.workers,
+            make_worker=make_worker_manager, merge_worker=merge_worker_manager)
+        deferred = manager.deferred_databases
+        databases = finish_discovery()
+        
+        print("")
+        print("🎉 파티션 유지보수 완료!" + (" (dry-run)" if args.dry_run else ""))
+        print(f"   - 대상 데이터베이스 수: {len(databases)}")
+        print(f"   - 생성된 파티션: {total_created}개")
+        print(f"   - 분리된 파티션: {total_detached}개")
+        if deferred:
+            print(f"   - 잠금 문제로 보류된 데이터베이스: {len(deferred)}개 (다시 실행 필요)")
+            for database in deferred:
+                print(f"     - {database}")
+        write_run_metrics(RUN_METRICS, args.metrics_file)
+        write_run_summary(args.summary_file, RUN_METRICS, DB_HOST, DB_PORT, {
+            'databases': len(databases),
+            'created_partitions': total_created,
+            'detached_partitions': total_detached,
+            'deferred_databases': deferred,
+            'dry_run': args.dry_run,
+        })
+        manager.disconnect()
+        return
+    
     # 각 데이터베이스 처리
-    total_created = 0
-    total_existing = 0
+    create_sql = CREATE_PARTITIONED_TABLE_SQL if args.partitioned else CREATE_TABLE_SQL
     
-    for database in databases:
-        created, existing = manager.process_database(database, TARGET_TABLES, CREATE_TABLE_SQL)
-        total_created += created
-        total_existing += existing
+    def create_task(task_manager: PostgreSQLTableManager, database: str) -> Tuple[int, int]:
+        return task_manager.process_database(database, TARGET_TABLES, create_sql,
+                                             dry_run=args.dry_run, online_index=args.online_index,
+                                             use_ledger=args.use_ledger)
+    
+    total_created, total_existing = process_databases(
+        manager, databases, with_discovery(create_task), workers=args.workers,
+        make_worker=make_worker_manager, merge_worker=merge_worker_manager)
+    deferred = manager.deferred_databases
+    databases = finish_discovery()
     
     # 결과 출력
     print("")
@@ -394,8 +1182,24 @@ def main():
         print("   - 대상: 모든 데이터베이스 (시스템DB 제외)")
     print(f"   - 대상 테이블: {TARGET_TABLES}")
     print(f"   - 대상 데이터베이스 수: {len(databases)}")
-    print(f"   - 새로 생성된 테이블: {total_created}개")
+    if args.dry_run:
+        print(f"   - 생성 예정 테이블: {total_created}개 (dry-run)")
+    else:
+        print(f"   - 새로 생성된 테이블: {total_created}개")
     print(f"   - 이미 존재하는 테이블: {total_existing}개")
+    if deferred:
+        print(f"   - 잠금 문제로 보류된 데이터베이스: {len(deferred)}개 (다시 실행 필요)")
+        for database in deferred:
+            print(f"     - {database}")
+    
+    write_run_metrics(RUN_METRICS, args.metrics_file)
+    write_run_summary(args.summary_file, RUN_METRICS, DB_HOST, DB_PORT, {
+        'databases': len(databases),
+        'created_tables': total_created,
+        'existing_tables': total_existing,
+        'deferred_databases': deferred,
+        'dry_run': args.dry_run,
+    })
     
     # 연결 해제
     manager.disconnect()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스키마 스크립트 공용 모듈 (Python 3.11.9)
+목적: table_create_postgresql.py, table_create_mariadb.py, column_check_alter_mariadb_pattern.py가
+      함께 사용하는 실행 메트릭, DDL 재시도 대기 시간, 데이터베이스 병렬 처리,
+      다중 호스트 실행기(multi_host_runner.py) 연동 옵션과 실행 요약 형식
+      (대시보드가 세 스크립트의 메트릭 이름/레이블이 같다고 가정하므로 한 곳에서 관리)
+
+사용법 (각 스크립트에서):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from schema_common import RunMetrics
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple, Callable
+
+# ========================================
+# Prometheus 메트릭 설정 (node_exporter textfile collector)
+# ========================================
+# 단계별 소요 시간 히스토그램 버킷 (초)
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+class RunMetrics:
+    """실행 메트릭 수집 (단계별 소요 시간 히스토그램, 결과 카운터) 및 textfile 기록"""
+
+    def __init__(self, script: str, buckets: Tuple[float, ...] = METRICS_BUCKETS):
+        self.script = script
+        self.host = None  # 접속 서버 (host:port, 지정하면 db_host 레이블 추가)
+        self.buckets = buckets
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.histograms = {}  # phase -> [버킷별 건수..., 합계, 건수]
+        self.results = {}     # result -> 건수
+
+    def observe(self, phase: str, seconds: float):
+        """단계 소요 시간 기록"""
+        with self.lock:
+            histogram = self.histograms.setdefault(phase, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[index] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    @contextmanager
+    def timer(self, phase: str):
+        """with 블록 소요 시간을 phase로 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def count_result(self, result: str):
+        """데이터베이스 처리 결과 기록 (success, unchanged, failure, deferred, skipped, dry_run)"""
+        with self.lock:
+            self.results[result] = self.results.get(result, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus textfile 형식으로 변환"""
+        labels = f'script="{self.script}"'
+        if self.host:
+            labels += f',db_host="{self.host}"'
+        lines = [
+            "# HELP schema_migration_phase_duration_seconds Per-database duration of each migration phase.",
+            "# TYPE schema_migration_phase_duration_seconds histogram",
+        ]
+        with self.lock:
+            for phase, histogram in sorted(self.histograms.items()):
+                phase_labels = f'{labels},phase="{phase}"'
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f'schema_migration_phase_duration_seconds_bucket{{{phase_labels},le="{bound}"}} {count}')
+                lines.append(f'schema_migration_phase_duration_seconds_bucket{{{phase_labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f'schema_migration_phase_duration_seconds_sum{{{phase_labels}}} {histogram[-2]:.6f}')
+                lines.append(f'schema_migration_phase_duration_seconds_count{{{phase_labels}}} {histogram[-1]}')
+
+            lines.append("# HELP schema_migration_databases Databases processed in the last run by result.")
+            lines.append("# TYPE schema_migration_databases gauge")
+            for result, count in sorted(self.results.items()):
+                lines.append(f'schema_migration_databases{{{labels},result="{result}"}} {count}')
+            failures = self.results.get('failure', 0)
+
+        lines += [
+            "# HELP schema_migration_run_duration_seconds Wall-clock duration of the last run.",
+            "# TYPE schema_migration_run_duration_seconds gauge",
+            f"schema_migration_run_duration_seconds{{{labels}}} {time.time() - self.started:.3f}",
+            "# HELP schema_migration_last_run_timestamp_seconds Unix time the last run finished.",
+            "# TYPE schema_migration_last_run_timestamp_seconds gauge",
+            f"schema_migration_last_run_timestamp_seconds{{{labels}}} {time.time():.0f}",
+            "# HELP schema_migration_last_run_success 1 if the last run had no failed databases.",
+            "# TYPE schema_migration_last_run_success gauge",
+            f"schema_migration_last_run_success{{{labels}}} {0 if failures else 1}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str) -> bool:
+        """textfile collector 디렉토리에 기록 (임시 파일에 쓴 뒤 교체하여 수집 중 일부만 읽히지 않게 함)"""
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(temp_path, file_path)
+            return True
+        except OSError as e:
+            print(f"⚠️  메트릭 파일 기록 실패: {e}")
+            return False
+
+
+def write_run_metrics(metrics: RunMetrics, file_path: Optional[str]):
+    """실행 메트릭을 Prometheus textfile로 기록 (file_path가 비어 있으면 기록하지 않음)"""
+    if not file_path:
+        return
+    if metrics.write(file_path):
+        print(f"📈 메트릭 기록: {file_path}")
+
+# ========================================
+# DDL 재시도
+# ========================================
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """재시도 대기 시간 (지수 증가, 절반은 고정 + 절반은 무작위 지터)"""
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+# ========================================
+# 병렬 처리 (워커별 연결 사용)
+# ========================================
+# 매니저는 log(message), begin_capture(), end_capture(), disconnect()를 제공해야 함
+# (begin_capture ~ end_capture 사이의 출력은 데이터베이스별 버퍼에 모았다가 한 번에 출력)
+
+def connect_worker(worker_manager):
+    """워커 매니저 연결 확인 (연결이 없으면 connect(), 실패하면 예외) - prepare_worker로 사용"""
+    if worker_manager.connection is None and not worker_manager.connect():
+        worker_manager.connection = None
+        raise RuntimeError("워커 DB 연결 실패")
+
+def process_databases(manager, databases: List[str], task: Callable, workers: int = 1,
+                      make_worker: Optional[Callable] = None, prepare_worker: Optional[Callable] = None,
+                      merge_worker: Optional[Callable] = None) -> Tuple[int, int]:
+    """데이터베이스 목록 처리 (workers가 2 이상이면 병렬 처리)
+
+    task(manager, database)는 데이터베이스 하나를 처리하고 두 개의 건수를 반환한다.
+    병렬 처리 시 워커 스레드마다 make_worker(manager)로 전용 매니저를 한 번 만들고,
+    데이터베이스마다 prepare_worker(worker_manager)로 연결을 확인하며 (실패하면 그 데이터베이스만 실패 처리),
+    끝나면 merge_worker(manager, worker_manager)로 워커별 결과를 메인 매니저로 모은 뒤 연결을 해제한다.
+    데이터베이스는 목록 순서대로 워커에 배정되므로 크기순으로 정렬된 목록이면 큰 작업부터 시작한다.
+    반환값: (첫 번째 건수 합계, 두 번째 건수 합계)
+    """
+    total_first = 0
+    total_second = 0
+
+    if workers <= 1:
+        for database in databases:
+            first, second = task(manager, database)
+            total_first += first
+            total_second += second
+        return total_first, total_second
+
+    local = threading.local()
+    worker_managers = []
+    worker_managers_lock = threading.Lock()
+
+    def run(database: str) -> Tuple[int, int, List[str]]:
+        """워커에서 데이터베이스 하나를 처리하고 수집된 출력과 함께 결과 반환"""
+        worker_manager = getattr(local, 'manager', None)
+        if worker_manager is None:
+            worker_manager = local.manager = make_worker(manager)
+            with worker_managers_lock:
+                worker_managers.append(worker_manager)
+        worker_manager.begin_capture()
+        try:
+            if prepare_worker:
+                prepare_worker(worker_manager)
+            first, second = task(worker_manager, database)
+        except Exception as e:
+            worker_manager.log(f"  ❌ {database} 처리 실패: {e}")
+            first, second = 0, 0
+        return first, second, worker_manager.end_capture()
+
+    print(f"⚡ {workers}개 워커로 병렬 처리 중... (완료 순서대로 출력)")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run, database) for database in databases]
+            for future in as_completed(futures):
+                first, second, lines = future.result()
+                # 데이터베이스별 출력을 한 번에 출력 (다른 데이터베이스 출력과 섞이지 않음)
+                print("\n".join(lines))
+                total_first += first
+                total_second += second
+    finally:
+        # 워커별 결과를 메인 매니저로 모으고 연결 해제
+        with worker_managers_lock:
+            for worker_manager in worker_managers:
+                if merge_worker:
+                    merge_worker(manager, worker_manager)
+                worker_manager.disconnect()
+
+    return total_first, total_second
+
+# ========================================
+# 다중 호스트 실행기 연동 (multi_host_runner.py)
+# ========================================
+# 실행기는 스크립트마다 --host/--port/--user/--password-env/--db-selection/--db-list-file/--summary-file을
+# 전달하고, 스크립트가 --summary-file에 기록한 요약(summary.json)을 서버별로 합침
+
+# 서버별 요약에서 합계를 낼 항목 (summary.json의 숫자 항목)
+SUMMARY_COUNT_KEYS = (
+    'databases', 'created_tables', 'existing_tables', 'added_columns', 'existing_columns',
+    'created_partitions', 'detached_partitions',
+)
+
+# 서버별 요약에서 건수를 낼 항목 (summary.json의 목록 항목, 다시 실행이 필요한 대상)
+SUMMARY_LIST_KEYS = ('skipped_tables', 'deferred_databases', 'copied_tables')
+
+def add_runner_args(parser: argparse.ArgumentParser, config: Dict, db_selection_choices: List[str]):
+    """다중 호스트 실행기가 전달하는 접속/데이터베이스 선택/요약 옵션 추가
+
+    config는 스크립트의 접속 설정(DB_HOST, DB_PORT, DB_USER, DB_LIST_FILE)이 있는 globals()
+    """
+    host, port, user, db_list_file = (config['DB_HOST'], config['DB_PORT'], config['DB_USER'],
+                                      config['DB_LIST_FILE'])
+    parser.add_argument('--host', default=host, help=f"접속할 서버 (기본값: {host})")
+    parser.add_argument('--port', type=type(port), default=port, help=f"접속 포트 (기본값: {port})")
+    parser.add_argument('--user', default=user, help=f"접속 계정 (기본값: {user})")
+    parser.add_argument('--password-env', default=None,
+                        help="비밀번호를 읽을 환경 변수 이름 (지정하지 않으면 DB_PASS 사용)")
+    parser.add_argument('--db-selection', choices=db_selection_choices, default=None,
+                        help="데이터베이스 선택 방법 (지정하면 선택 메뉴를 띄우지 않음)")
+    parser.add_argument('--db-list-file', default=db_list_file,
+                        help=f"데이터베이스 리스트 파일 (기본값: {db_list_file})")
+    parser.add_argument('--summary-file', default=None,
+                        help="실행 결과 요약을 기록할 JSON 파일 경로 (다중 호스트 실행기에서 사용)")
+
+def apply_connection_args(args: argparse.Namespace, config: Dict, metrics: RunMetrics):
+    """명령행 접속 옵션을 스크립트 접속 설정(config: globals())에 반영 (다중 호스트 실행기에서 호스트별로 지정)"""
+    config['DB_HOST'], config['DB_PORT'], config['DB_USER'] = args.host, args.port, args.user
+    config['DB_LIST_FILE'] = args.db_list_file
+    if args.password_env:
+        password = os.environ.get(args.password_env)
+        if password is None:
+            print(f"❌ 비밀번호 환경 변수가 설정되지 않았습니다: {args.password_env}")
+            sys.exit(1)
+        config['DB_PASS'] = password
+    metrics.host = f"{args.host}:{args.port}"
+
+def write_run_summary(file_path: Optional[str], metrics: RunMetrics, host: str, port, summary: Dict):
+    """실행 결과 요약을 JSON으로 기록 (다중 호스트 실행기가 호스트별 결과를 합칠 때 사용)
+
+    summary의 건수/목록 항목 이름은 SUMMARY_COUNT_KEYS, SUMMARY_LIST_KEYS와 맞출 것
+    """
+    if not file_path:
+        return
+    with metrics.lock:
+        results = dict(metrics.results)
+    summary = dict(summary, script=metrics.script, host=host, port=port, results=results,
+                   success=not results.get('failure'),
+                   duration_seconds=round(time.time() - metrics.started, 3))
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, file_path)
+        print(f"📝 실행 요약 기록: {file_path}")
+    except Exception as e:
+        print(f"⚠️  실행 요약 기록 실패: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)